@@ -42,11 +42,18 @@ public function receiveTransactions(Request $request)
         $skippedCount = 0;
         $errorCount = 0;
         $errors = [];
+        // Outcome of each transaction, in request order, so the connector only resends failures
+        $results = [];
 
         DB::beginTransaction();
 
         try {
             foreach ($request->transactions as $transactionData) {
+                $transactionId = $transactionData['transaction_id'] ?? 'unknown';
+
+                // Savepoint, so a failed transaction leaves nothing half-written behind
+                DB::beginTransaction();
+
                 try {
                     // Check if transaction already exists
                     $existingTransaction = PosTransaction::where([
@@ -55,7 +62,9 @@ public function receiveTransactions(Request $request)
                     ])->first();
 
                     if ($existingTransaction) {
+                        DB::commit();
                         $skippedCount++;
+                        $results[] = ['transaction_id' => $transactionId, 'status' => 'skipped'];
                         continue;
                     }
 
@@ -67,12 +76,20 @@ public function receiveTransactions(Request $request)
                         $transaction->createInvoice();
                     }
 
+                    DB::commit();
                     $processedCount++;
+                    $results[] = ['transaction_id' => $transactionId, 'status' => 'processed'];
 
                 } catch (\Exception $e) {
+                    DB::rollBack();
                     $errorCount++;
                     $errors[] = [
-                        'transaction_id' => $transactionData['transaction_id'] ?? 'unknown',
+                        'transaction_id' => $transactionId,
+                        'error' => $e->getMessage()
+                    ];
+                    $results[] = [
+                        'transaction_id' => $transactionId,
+                        'status' => 'error',
                         'error' => $e->getMessage()
                     ];
 
@@ -99,7 +116,8 @@ public function receiveTransactions(Request $request)
                 'processed' => $processedCount,
                 'skipped' => $skippedCount,
                 'errors' => $errorCount,
-                'error_details' => $errors
+                'error_details' => $errors,
+                'results' => $results
             ]);
 
         } catch (\Exception $e) {
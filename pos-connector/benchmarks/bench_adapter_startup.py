@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the lazy adapter registry
+Compares loading every adapter and optional driver up front with loading one adapter on demand
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+CONNECTOR_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Optional drivers that pos_adapters.py used to import at module import time
+EAGER_DEPENDENCIES = ['pyodbc', 'pymysql', 'psycopg2', 'pandas', 'requests', 'win32com.client', 'wmi']
+
+MEASURE = '''
+import json, time
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+try:
+    import psutil
+    rss = psutil.Process().memory_info().rss
+except ImportError:
+    import resource, sys
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+print(json.dumps({{'seconds': elapsed, 'rss': rss}}))
+'''
+
+SCENARIOS = {
+    'eager (all 29 adapters + drivers)': '''
+import importlib
+for name in {deps!r}:
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        pass
+from pos_connector.adapter_registry import AdapterRegistry
+registry = AdapterRegistry()
+adapters = {{key: registry.adapter_class(key)() for key in registry}}
+'''.format(deps=EAGER_DEPENDENCIES),
+    'lazy, sqlite adapter only': '''
+from pos_connector.adapter_registry import AdapterRegistry
+adapter = AdapterRegistry().get('sqlite')
+''',
+    'lazy, aronium adapter only': '''
+from pos_connector.adapter_registry import AdapterRegistry
+adapter = AdapterRegistry().get('aronium')
+''',
+}
+
+
+def run_scenario(body: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, '-c', MEASURE.format(body=body)],
+        cwd=CONNECTOR_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per scenario')
+    args = parser.parse_args()
+
+    missing = []
+    for name in EAGER_DEPENDENCIES:
+        probe = subprocess.run([sys.executable, '-c', f'import {name}'], capture_output=True)
+        if probe.returncode != 0:
+            missing.append(name)
+    if missing:
+        print(f"Note: not installed here, so not counted in the eager case: {', '.join(missing)}\n")
+
+    baseline = None
+    print(f"{'scenario':<36} {'load time':>10} {'RSS':>10} {'saved':>18}")
+    for label, body in SCENARIOS.items():
+        samples = [run_scenario(body) for _ in range(args.runs)]
+        seconds = statistics.median(s['seconds'] for s in samples)
+        rss = statistics.median(s['rss'] for s in samples) / (1024 * 1024)
+
+        if baseline is None:
+            baseline = (seconds, rss)
+            saved = ''
+        else:
+            saved = f"{(baseline[0] - seconds) * 1000:6.1f} ms {baseline[1] - rss:6.1f} MB"
+        print(f"{label:<36} {seconds * 1000:8.1f} ms {rss:7.1f} MB {saved:>18}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Simulation benchmark for adaptive polling intervals against a fixed sync_interval
+Replays simulated trading days of busy, moderate and dormant sources and reports polls and latency
+"""
+
+import os
+import sys
+import random
+import argparse
+import statistics
+from bisect import bisect_right
+from datetime import datetime
+
+# Add pos-connector directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pos_connector.adaptive_interval import AdaptiveInterval
+
+CLOSED_HOURS = ['22:00-07:00']
+DAY = 24 * 3600
+
+# (label, number of sources, mean seconds between transactions while trading)
+PROFILES = [
+    ('busy checkout', 3, 15),
+    ('moderate till', 5, 300),
+    ('back office', 12, 4 * 3600),
+]
+
+
+def trading_day(rng: random.Random, start: float, days: int):
+    """Transaction timestamps per source; trading from 08:00 to 21:30"""
+    sources = []
+    for label, count, mean_gap in PROFILES:
+        for _ in range(count):
+            stamps = []
+            for day in range(days):
+                t = start + day * DAY + 8 * 3600
+                close = start + day * DAY + 21.5 * 3600
+                while True:
+                    t += rng.expovariate(1 / mean_gap)
+                    if t >= close:
+                        break
+                    stamps.append(t)
+            sources.append((label, stamps))
+    return sources
+
+
+def simulate(stamps, start: float, end: float, next_delay, rng: random.Random):
+    """Poll one source from start to end; returns (polls, empty polls, latencies)"""
+    polls = empty = 0
+    latencies = []
+    delivered = 0
+    t = start + rng.uniform(0, 30)
+    while t < end:
+        upto = bisect_right(stamps, t)
+        new = stamps[delivered:upto]
+        latencies.extend(t - stamp for stamp in new)
+        delivered = upto
+        polls += 1
+        empty += not new
+        t += next_delay(len(new), t)
+    return polls, empty, latencies
+
+
+def run(sources, start, end, make_delay, seed):
+    rng = random.Random(seed)
+    totals = {'polls': 0, 'empty': 0, 'latencies': []}
+    by_label = {}
+    for label, stamps in sources:
+        polls, empty, latencies = simulate(stamps, start, end, make_delay(), rng)
+        totals['polls'] += polls
+        totals['empty'] += empty
+        totals['latencies'].extend(latencies)
+        by_label.setdefault(label, []).extend(latencies)
+    return totals, by_label
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=7, help='simulated days')
+    parser.add_argument('--sync-interval', type=float, default=30, help='fixed interval (config sync_interval)')
+    parser.add_argument('--min-interval', type=float, default=AdaptiveInterval.DEFAULT_MIN_INTERVAL)
+    parser.add_argument('--max-interval', type=float, default=AdaptiveInterval.DEFAULT_MAX_INTERVAL)
+    parser.add_argument('--target-per-poll', type=float, default=AdaptiveInterval.DEFAULT_TARGET_PER_POLL,
+                        help='transactions expected per poll (lower trades polls for latency)')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    # Local midnight, so closed hours line up with the simulated trading day
+    start = datetime(2026, 3, 2).timestamp()
+    end = start + args.days * DAY
+    sources = trading_day(random.Random(args.seed), start, args.days)
+
+    def fixed():
+        return lambda count, now: args.sync_interval
+
+    def adaptive():
+        pacer = AdaptiveInterval(args.sync_interval, args.min_interval, args.max_interval,
+                                 closed_hours=CLOSED_HOURS, target_per_poll=args.target_per_poll)
+        return lambda count, now: pacer.record(count, now)
+
+    print(f"{len(sources)} sources, {sum(len(s) for _, s in sources)} transactions over {args.days} days")
+    print(f"{'policy':>9} {'polls':>9} {'empty':>9} {'empty %':>8} {'median s':>9} {'p95 s':>8}")
+    results = {}
+    for name, make_delay in [('fixed', fixed), ('adaptive', adaptive)]:
+        totals, by_label = run(sources, start, end, make_delay, args.seed)
+        results[name] = by_label
+        latencies = totals['latencies']
+        print(f"{name:>9} {totals['polls']:>9} {totals['empty']:>9} "
+              f"{100 * totals['empty'] / totals['polls']:>7.1f}% "
+              f"{statistics.median(latencies):>9.1f} {percentile(latencies, 0.95):>8.1f}")
+
+    print("\nmedian receipt-to-poll latency by source profile (s)")
+    for label, _count, _gap in PROFILES:
+        print(f"{label:>15} fixed {statistics.median(results['fixed'][label]):>7.1f}   "
+              f"adaptive {statistics.median(results['adaptive'][label]):>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
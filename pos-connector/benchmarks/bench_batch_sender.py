@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark for outbox sending throughput against a local stand-in API
+Drains a backlog through /api/pos-connector/transactions one transaction per POST and with the batching sender
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+import threading
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add pos-connector directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pos_connector.outbox import TransactionOutbox
+from pos_connector.batch_sender import BatchSender
+
+SYSTEM = {'name': 'Database POS (sales.db)', 'type': 'database', 'adapter': 'sqlite'}
+
+
+def make_server(request_ms: float, transaction_ms: float) -> ThreadingHTTPServer:
+    """Stand-in for receiveTransactions: fixed cost per request (auth, validation, DB transaction) plus per row"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            transactions = body.get('transactions', [])
+            time.sleep((request_ms + transaction_ms * len(transactions)) / 1000)
+            reply = json.dumps({'processed': len(transactions), 'skipped': 0, 'errors': 0}).encode()
+            self.send_response(200 if self.path == '/api/pos-connector/transactions' else 404)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_send_batch(port: int):
+    """POST each batch like PosApiClient.send_transactions, over one keep-alive connection per thread"""
+    local = threading.local()
+
+    def send_batch(rows):
+        if not hasattr(local, 'conn'):
+            local.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        # Bytes, so headers and body go out in one segment
+        payload = json.dumps({'customer_id': 'bench', 'transactions': [row['transaction'] for row in rows]}).encode()
+        local.conn.request('POST', '/api/pos-connector/transactions', payload,
+                           {'Content-Type': 'application/json', 'X-API-Key': 'bench'})
+        response = local.conn.getresponse()
+        response.read()
+        error = None if response.status == 200 else f"HTTP {response.status}"
+        return {row['id']: error for row in rows}
+
+    return send_batch
+
+
+def transaction(n: int) -> dict:
+    return {
+        'transaction_id': f"T{n}",
+        'transaction_date': f"2026-03-02 {n // 3600 % 24:02d}:{n // 60 % 60:02d}:{n % 60:02d}",
+        'total_amount': round(n * 0.37 % 500, 2),
+        'customer_name': 'Walk-in Customer',
+        'items': [{'description': f"Item {n % 97}", 'quantity': 1 + n % 3, 'unit_price': 4.5}],
+    }
+
+
+def new_outbox(temp_dir: str, name: str) -> TransactionOutbox:
+    outbox = TransactionOutbox(os.path.join(temp_dir, f"{name}.db"))
+    conn = sqlite3.connect(outbox.db_path)
+    outbox.init_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+    return outbox
+
+
+def drain(outbox: TransactionOutbox, sender: BatchSender, until) -> float:
+    sender.IDLE_WAIT = 0.05
+    running = threading.Event()
+    running.set()
+    thread = threading.Thread(target=sender.run, args=(running.is_set,), daemon=True)
+    start = time.perf_counter()
+    thread.start()
+    while not until():
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    running.clear()
+    thread.join()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=2000, help='transactions in the backlog')
+    parser.add_argument('--request-ms', type=float, default=15, help='server cost per request')
+    parser.add_argument('--transaction-ms', type=float, default=0.5, help='server cost per transaction')
+    parser.add_argument('--batch', type=int, default=BatchSender.MAX_COUNT)
+    parser.add_argument('--wait', type=float, default=BatchSender.MAX_WAIT)
+    parser.add_argument('--in-flight', type=int, default=BatchSender.MAX_IN_FLIGHT)
+    args = parser.parse_args()
+
+    server = make_server(args.request_ms, args.transaction_ms)
+    send_batch = make_send_batch(server.server_address[1])
+    scenarios = [
+        ('one POST per transaction', dict(max_count=1, max_wait=0, max_in_flight=1)),
+        (f"batches of {args.batch}, 1 in flight", dict(max_count=args.batch, max_wait=args.wait, max_in_flight=1)),
+        (f"batches of {args.batch}, {args.in_flight} in flight",
+         dict(max_count=args.batch, max_wait=args.wait, max_in_flight=args.in_flight)),
+    ]
+
+    print(f"{args.items} queued transactions, stand-in API costs {args.request_ms:g} ms per request "
+          f"+ {args.transaction_ms:g} ms per transaction")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for position, (label, options) in enumerate(scenarios):
+            outbox = new_outbox(temp_dir, f"backlog{position}")
+            outbox.append('file:c:/pos/sales.db', SYSTEM, [transaction(n) for n in range(args.items)])
+            sender = BatchSender(outbox, send_batch, **options)
+            elapsed = drain(outbox, sender, lambda: outbox.counts() == {'delivered': args.items})
+            print(f"  {label:<32} {elapsed:7.2f}s  {args.items / elapsed:8.0f} tx/s  "
+                  f"{sender.stats['batches']} requests")
+
+        # A lone transaction on an idle connector is sent at once, not after the batching window
+        outbox = new_outbox(temp_dir, 'idle')
+        sender = BatchSender(outbox, send_batch, max_count=args.batch, max_wait=args.wait,
+                             max_in_flight=args.in_flight)
+        threading.Timer(0.1, outbox.append, ('file:c:/pos/sales.db', SYSTEM, [transaction(0)])).start()
+        elapsed = drain(outbox, sender, lambda: outbox.counts() == {'delivered': 1})
+        print(f"\nSingle transaction on an idle sender delivered {(elapsed - 0.1) * 1000:.0f} ms after it was queued "
+              f"(batching window {args.wait * 1000:.0f} ms)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark for cache write and lookup latency as sync_log grows
+Compares the original unindexed tables with the migrated schema and memoized source ids
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+
+# Add pos-connector directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pos_connector.cache_schema import CacheSchema, PosSystemIds
+from pos_connector.discovery_cache import DiscoveryCache
+
+SOURCES = 20
+
+
+def create(db_path: str, migrated: bool) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    schema = CacheSchema()
+    cursor = conn.cursor()
+    schema.init_schema(cursor)
+    DiscoveryCache(db_path).init_schema(cursor)
+    if migrated:
+        schema.migrate(cursor)
+    for n in range(SOURCES):
+        conn.execute("INSERT INTO pos_systems (name, type, status) VALUES (?, 'database', 'active')", (f"POS {n}",))
+    return conn
+
+
+def grow(conn: sqlite3.Connection, start: int, stop: int):
+    """Append sync_log rows start..stop-1, spread over the sources and the last year"""
+    conn.execute('BEGIN')
+    conn.execute('''
+        WITH RECURSIVE n(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+        INSERT INTO sync_log (pos_system_id, transaction_id, sync_status, data_hash, created_at)
+        SELECT 1 + i % ?, 'T' || i, CASE WHEN i % 50 = 0 THEN 'failed' ELSE 'success' END, hex(i),
+               datetime('now', '-' || (? - i) % 31536000 || ' seconds')
+        FROM n
+    ''', (start, stop, SOURCES, stop))
+    conn.execute('COMMIT')
+
+
+def write_batch(conn: sqlite3.Connection, ids, batch: int, serial: int):
+    """One cache writer commit of ``batch`` transactions, the statements _cache_transactions runs"""
+    cursor = conn.cursor()
+    cursor.execute('BEGIN')
+    for i in range(batch):
+        system = {'name': f"POS {i % SOURCES}", 'type': 'database'}
+        transaction_id = f"W{serial}-{i}"
+        if ids is None:
+            # The original lookup, once per write
+            cursor.execute("SELECT id FROM pos_systems WHERE name = ?", (system['name'],))
+            system_id = cursor.fetchone()[0]
+        else:
+            system_id = ids.resolve(cursor, system)
+        cursor.execute("INSERT OR REPLACE INTO cached_transactions (pos_system_id, transaction_id, transaction_data, "
+                       "processed) VALUES (?, ?, ?, 1)", (system_id, transaction_id, json.dumps({'id': transaction_id})))
+        cursor.execute("INSERT INTO sync_log (pos_system_id, transaction_id, sync_status, data_hash) "
+                       "VALUES (?, ?, 'success', ?)", (system_id, transaction_id, transaction_id))
+    cursor.execute('COMMIT')
+
+
+def timed(repeat: int, func) -> float:
+    """Mean milliseconds per call"""
+    start = time.perf_counter()
+    for i in range(repeat):
+        func(i)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def measure(conn: sqlite3.Connection, ids, size: int, args) -> dict:
+    serial = [0]
+
+    def write(_):
+        serial[0] += 1
+        write_batch(conn, ids, args.batch, serial[0])
+
+    def by_transaction(i):
+        conn.execute("SELECT sync_status FROM sync_log WHERE transaction_id = ?",
+                     (f"T{(i * 7919) % max(size, 1)}",)).fetchall()
+
+    def recent(_):
+        conn.execute("SELECT COUNT(*) FROM sync_log WHERE created_at >= datetime('now', '-1 hour')").fetchone()
+
+    def unprocessed(_):
+        conn.execute("SELECT id FROM cached_transactions WHERE processed = 0 LIMIT 100").fetchall()
+
+    # Unindexed scans of 10M rows take seconds each, so they are sampled less often
+    scans = args.lookups if ids is not None or size <= 100_000 else 3
+    return {
+        'write_ms': timed(args.writes, write) / args.batch,
+        'lookup_ms': timed(scans, by_transaction),
+        'recent_ms': timed(scans, recent),
+        'unprocessed_ms': timed(args.lookups, unprocessed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000, help='sync_log rows to grow to')
+    parser.add_argument('--steps', type=int, default=4, help='measurements between 0 and --rows (log scale)')
+    parser.add_argument('--batch', type=int, default=100, help='transactions per cache writer commit')
+    parser.add_argument('--writes', type=int, default=20, help='commits timed at each size')
+    parser.add_argument('--lookups', type=int, default=200, help='lookups timed at each size')
+    parser.add_argument('--baseline', action='store_true', help='also measure the unindexed schema (slow)')
+    args = parser.parse_args()
+
+    sizes = sorted({int(args.rows ** ((k + 1) / args.steps)) for k in range(args.steps)} | {args.rows})
+    kinds = (['original'] if args.baseline else []) + ['migrated']
+
+    print(f"{'schema':<10}{'sync_log rows':>15}{'write ms/tx':>13}{'by tx id ms':>13}{'last hour ms':>14}"
+          f"{'unprocessed ms':>16}")
+    for kind in kinds:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'pos_cache.db')
+            conn = create(db_path, kind == 'migrated')
+            ids = PosSystemIds() if kind == 'migrated' else None
+            rows = 0
+            for size in sizes:
+                grow(conn, rows, size)
+                rows = size
+                result = measure(conn, ids, size, args)
+                print(f"{kind:<10}{size:>15,}{result['write_ms']:>13.4f}{result['lookup_ms']:>13.3f}"
+                      f"{result['recent_ms']:>14.3f}{result['unprocessed_ms']:>16.3f}", flush=True)
+            conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark for writing the local transaction cache from concurrent monitor threads
+Compares a connection and commit per transaction (the old _cache_transaction) with the single-writer CacheWriter
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+import threading
+
+# Add pos-connector directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pos_connector.cache_writer import CacheWriter
+
+SCHEMA = '''
+    CREATE TABLE pos_systems (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, type TEXT NOT NULL,
+                              config TEXT, status TEXT DEFAULT 'active', last_sync TIMESTAMP);
+    CREATE TABLE sync_log (id INTEGER PRIMARY KEY AUTOINCREMENT, pos_system_id INTEGER, transaction_id TEXT,
+                           sync_status TEXT, data_hash TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE cached_transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, pos_system_id INTEGER,
+                                      transaction_id TEXT UNIQUE, transaction_data TEXT, processed INTEGER DEFAULT 0,
+                                      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+'''
+
+
+def cache(cursor, system, transaction):
+    """The statements _cache_transaction runs for one transaction"""
+    cursor.execute("SELECT id FROM pos_systems WHERE name = ?", (system['name'],))
+    result = cursor.fetchone()
+    if result:
+        system_id = result[0]
+    else:
+        cursor.execute("INSERT INTO pos_systems (name, type, config) VALUES (?, ?, ?)",
+                       (system['name'], system['type'], json.dumps(system)))
+        system_id = cursor.lastrowid
+    cursor.execute("INSERT OR REPLACE INTO cached_transactions (pos_system_id, transaction_id, transaction_data, processed) "
+                   "VALUES (?, ?, ?, 1)", (system_id, transaction['id'], json.dumps(transaction)))
+    cursor.execute("INSERT INTO sync_log (pos_system_id, transaction_id, sync_status) VALUES (?, ?, 'success')",
+                   (system_id, transaction['id']))
+
+
+def run(kind: str, threads: int, per_thread: int) -> dict:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        conn = sqlite3.connect(db_path)
+        conn.executescript(SCHEMA)
+        conn.close()
+        writer = CacheWriter(db_path)
+        errors = []
+
+        def monitor(n):
+            system = {'name': f"POS {n}", 'type': 'database'}
+            for i in range(per_thread):
+                transaction = {'id': f"{n}-{i}", 'total_amount': i * 1.5, 'items': [{'name': 'Tea', 'price': 2}]}
+                if kind == 'writer':
+                    writer.submit(lambda cursor, t=transaction: cache(cursor, system, t))
+                    continue
+                try:
+                    # The old path: its own connection and commit for every transaction
+                    conn = sqlite3.connect(db_path, timeout=1)
+                    cache(conn.cursor(), system, transaction)
+                    conn.commit()
+                    conn.close()
+                except sqlite3.OperationalError as e:
+                    errors.append(str(e))
+
+        start = time.perf_counter()
+        workers = [threading.Thread(target=monitor, args=(n,)) for n in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        submitted = time.perf_counter() - start
+        writer.stop()
+        elapsed = time.perf_counter() - start
+
+        conn = sqlite3.connect(db_path)
+        cached = conn.execute("SELECT COUNT(*) FROM cached_transactions").fetchone()[0]
+        conn.close()
+        return {'kind': kind, 'cached': cached, 'lock_errors': len(errors), 'seconds': elapsed,
+                'caller_seconds': submitted, 'commits': writer.stats['commits'] if kind == 'writer' else cached}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8, help='concurrent monitor threads')
+    parser.add_argument('--per-thread', type=int, default=500, help='transactions cached by each thread')
+    args = parser.parse_args()
+
+    total = args.threads * args.per_thread
+    print(f"{args.threads} threads x {args.per_thread} transactions")
+    print(f"{'mode':<12}{'cached':>8}{'lock errors':>13}{'commits':>9}{'tx/s':>10}{'caller s':>10}")
+    for kind in ('per-call', 'writer'):
+        result = run(kind, args.threads, args.per_thread)
+        print(f"{kind:<12}{result['cached']:>8}{result['lock_errors']:>13}{result['commits']:>9}"
+              f"{total / result['seconds']:>10.0f}{result['caller_seconds']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark for ingestion memory during a simulated API outage
+Queues a million transactions with no sender running and samples RSS for queue.Queue and the SQLite outbox
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+# Add pos-connector directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pos_connector.outbox import TransactionOutbox
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (Linux /proc, else peak RSS from getrusage)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def transaction(n: int) -> dict:
+    """One extracted transaction as the adapters return it"""
+    return {
+        'id': n,
+        'date': f"2026-03-02 {n // 3600 % 24:02d}:{n // 60 % 60:02d}:{n % 60:02d}",
+        'total_amount': round(n * 0.37 % 500, 2),
+        'customer_name': 'Walk-in Customer',
+        'customer_email': '',
+        'currency': 'SAR',
+        'items': [{'name': f"Item {n % 97}", 'quantity': 1 + n % 3, 'price': 4.5}],
+    }
+
+
+def run_scenario(kind: str, items: int, batch: int, samples: int) -> dict:
+    system = {'name': 'Database POS (sales.db)', 'type': 'database', 'adapter': 'sqlite',
+              'database_path': 'C:/POS/sales.db', 'validated': True}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if kind == 'queue.Queue':
+            q = queue.Queue()
+
+            def put(transactions):
+                for t in transactions:
+                    q.put({'system': system, 'transaction': t, 'timestamp': datetime.now()})
+
+            def take(limit):
+                return [q.get_nowait() for _ in range(min(limit, q.qsize()))]
+        else:
+            outbox = TransactionOutbox(os.path.join(temp_dir, 'pos_cache.db'))
+            conn = sqlite3.connect(outbox.db_path)
+            outbox.init_schema(conn.cursor())
+            conn.commit()
+            conn.close()
+
+            def put(transactions):
+                outbox.append('file:c:/pos/sales.db', system, transactions)
+
+            def take(limit):
+                claimed = outbox.claim(limit)
+                outbox.mark_delivered([row['id'] for row in claimed])
+                return claimed
+
+        # Outage: monitors keep extracting, one batch per poll, nothing is sent
+        trace = [rss_mb()]
+        start = time.perf_counter()
+        for first in range(0, items, batch):
+            put([transaction(n) for n in range(first, min(items, first + batch))])
+            if (first + batch) % (items // samples) < batch:
+                trace.append(rss_mb())
+        put_seconds = time.perf_counter() - start
+
+        # API back: drain everything and check order
+        start = time.perf_counter()
+        expected = 0
+        while expected < items:
+            for row in take(100):
+                assert row['transaction']['id'] == expected
+                expected += 1
+        drain_seconds = time.perf_counter() - start
+    return {'trace': trace, 'put_s': put_seconds, 'drain_s': drain_seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=1_000_000, help='transactions queued during the outage')
+    parser.add_argument('--batch', type=int, default=50, help='transactions extracted per poll')
+    parser.add_argument('--samples', type=int, default=10)
+    parser.add_argument('--scenario', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario(args.scenario, args.items, args.batch, args.samples)))
+        return
+
+    print(f"{args.items} transactions queued in batches of {args.batch} with the sender down, then drained")
+    for kind in ['queue.Queue', 'TransactionOutbox']:
+        # Separate interpreters so one scenario's heap does not inflate the other's RSS
+        output = subprocess.run(
+            [sys.executable, __file__, '--scenario', kind, '--items', str(args.items),
+             '--batch', str(args.batch), '--samples', str(args.samples)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        trace = ' '.join(f"{mb:.0f}" for mb in result['trace'])
+        print(f"\n{kind}: queue {result['put_s']:.1f}s, drain {result['drain_s']:.1f}s")
+        print(f"  RSS MB every {args.items // args.samples} items: {trace}")
+
+
+if __name__ == "__main__":
+    main()
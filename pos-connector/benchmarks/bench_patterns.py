@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the compiled keyword classifier
+Compares POS_PATTERNS against the per-keyword loops it replaced over synthetic file names
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add pos-connector directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pos_connector.patterns import POS_PATTERNS, POS_FILE_PATTERNS, POS_NAME, POS_FILE
+
+WORDS = [
+    'report', 'backup', 'data', 'config', 'setup', 'log', 'cache', 'temp', 'user', 'export',
+    'pos', 'sales', 'retail', 'invoice', 'receipt', 'customer', 'orders', 'store', 'cash',
+]
+EXTENSIONS = ['.db', '.sqlite', '.csv', '.json', '.exe', '.txt', '.dll', '.log', '.xml', '.mdb']
+
+POS_KEYWORDS = POS_PATTERNS.keywords(POS_NAME)
+
+
+def generate_names(count: int, seed: int = 42):
+    """Build synthetic file names, roughly a third of them containing a POS keyword"""
+    rng = random.Random(seed)
+    names = []
+    for i in range(count):
+        parts = rng.sample(WORDS[:10], 2)
+        if rng.random() < 0.35:
+            parts.insert(rng.randrange(3), rng.choice(WORDS[10:]))
+        # Some names end in the keyword itself (e.g. 'Backup_Pos.db') to exercise the file scan patterns
+        suffix = '' if rng.random() < 0.1 else str(i % 1000)
+        names.append(f"{'_'.join(parts)}{suffix}{rng.choice(EXTENSIONS)}".title())
+    return names
+
+
+def naive_file_scan(name: str) -> bool:
+    file_lower = name.lower()
+    return any(pattern.replace('*', '') in file_lower for pattern in POS_FILE_PATTERNS)
+
+
+def naive_pos_name(name: str) -> bool:
+    filename = name.lower()
+    return any(keyword in filename for keyword in POS_KEYWORDS)
+
+
+def timed(label: str, func, names):
+    start = time.perf_counter()
+    hits = sum(1 for name in names if func(name))
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<38} {elapsed:7.3f}s  {len(names) / elapsed / 1e6:6.2f}M names/s  ({hits} hits)")
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1_000_000, help='number of synthetic names')
+    args = parser.parse_args()
+
+    print(f"Generating {args.count:,} synthetic file names...")
+    names = generate_names(args.count)
+
+    print("\nFile scan patterns:")
+    naive = timed('any(pattern.replace(...) in name)', naive_file_scan, names)
+    compiled = timed('POS_PATTERNS.matches(name, POS_FILE)', lambda n: POS_PATTERNS.matches(n, POS_FILE), names)
+    assert naive == compiled, "compiled matcher disagrees with the keyword loop"
+
+    print("\nPOS name keywords:")
+    naive = timed('any(keyword in name)', naive_pos_name, names)
+    compiled = timed('POS_PATTERNS.matches(name, POS_NAME)', lambda n: POS_PATTERNS.matches(n, POS_NAME), names)
+    assert naive == compiled, "compiled matcher disagrees with the keyword loop"
+
+    print("\nAll categories in one pass:")
+    timed('POS_PATTERNS.classify(name)', POS_PATTERNS.classify, names)
+
+
+if __name__ == "__main__":
+    main()
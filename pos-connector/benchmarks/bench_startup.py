@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Import-time startup benchmark with a budget
+Runs `python -X importtime` for each startup path and fails when a path exceeds its budget
+"""
+
+import os
+import re
+import sys
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+CONNECTOR_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Startup path -> (modules imported on that path, default budget in milliseconds)
+SCENARIOS = {
+    'startup (import main, before config.json is read)': (['main'], 150),
+    "detection_mode '2' (time to first watch)": (
+        ['main', 'pos_connector.laravel_api', 'pos_connector.watcher'], 400
+    ),
+    "detection_mode '1' (enhanced connector)": (['main', 'pos_connector.enhanced_connector'], 800),
+}
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Return (module, cumulative_us, depth) for every line of -X importtime output"""
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            _self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def run_importtime(modules: List[str]) -> Tuple[Optional[List[Tuple[str, int, int]]], str]:
+    """Import modules in a fresh interpreter; returns (entries, error)"""
+    code = '\n'.join(f'import {module}' for module in modules) if modules else 'pass'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=CONNECTOR_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'
+        return None, error
+    return parse_importtime(result.stderr), ''
+
+
+def measure(modules: List[str], baseline: set, runs: int) -> Tuple[Optional[float], List[Tuple[str, float]], str]:
+    """Median import time (ms) of everything the modules pull in, plus the slowest imports"""
+    totals = []
+    per_module: Dict[str, List[int]] = {}
+
+    for _ in range(runs):
+        entries, error = run_importtime(modules)
+        if entries is None:
+            return None, [], error
+
+        # Top-level imports that the bare interpreter does not perform are ours
+        ours = [(module, cumulative) for module, cumulative, depth in entries
+                if depth == 0 and module not in baseline]
+        totals.append(sum(cumulative for _module, cumulative in ours))
+
+        # Report the direct imports of each startup module as well, where the cost usually hides
+        for module, cumulative, depth in entries:
+            if depth <= 1 and module not in baseline:
+                per_module.setdefault(module, []).append(cumulative)
+
+    slowest = sorted(((module, statistics.median(times) / 1000) for module, times in per_module.items()),
+                     key=lambda item: -item[1])
+    return statistics.median(totals) / 1000, slowest, ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7, help='fresh interpreters per startup path')
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help='multiply all budgets, e.g. 2.0 on slow CI machines')
+    parser.add_argument('--top', type=int, default=5, help='slowest imports to show per path')
+    args = parser.parse_args()
+
+    # Warm the bytecode cache so the first measured run is not penalised
+    for modules, _budget in SCENARIOS.values():
+        run_importtime(modules)
+
+    baseline_entries, _error = run_importtime([])
+    baseline = {module for module, _cumulative, depth in baseline_entries or [] if depth == 0}
+
+    over_budget = False
+    for label, (modules, budget_ms) in SCENARIOS.items():
+        budget_ms *= args.budget_scale
+        total_ms, slowest, error = measure(modules, baseline, args.runs)
+
+        if total_ms is None:
+            print(f"⚠️  {label}: skipped ({error})")
+            continue
+
+        within = total_ms <= budget_ms
+        over_budget |= not within
+        print(f"{'✅' if within else '❌'} {label}: {total_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+        for module, ms in slowest[:args.top]:
+            print(f"      {ms:8.1f} ms  {module}")
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
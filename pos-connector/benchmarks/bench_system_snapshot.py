@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the shared process/port snapshot on a synthetic process table
+Compares per-connection process lookups with one snapshot per discovery run
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from collections import namedtuple
+
+# Add pos-connector directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pos_connector.system_snapshot import SystemSnapshot
+
+Addr = namedtuple('Addr', 'ip port')
+Conn = namedtuple('Conn', 'laddr status pid')
+
+POS_PORTS = [1433, 3306, 5432, 8080, 443, 80, 9090, 8443]
+NAMES = ['sqlservr.exe', 'pos.exe', 'chrome.exe', 'svchost.exe', 'retail_sync.exe', 'explorer.exe']
+
+
+def spin(microseconds: float):
+    """Stand-in for the system call behind a psutil query"""
+    end = time.perf_counter() + microseconds / 1e6
+    while time.perf_counter() < end:
+        pass
+
+
+class SyntheticPsutil:
+    """psutil look-alike over a synthetic process table with a fixed cost per system call"""
+
+    def __init__(self, processes: int, connections_per_process: int, entry_us: float, lookup_us: float):
+        rng = random.Random(processes * 31 + connections_per_process)
+        self.entry_us = entry_us
+        self.lookup_us = lookup_us
+        self.lookups = 0
+        self.table = {pid: rng.choice(NAMES) for pid in range(100, 100 + processes)}
+        self.conns = []
+        for pid in self.table:
+            for _ in range(connections_per_process):
+                # Half of the connections sit on ports the network scan looks at
+                port = rng.choice(POS_PORTS) if rng.random() < 0.5 else rng.randrange(49152, 65535)
+                self.conns.append(Conn(Addr('127.0.0.1', port), 'ESTABLISHED', pid))
+
+    def process_iter(self, attrs=None):
+        for pid, name in self.table.items():
+            spin(self.entry_us)
+            yield _Proc(pid, name)
+
+    def net_connections(self, kind='inet'):
+        spin(self.entry_us * len(self.conns) / 10)
+        return list(self.conns)
+
+    def Process(self, pid):
+        self.lookups += 1
+        spin(self.lookup_us)
+        return _Proc(pid, self.table[pid])
+
+
+class _Proc:
+    def __init__(self, pid, name):
+        self.info = {'pid': pid, 'name': name, 'exe': None, 'cmdline': None}
+
+    def name(self):
+        return self.info['name']
+
+    def as_dict(self, attrs=None):
+        return dict(self.info)
+
+
+def per_connection_scan(fake: SyntheticPsutil) -> int:
+    """The previous discovery: process scan, then one Process() per matching connection"""
+    found = 0
+    for proc in fake.process_iter(['pid', 'name', 'exe', 'cmdline']):
+        found += 'pos' in proc.info['name']
+    for connection in fake.net_connections():
+        if connection.laddr and connection.laddr.port in POS_PORTS and connection.pid:
+            proc_name = fake.Process(connection.pid).name()
+            found += any(keyword in proc_name for keyword in ['pos', 'retail', 'cash', 'sql'])
+    return found
+
+
+def snapshot_scan(fake: SyntheticPsutil) -> int:
+    """The snapshot discovery: one process table and one connection table shared by both scans"""
+    found = 0
+    snapshot = SystemSnapshot(psutil_module=fake)
+    for info in snapshot.processes().values():
+        found += 'pos' in info['name']
+    pos_ports = set(POS_PORTS)
+    for pid, ports in snapshot.ports_by_pid().items():
+        if ports & pos_ports:
+            proc_name = snapshot.process_name(pid)
+            found += any(keyword in proc_name for keyword in ['pos', 'retail', 'cash', 'sql'])
+    return found
+
+
+def timed(func, fake):
+    start = time.perf_counter()
+    func(fake)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entry-us', type=float, default=2.0, help='cost of one process_iter entry')
+    parser.add_argument('--lookup-us', type=float, default=25.0, help='cost of one psutil.Process lookup')
+    args = parser.parse_args()
+
+    print(f"{'processes':>9} {'conns/proc':>10} {'old lookups':>12} {'new lookups':>12} "
+          f"{'old ms':>9} {'new ms':>9}")
+
+    for processes, per_process in [(250, 4), (500, 4), (1000, 4), (2000, 4),
+                                   (1000, 1), (1000, 8), (1000, 16)]:
+        old = SyntheticPsutil(processes, per_process, args.entry_us, args.lookup_us)
+        new = SyntheticPsutil(processes, per_process, args.entry_us, args.lookup_us)
+        old_ms = timed(per_connection_scan, old)
+        new_ms = timed(snapshot_scan, new)
+        print(f"{processes:>9} {per_process:>10} {old.lookups:>12} {new.lookups:>12} "
+              f"{old_ms:>9.1f} {new_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
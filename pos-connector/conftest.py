@@ -0,0 +1,15 @@
+"""
+Shared pytest configuration: the connector modules log to the install directory,
+so the test run points them at a temporary directory instead
+"""
+
+import os
+import shutil
+import tempfile
+
+_log_dir = tempfile.mkdtemp(prefix='pos-connector-logs-')
+os.environ['POS_CONNECTOR_LOG_DIR'] = _log_dir
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_log_dir, ignore_errors=True)
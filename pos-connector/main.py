@@ -18,17 +18,13 @@ from typing import Dict, Any, Optional, List
 # Add current directory to Python path
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-from pos_connector.bridge import POSConnector
-from pos_connector.ubl import UBLInvoiceGenerator
-from pos_connector.printer import Printer
-from pos_connector.laravel_api import LaravelAPI
-from pos_connector.watcher import start_watcher, INVOICE_FOLDER
-from pos_connector.enhanced_connector import EnhancedPOSConnector
-from pos_connector.database_scanner import DatabaseScanner
-from pos_connector.network_scanner import NetworkScanner
-from pos_connector.registry_scanner import RegistryScanner
-from pos_connector.service_manager import WindowsServiceManager
-from pos_connector.folder_detector import InvoiceFolderDetector
+# Connector modules are imported where they are used, so each mode only loads
+# what it needs (see benchmarks/bench_startup.py for the import-time budget)
+
+def _service_manager():
+    """Create the Windows service manager (imports pywin32 on demand)"""
+    from pos_connector.service_manager import WindowsServiceManager
+    return WindowsServiceManager({})
 
 def test_api_connectivity(config):
     """Test basic API connectivity"""
@@ -115,6 +111,8 @@ def setup_wizard():
     config['detection_mode'] = detection_mode
 
     if detection_mode == "2":
+        from pos_connector.watcher import INVOICE_FOLDER
+
         # File monitoring configuration with user choice
         print("\n--- Invoice Folder Configuration ---")
         print("Choose how to configure the invoice folder:")
@@ -128,6 +126,7 @@ def setup_wizard():
             print("\n🔍 Scanning for POS invoice folders...")
             print("This may take a few moments...")
 
+            from pos_connector.folder_detector import InvoiceFolderDetector
             folder_detector = InvoiceFolderDetector()
             auto_detected = folder_detector.suggest_folders_interactive()
 
@@ -226,6 +225,7 @@ async def main():
             # Enhanced automatic detection mode
             print("🔍 Starting automatic POS system detection...")
 
+            from pos_connector.enhanced_connector import EnhancedPOSConnector
             connector = EnhancedPOSConnector(config)
 
             # Test API connection first
@@ -267,6 +267,9 @@ async def main():
             # File monitoring mode (legacy)
             print("📁 Starting file monitoring mode...")
 
+            from pos_connector.laravel_api import LaravelAPI
+            from pos_connector.watcher import start_watcher, INVOICE_FOLDER
+
             api = LaravelAPI(
                 base_url=config['base_url'],
                 email=config['email'],
@@ -335,7 +338,7 @@ if __name__ == "__main__":
             sys.exit(0)
         elif command == "install":
             try:
-                service_manager = WindowsServiceManager({})
+                service_manager = _service_manager()
                 service_manager.install_service()
                 print("✅ Service installed successfully")
                 print("Use 'python main.py start' to start the service")
@@ -344,7 +347,7 @@ if __name__ == "__main__":
                 sys.exit(1)
         elif command == "uninstall":
             try:
-                service_manager = WindowsServiceManager({})
+                service_manager = _service_manager()
                 service_manager.uninstall_service()
                 print("✅ Service uninstalled successfully")
             except Exception as e:
@@ -352,7 +355,7 @@ if __name__ == "__main__":
                 sys.exit(1)
         elif command == "start":
             try:
-                service_manager = WindowsServiceManager({})
+                service_manager = _service_manager()
                 service_manager.start_service()
                 print("✅ Service started successfully")
             except Exception as e:
@@ -360,7 +363,7 @@ if __name__ == "__main__":
                 sys.exit(1)
         elif command == "stop":
             try:
-                service_manager = WindowsServiceManager({})
+                service_manager = _service_manager()
                 service_manager.stop_service()
                 print("✅ Service stopped successfully")
             except Exception as e:
@@ -368,7 +371,7 @@ if __name__ == "__main__":
                 sys.exit(1)
         elif command == "restart":
             try:
-                service_manager = WindowsServiceManager({})
+                service_manager = _service_manager()
                 service_manager.restart_service()
                 print("✅ Service restarted successfully")
             except Exception as e:
@@ -376,7 +379,7 @@ if __name__ == "__main__":
                 sys.exit(1)
         elif command == "status":
             try:
-                service_manager = WindowsServiceManager({})
+                service_manager = _service_manager()
                 status = service_manager.get_service_status()
                 print(f"Service Status: {status}")
             except Exception as e:
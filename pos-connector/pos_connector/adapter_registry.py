@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Lazy POS adapter registry
+Adapters are referenced by import path and only imported and instantiated when first needed
+"""
+
+import importlib
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Type
+
+# Adapter key -> "module:ClassName"; relative modules are resolved against this package
+ADAPTER_PATHS = {
+    'square': '.pos_adapters:SquarePOSAdapter',
+    'shopify': '.pos_adapters:ShopifyPOSAdapter',
+    'quickbooks': '.pos_adapters:QuickBooksPOSAdapter',
+    'sage': '.pos_adapters:SagePOSAdapter',
+    'dynamics': '.pos_adapters:DynamicsPOSAdapter',
+    'generic_sql': '.pos_adapters:GenericSQLAdapter',
+    'generic_file': '.pos_adapters:GenericFileAdapter',
+    'generic_api': '.pos_adapters:GenericAPIAdapter',
+    'odbc': '.pos_adapters:ODBCAdapter',
+    'csv': '.pos_adapters:CSVAdapter',
+    'xml': '.pos_adapters:XMLAdapter',
+    'json': '.pos_adapters:JSONAdapter',
+    'excel': '.pos_adapters:ExcelAdapter',
+    'access': '.pos_adapters:AccessAdapter',
+    'foxpro': '.pos_adapters:FoxProAdapter',
+    'dbase': '.pos_adapters:DBaseAdapter',
+    'firebird': '.pos_adapters:FirebirdAdapter',
+    'sqlite': '.pos_adapters:SQLiteAdapter',
+    'mysql': '.pos_adapters:MySQLAdapter',
+    'postgresql': '.pos_adapters:PostgreSQLAdapter',
+    'mssql': '.pos_adapters:MSSQLAdapter',
+    'oracle': '.pos_adapters:OracleAdapter',
+    'registry': '.pos_adapters:RegistryAdapter',
+    'network': '.pos_adapters:NetworkAdapter',
+    'service': '.pos_adapters:ServiceAdapter',
+    'com': '.pos_adapters:COMAdapter',
+    'wmi': '.pos_adapters:WMIAdapter',
+    'aronium': '.pos_adapters:AroniumPOSAdapter',
+    'universal': '.pos_adapters:UniversalPOSAdapter',
+}
+
+
+class AdapterRegistry:
+    """
+    Dictionary-like registry of POS adapters that loads adapters on demand.
+
+    Only import paths are kept at startup. ``get(key)`` imports the adapter's
+    module and creates the shared instance the first time a system needs it;
+    ``adapter_class(key)`` imports the class without creating an instance.
+    Additional adapters can be added with ``register`` (for example from config)
+    without touching this module.
+    """
+
+    def __init__(self, paths: Optional[Dict[str, str]] = None, logger: Optional[logging.Logger] = None):
+        self.paths = dict(ADAPTER_PATHS if paths is None else paths)
+        self.logger = logger or logging.getLogger('AdapterRegistry')
+        self._classes: Dict[str, Type] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, key: str, path: str):
+        """Register (or replace) an adapter by "module:ClassName" import path"""
+        with self._lock:
+            self.paths[key] = path
+            self._classes.pop(key, None)
+            self._instances.pop(key, None)
+
+    def adapter_class(self, key: str) -> Type:
+        """Import and return the adapter class registered under key"""
+        with self._lock:
+            adapter_class = self._classes.get(key)
+            if adapter_class is None:
+                module_name, _, class_name = self.paths[key].partition(':')
+                module = importlib.import_module(module_name, package=__package__)
+                adapter_class = getattr(module, class_name)
+                self._classes[key] = adapter_class
+                self.logger.debug(f"Loaded adapter {key} ({class_name})")
+            return adapter_class
+
+    def get(self, key: Optional[str], default: Any = None) -> Any:
+        """Return the shared adapter instance for key, creating it on first use"""
+        if key not in self.paths:
+            return default
+
+        with self._lock:
+            adapter = self._instances.get(key)
+            if adapter is None:
+                try:
+                    adapter = self.adapter_class(key)()
+                except Exception as e:
+                    self.logger.error(f"Failed to load adapter {key}: {e}")
+                    return default
+                self._instances[key] = adapter
+            return adapter
+
+    def __getitem__(self, key: str) -> Any:
+        adapter = self.get(key)
+        if adapter is None:
+            raise KeyError(key)
+        return adapter
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.paths
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def keys(self) -> List[str]:
+        return list(self.paths)
+
+    def loaded(self) -> List[str]:
+        """Keys of adapters that have been instantiated"""
+        return list(self._instances)
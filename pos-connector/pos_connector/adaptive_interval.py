@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Adaptive polling interval per source
+Follows each source's observed transaction rate within bounds and backs off during closed hours
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+
+def parse_closed_hours(ranges: Optional[List[str]]) -> List[Tuple[int, int]]:
+    """Parse ["22:00-07:00", ...] into (start, end) minutes after midnight; ranges may wrap midnight"""
+    parsed = []
+    for value in ranges or []:
+        start, _, end = str(value).partition('-')
+        parsed.append((_minutes(start), _minutes(end)))
+    return parsed
+
+
+def _minutes(value: str) -> int:
+    hours, _, minutes = value.strip().partition(':')
+    return (int(hours) * 60 + int(minutes or 0)) % (24 * 60)
+
+
+class AdaptiveInterval:
+    """
+    Poll interval that tracks a source's rate of new transactions.
+
+    After each poll ``record(count)`` folds the number of new transactions into
+    an exponentially weighted rate and returns the next interval: the time in
+    which the source is expected to produce ``target_per_poll`` transactions,
+    clamped to [min_interval, max_interval]. A busy checkout is polled often
+    and a dormant database drifts towards max_interval, since its rate decays
+    with every empty poll. Inside configured closed hours the interval is
+    ``closed_interval``, shortened so the first poll after opening is on time,
+    and those polls do not count towards the rate.
+    """
+
+    DEFAULT_MIN_INTERVAL = 5
+    DEFAULT_MAX_INTERVAL = 600
+    DEFAULT_CLOSED_INTERVAL = 1800
+    DEFAULT_TARGET_PER_POLL = 1.0
+    # Weight of the latest poll in the rate estimate
+    SMOOTHING = 0.3
+
+    def __init__(self, base_interval: float, min_interval: float = DEFAULT_MIN_INTERVAL,
+                 max_interval: float = DEFAULT_MAX_INTERVAL, closed_hours: Optional[List[str]] = None,
+                 closed_interval: float = DEFAULT_CLOSED_INTERVAL,
+                 target_per_poll: float = DEFAULT_TARGET_PER_POLL):
+        self.min_interval = float(min_interval)
+        self.max_interval = max(self.min_interval, float(max_interval))
+        self.base_interval = self._clamp(float(base_interval))
+        self.closed_hours = parse_closed_hours(closed_hours)
+        self.closed_interval = float(closed_interval)
+        self.target_per_poll = float(target_per_poll)
+        self.rate: Optional[float] = None  # transactions per second
+        self.interval = self.base_interval
+        self._last_poll: Optional[float] = None
+
+    def record(self, count: int, now: Optional[float] = None) -> float:
+        """Record the result of a poll at now (epoch seconds) and return the next interval"""
+        now = time.time() if now is None else now
+
+        # Quiet closed hours say nothing about the rate while open, so they are not recorded
+        until_open = self.seconds_until_open(now)
+        if until_open:
+            self._last_poll = now
+            return max(self.min_interval, min(self.closed_interval, until_open))
+
+        if self._last_poll is not None and now > self._last_poll:
+            observed = count / (now - self._last_poll)
+            if self.rate is None:
+                self.rate = observed
+            else:
+                self.rate = self.SMOOTHING * observed + (1 - self.SMOOTHING) * self.rate
+        self._last_poll = now
+
+        if self.rate is None:
+            self.interval = self.base_interval
+        elif self.rate > 0:
+            self.interval = self._clamp(self.target_per_poll / self.rate)
+        else:
+            # No transaction seen yet: back off gradually rather than jumping to the maximum
+            self.interval = self._clamp(self.interval * 2)
+        return self.interval
+
+    def next_interval(self, now: Optional[float] = None) -> float:
+        """Current interval without recording a poll (for ticks skipped because nothing changed)"""
+        now = time.time() if now is None else now
+        until_open = self.seconds_until_open(now)
+        if until_open:
+            return max(self.min_interval, min(self.closed_interval, until_open))
+        return self.interval
+
+    def seconds_until_open(self, now: float) -> float:
+        """Seconds until the current closed period ends, or 0 when open"""
+        if not self.closed_hours:
+            return 0.0
+
+        moment = datetime.fromtimestamp(now)
+        minute = moment.hour * 60 + moment.minute
+        for start, end in self.closed_hours:
+            if start <= end:
+                closed = start <= minute < end
+                days = 0
+            else:
+                closed = minute >= start or minute < end
+                days = 1 if minute >= start else 0
+            if closed:
+                midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+                opening = midnight + timedelta(days=days, minutes=end)
+                return (opening - moment).total_seconds()
+        return 0.0
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval, max(self.min_interval, interval))
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Micro-batching sender for the transaction outbox
+Groups claimed rows into batches by count, size and time window, with several batches in flight
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable
+
+from .circuit_breaker import CircuitOpenError
+
+
+class BatchSender:
+    """
+    Drains a ``TransactionOutbox`` through ``send_batch(rows)``.
+
+    A batch is dispatched as soon as it holds ``max_count`` rows or
+    ``max_bytes`` of stored transaction data. A smaller batch is dispatched at
+    once when no other batch is in flight, so a lone transaction on an idle
+    connector is not delayed; while batches are in flight it lingers up to
+    ``max_wait`` seconds collecting more rows. At most ``max_in_flight`` batches
+    are sent at the same time; rows are only claimed once a slot is free, so
+    the backlog stays in the outbox rather than in memory.
+
+    ``send_batch`` receives the claimed rows and returns ``{row id: error}``,
+    with None for each row the API accepted. Only the rows that failed are
+    marked failed, with their own reason. Rows missing from the result were
+    not sent and go back to pending, as does the whole batch when
+    ``send_batch`` raises ``CircuitOpenError``. While the API ``circuit`` is
+    open no rows are claimed at all; once it is due for a probe, the next
+    batch is the probe.
+    """
+
+    MAX_COUNT = 200
+    MAX_BYTES = 1024 * 1024
+    MAX_WAIT = 0.5
+    MAX_IN_FLIGHT = 4
+    # How long an idle sender sleeps between checks of the outbox
+    IDLE_WAIT = 5
+
+    def __init__(self, outbox, send_batch: Callable[[List[Dict[str, Any]]], Dict[int, Optional[str]]],
+                 max_count: int = MAX_COUNT, max_bytes: int = MAX_BYTES, max_wait: float = MAX_WAIT,
+                 max_in_flight: int = MAX_IN_FLIGHT, circuit=None, logger: Optional[logging.Logger] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.outbox = outbox
+        self.send_batch = send_batch
+        self.max_count = max(1, max_count)
+        self.max_bytes = max(1, max_bytes)
+        self.max_wait = max(0.0, max_wait)
+        self.max_in_flight = max(1, max_in_flight)
+        self.circuit = circuit
+        self.logger = logger or logging.getLogger('BatchSender')
+        self.clock = clock
+        self._slots = threading.Semaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.stats = {'batches': 0, 'delivered': 0, 'failed': 0, 'released': 0}
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return self._in_flight
+
+    def run(self, running: Callable[[], bool]):
+        """Send batches until running() returns False, then wait for the batches in flight"""
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='BatchSender')
+        try:
+            while running():
+                paused = self.circuit.retry_after() if self.circuit else 0
+                if paused:
+                    # API down: leave the backlog pending and wait for the probe to be due
+                    time.sleep(min(paused, 1))
+                    continue
+                if not self._slots.acquire(timeout=1):
+                    continue
+                dispatched = False
+                try:
+                    batch = self._collect(running)
+                    if batch and not running():
+                        # Unsent rows go back to pending for the next run
+                        self.outbox.release([row['id'] for row in batch])
+                    elif batch:
+                        with self._lock:
+                            self._in_flight += 1
+                        executor.submit(self._send, batch)
+                        dispatched = True
+                except Exception as e:
+                    self.logger.error(f"Error processing outbox: {e}")
+                    time.sleep(5)
+                finally:
+                    if not dispatched:
+                        self._slots.release()
+        finally:
+            executor.shutdown(wait=True)
+
+    def _collect(self, running: Callable[[], bool]) -> List[Dict[str, Any]]:
+        """Claim the next batch, lingering for more rows only while other batches are in flight"""
+        batch = self.outbox.claim(self.max_count)
+        if not batch:
+            self.outbox.ready.wait(timeout=self.IDLE_WAIT)
+            return []
+
+        deadline = self.clock() + self.max_wait
+        while (len(batch) < self.max_count and self._size(batch) < self.max_bytes
+               and self.in_flight and running()):
+            remaining = deadline - self.clock()
+            if remaining <= 0 or not self.outbox.ready.wait(timeout=remaining):
+                break
+            batch.extend(self.outbox.claim(self.max_count - len(batch)))
+
+        return self._fit(batch)
+
+    def _fit(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Trim the batch to max_bytes (keeping at least one row), returning the rest to pending"""
+        total = 0
+        for position, row in enumerate(batch):
+            total += row.get('size', 0)
+            if total > self.max_bytes and position:
+                self.outbox.release([rest['id'] for rest in batch[position:]])
+                return batch[:position]
+        return batch
+
+    @staticmethod
+    def _size(batch: List[Dict[str, Any]]) -> int:
+        return sum(row.get('size', 0) for row in batch)
+
+    def _send(self, batch: List[Dict[str, Any]]):
+        try:
+            try:
+                results = self.send_batch(batch) or {}
+            except CircuitOpenError as e:
+                self.logger.debug(f"Batch of {len(batch)} transactions not sent: {e}")
+                results = {}
+            except Exception as e:
+                self.logger.error(f"Error sending batch of {len(batch)} transactions: {e}")
+                results = {row['id']: str(e) for row in batch}
+
+            delivered, failed, unsent = [], {}, []
+            for row in batch:
+                if row['id'] not in results:
+                    unsent.append(row['id'])
+                elif results[row['id']] is None:
+                    delivered.append(row['id'])
+                else:
+                    failed.setdefault(results[row['id']], []).append(row['id'])
+
+            self.outbox.mark_delivered(delivered)
+            for error, ids in failed.items():
+                self.outbox.mark_failed(ids, error)
+            self.outbox.release(unsent)
+            with self._lock:
+                self.stats['batches'] += 1
+                self.stats['delivered'] += len(delivered)
+                self.stats['failed'] += len(batch) - len(delivered) - len(unsent)
+                self.stats['released'] += len(unsent)
+        except Exception as e:
+            # Rows stay claimed and are returned to pending by the next start-up
+            self.logger.error(f"Error recording batch results: {e}")
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
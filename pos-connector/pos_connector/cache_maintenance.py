@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Retention and compaction of the local cache in pos_cache.db
+Old sync history is pruned and freed pages returned to the disk in small steps while the connector is idle
+"""
+
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from .cache_schema import encode_payload, decode_payload
+from .cache_writer import CacheWriter
+from .outbox import TransactionOutbox
+from .dedup import TransactionDeduplicator
+
+
+class CacheMaintenance:
+    """
+    Keeps pos_cache.db the size of its retention window rather than of its history.
+
+    Once the cache writer and the outbox have been idle for ``idle_after``
+    seconds (see ``idle_for``), each step
+    deletes up to ``delete_chunk`` rows past their retention window from
+    ``sync_log`` and ``cached_transactions`` (through the created_at indexes),
+    the hourly sync rollups of the same age (daily rollups are kept), the
+    finished rows of the ``outbox`` (see ``TransactionOutbox.prune``) and the
+    expired ``transaction_hashes`` (the deduplicator's Bloom filter is rebuilt
+    once they are all gone),
+    compresses up to ``compress_chunk`` payloads stored as JSON text by older
+    versions, and returns up to ``vacuum_pages`` free pages to the file system
+    with ``PRAGMA incremental_vacuum``. Steps are submitted to the cache writer
+    as background writes, so they are serialized with the connector's own
+    writes and a step never holds the database for long; stepping stops as
+    soon as the connector writes again.
+
+    Retention is in days; ``None`` or 0 keeps rows forever. Unsent rows
+    (``processed = 0``) have their own, longer window. Databases created
+    before incremental auto-vacuum are only converted when ``convert`` is set:
+    the single ``VACUUM`` rewrites the whole file and blocks every writer while
+    it runs, so it waits for the first idle period after the retention backlog
+    has been pruned.
+    """
+
+    SYNC_LOG_DAYS = 90
+    PROCESSED_DAYS = 30
+    FAILED_DAYS = 180
+    DELETE_CHUNK = 2000
+    COMPRESS_CHUNK = 500
+    VACUUM_PAGES = 256
+    IDLE_AFTER = 30
+    CHECK_INTERVAL = 60
+    STEP_PAUSE = 0.5
+
+    def __init__(self, db_path, cache_writer: CacheWriter, logger: Optional[logging.Logger] = None,
+                 sync_log_days: Optional[float] = SYNC_LOG_DAYS, processed_days: Optional[float] = PROCESSED_DAYS,
+                 failed_days: Optional[float] = FAILED_DAYS, delete_chunk: int = DELETE_CHUNK,
+                 compress_chunk: int = COMPRESS_CHUNK, vacuum_pages: int = VACUUM_PAGES,
+                 idle_after: float = IDLE_AFTER, check_interval: float = CHECK_INTERVAL,
+                 step_pause: float = STEP_PAUSE, convert: bool = False,
+                 outbox: Optional[TransactionOutbox] = None,
+                 outbox_days: Optional[float] = TransactionOutbox.DELIVERED_DAYS,
+                 failed_outbox_rows: Optional[int] = TransactionOutbox.MAX_FAILED,
+                 deduplicator: Optional[TransactionDeduplicator] = None,
+                 hash_days: Optional[float] = TransactionDeduplicator.HASH_DAYS):
+        self.db_path = Path(db_path)
+        self.cache_writer = cache_writer
+        self.logger = logger or logging.getLogger('CacheMaintenance')
+        self.sync_log_days = sync_log_days
+        self.processed_days = processed_days
+        self.failed_days = failed_days
+        self.delete_chunk = max(1, delete_chunk)
+        self.compress_chunk = max(0, compress_chunk)
+        self.vacuum_pages = max(0, vacuum_pages)
+        self.idle_after = idle_after
+        self.check_interval = check_interval
+        self.step_pause = step_pause
+        self.convert = convert
+        self.outbox = outbox
+        self.outbox_days = outbox_days
+        self.failed_outbox_rows = failed_outbox_rows
+        self.deduplicator = deduplicator
+        self.hash_days = hash_days
+        # Hashes were deleted since the Bloom filter was last rebuilt
+        self._hashes_pruned = False
+        # Highest cached_transactions id checked for uncompressed payloads, None once all are compressed
+        self._compress_from: Optional[int] = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'sync_log_deleted': 0, 'transactions_deleted': 0, 'rollups_deleted': 0,
+                      'outbox_deleted': 0, 'hashes_deleted': 0, 'compressed': 0, 'pages_freed': 0, 'steps': 0}
+
+    def init_schema(self, cursor: sqlite3.Cursor):
+        """Create new databases with incremental auto-vacuum; must run before the first table is created"""
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+
+    def start(self):
+        """Start the background maintenance thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='CacheMaintenance')
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop after the step in progress"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            try:
+                while self.idle_for() >= self.idle_after and not self._stop.is_set():
+                    if not self.step():
+                        self._convert_if_needed()
+                        break
+                    self._stop.wait(self.step_pause)
+            except Exception as e:
+                self.logger.error(f"Error maintaining the cache database: {e}")
+
+    def idle_for(self) -> float:
+        """Seconds the connector has written nothing: to the cache, or to the outbox and its dedup hashes"""
+        idle = self.cache_writer.idle_for()
+        if self.outbox is not None:
+            idle = min(idle, self.outbox.idle_for())
+        return idle
+
+    def step(self, timeout: Optional[float] = 30) -> bool:
+        """Run one maintenance step through the cache writer; False when there was nothing left to do"""
+        result = {}
+        self.cache_writer.submit(lambda cursor: result.update(self._step(cursor)), background=True)
+        if not self.cache_writer.flush(timeout) or not result:
+            return False
+        self.stats['steps'] += 1
+        for key, value in result.items():
+            self.stats[key] += value
+        if result['hashes_deleted']:
+            self._hashes_pruned = True
+        elif self._hashes_pruned:
+            self._hashes_pruned = False
+            self.deduplicator.reset_filter()
+        return any(result.values())
+
+    def _step(self, cursor: sqlite3.Cursor) -> Dict[str, int]:
+        sync_log_deleted = self._delete_expired(cursor, 'sync_log', '', self.sync_log_days)
+        transactions_deleted = (
+            self._delete_expired(cursor, 'cached_transactions', 'processed = 1 AND', self.processed_days)
+            + self._delete_expired(cursor, 'cached_transactions', 'processed = 0 AND', self.failed_days)
+        )
+        return {
+            'sync_log_deleted': sync_log_deleted,
+            'transactions_deleted': transactions_deleted,
+            'rollups_deleted': self._delete_expired_rollups(cursor),
+            'outbox_deleted': self._prune_outbox(cursor),
+            'hashes_deleted': self._prune_hashes(cursor),
+            'compressed': self._compress_legacy(cursor),
+            'pages_freed': self._vacuum(cursor),
+        }
+
+    def _delete_expired(self, cursor: sqlite3.Cursor, table: str, condition: str, days: Optional[float]) -> int:
+        if not days or days <= 0:
+            return 0
+        cursor.execute(f'''
+            DELETE FROM {table} WHERE id IN (
+                SELECT id FROM {table}
+                WHERE {condition} created_at < datetime('now', ?)
+                LIMIT ?
+            )
+        ''', (f'-{float(days)} days', self.delete_chunk))
+        return cursor.rowcount
+
+    def _delete_expired_rollups(self, cursor: sqlite3.Cursor) -> int:
+        """Hourly rollups older than the sync_log window; their days remain in the daily rollups"""
+        if not self.sync_log_days or self.sync_log_days <= 0:
+            return 0
+        cursor.execute('''
+            DELETE FROM sync_rollup_hourly
+            WHERE hour < strftime('%Y-%m-%d %H:00:00', 'now', ?, 'localtime')
+        ''', (f'-{float(self.sync_log_days)} days',))
+        return cursor.rowcount
+
+    def _prune_outbox(self, cursor: sqlite3.Cursor) -> int:
+        if self.outbox is None:
+            return 0
+        return self.outbox.prune(cursor, self.outbox_days, self.failed_outbox_rows, self.delete_chunk)
+
+    def _prune_hashes(self, cursor: sqlite3.Cursor) -> int:
+        if self.deduplicator is None:
+            return 0
+        return self.deduplicator.prune(cursor, self.hash_days, self.delete_chunk)
+
+    def _compress_legacy(self, cursor: sqlite3.Cursor) -> int:
+        """Rewrite the next chunk of JSON text payloads in compressed form"""
+        if self._compress_from is None or not self.compress_chunk:
+            return 0
+        cursor.execute('''
+            SELECT id, transaction_data FROM cached_transactions
+            WHERE id > ? AND typeof(transaction_data) = 'text'
+            ORDER BY id LIMIT ?
+        ''', (self._compress_from, self.compress_chunk))
+        rows = cursor.fetchall()
+        if len(rows) < self.compress_chunk:
+            # New rows are written compressed, so there is nothing further to find
+            self._compress_from = None
+        elif rows:
+            self._compress_from = rows[-1][0]
+
+        updates = []
+        for row_id, transaction_data in rows:
+            try:
+                updates.append((encode_payload(decode_payload(transaction_data)), row_id))
+            except ValueError:
+                # Not valid JSON; left as it is
+                continue
+        cursor.executemany("UPDATE cached_transactions SET transaction_data = ? WHERE id = ?", updates)
+        return len(updates)
+
+    def _vacuum(self, cursor: sqlite3.Cursor) -> int:
+        if not self.vacuum_pages:
+            return 0
+        cursor.execute('PRAGMA auto_vacuum')
+        if cursor.fetchone()[0] != 2:
+            return 0
+        cursor.execute('PRAGMA freelist_count')
+        pages = min(self.vacuum_pages, cursor.fetchone()[0])
+        # sqlite3 steps a statement without result columns only once, and each step frees one page
+        for _ in range(pages):
+            cursor.execute('PRAGMA incremental_vacuum(1)')
+        return pages
+
+    def _convert_if_needed(self):
+        """Switch a database created without auto-vacuum to incremental auto-vacuum, once"""
+        if not self.convert or self.idle_for() < self.idle_after:
+            return
+        self.convert = False
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+                return
+            self.logger.info("Converting pos_cache.db to incremental auto-vacuum (one-time VACUUM)")
+            start = time.monotonic()
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+            self.logger.info(f"pos_cache.db converted in {time.monotonic() - start:.1f}s")
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not convert pos_cache.db to incremental auto-vacuum: {e}")
+        finally:
+            conn.close()
+
+    def status(self) -> Dict[str, Any]:
+        return dict(self.stats, running=self._thread is not None and self._thread.is_alive())
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Versioned schema of the local cache tables in pos_cache.db
+Migrations are numbered and recorded in PRAGMA user_version, so each runs exactly once per database
+"""
+
+import json
+import zlib
+import sqlite3
+import logging
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+
+def encode_payload(transaction: Dict[str, Any]) -> bytes:
+    """Stored form of cached_transactions.transaction_data: compact JSON, zlib-compressed"""
+    return zlib.compress(json.dumps(transaction, separators=(',', ':'), default=str).encode('utf-8'))
+
+
+def decode_payload(value) -> Dict[str, Any]:
+    """Transaction from cached_transactions.transaction_data; rows written before compression hold JSON text"""
+    if isinstance(value, (bytes, memoryview)):
+        value = zlib.decompress(value).decode('utf-8')
+    return json.loads(value)
+
+
+def _index_cache_tables(cursor: sqlite3.Cursor):
+    """Index the cache lookups and give each cache-owned pos_systems row a unique name"""
+    # Rows written by the cache (not by discovery) used to be looked up by name alone,
+    # and concurrent writers could insert the same name twice: keep the oldest row
+    cursor.execute('''
+        SELECT name, MIN(id) FROM pos_systems
+        WHERE discovery_method IS NULL
+        GROUP BY name HAVING COUNT(*) > 1
+    ''')
+    for name, keep_id in cursor.fetchall():
+        cursor.execute("SELECT id FROM pos_systems WHERE name = ? AND discovery_method IS NULL AND id != ?",
+                       (name, keep_id))
+        duplicate_ids = [(keep_id, row[0]) for row in cursor.fetchall()]
+        cursor.executemany("UPDATE sync_log SET pos_system_id = ? WHERE pos_system_id = ?", duplicate_ids)
+        cursor.executemany("UPDATE cached_transactions SET pos_system_id = ? WHERE pos_system_id = ?", duplicate_ids)
+        cursor.executemany("DELETE FROM pos_systems WHERE id = ?", [(row_id,) for _, row_id in duplicate_ids])
+
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_pos_systems_cache_name
+        ON pos_systems (name) WHERE discovery_method IS NULL
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sync_log_transaction ON sync_log (transaction_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sync_log_created ON sync_log (created_at)')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cached_transactions_processed
+        ON cached_transactions (processed, created_at)
+    ''')
+
+
+def _add_retry_columns(cursor: sqlite3.Cursor):
+    """Track attempts, the next attempt time and the last error of unsent cached transactions"""
+    cursor.execute('ALTER TABLE cached_transactions ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0')
+    cursor.execute('ALTER TABLE cached_transactions ADD COLUMN next_attempt_at TIMESTAMP')
+    cursor.execute('ALTER TABLE cached_transactions ADD COLUMN queued_at TIMESTAMP')
+    cursor.execute('ALTER TABLE cached_transactions ADD COLUMN last_error TEXT')
+    # Failures from before the upgrade were never retried: they are due now
+    cursor.execute('''
+        UPDATE cached_transactions SET attempts = 1, next_attempt_at = CURRENT_TIMESTAMP
+        WHERE processed = 0
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cached_transactions_retry
+        ON cached_transactions (next_attempt_at) WHERE processed = 0 AND next_attempt_at IS NOT NULL
+    ''')
+
+
+def _add_sync_rollups(cursor: sqlite3.Cursor):
+    """Hourly and daily rollups of sync_log per source and status, backfilled with counts"""
+    for table, column, bucket in (('sync_rollup_hourly', 'hour', '%Y-%m-%d %H:00:00'),
+                                  ('sync_rollup_daily', 'day', '%Y-%m-%d')):
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                pos_system_id INTEGER NOT NULL,
+                {column} TEXT NOT NULL,
+                status TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                total_amount REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (pos_system_id, {column}, status)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})')
+        # sync_log has no amounts; created_at is UTC and the buckets are local time
+        cursor.execute(f'''
+            INSERT INTO {table} (pos_system_id, {column}, status, count)
+            SELECT pos_system_id, strftime('{bucket}', created_at, 'localtime'), sync_status, COUNT(*)
+            FROM sync_log
+            WHERE pos_system_id IS NOT NULL AND sync_status IS NOT NULL AND created_at IS NOT NULL
+            GROUP BY 1, 2, 3
+        ''')
+
+
+# (version, description, migration); append only, never renumber or edit a released migration
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, 'index cache lookups, unique cache-owned pos_systems names', _index_cache_tables),
+    (2, 'retry schedule of unsent cached transactions', _add_retry_columns),
+    (3, 'hourly and daily sync rollups', _add_sync_rollups),
+]
+
+
+class CacheSchema:
+    """
+    The ``pos_systems``, ``sync_log`` and ``cached_transactions`` tables.
+
+    ``init_schema`` creates the tables as they were first released, like the
+    other stores in pos_cache.db. Every later change is a numbered entry in
+    ``MIGRATIONS``: ``migrate`` applies those newer than the database's
+    ``user_version``, each in its own savepoint together with the version bump,
+    so an interrupted upgrade resumes at the migration that failed.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger('CacheSchema')
+
+    @property
+    def latest_version(self) -> int:
+        return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+    def init_schema(self, cursor: sqlite3.Cursor):
+        """Create the cache tables"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pos_systems (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                type TEXT NOT NULL,
+                connection_string TEXT,
+                config TEXT,
+                status TEXT DEFAULT 'active',
+                last_sync TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sync_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                pos_system_id INTEGER,
+                transaction_id TEXT,
+                sync_status TEXT,
+                error_message TEXT,
+                data_hash TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (pos_system_id) REFERENCES pos_systems (id)
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cached_transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                pos_system_id INTEGER,
+                transaction_id TEXT UNIQUE,
+                transaction_data TEXT,
+                processed INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (pos_system_id) REFERENCES pos_systems (id)
+            )
+        ''')
+
+    def version(self, cursor: sqlite3.Cursor) -> int:
+        cursor.execute('PRAGMA user_version')
+        return cursor.fetchone()[0]
+
+    def migrate(self, cursor: sqlite3.Cursor) -> int:
+        """Apply pending migrations; returns the schema version the database is at afterwards"""
+        current = self.version(cursor)
+        if current > self.latest_version:
+            self.logger.warning(f"pos_cache.db schema version {current} is newer than this connector "
+                                f"({self.latest_version}); leaving it unchanged")
+            return current
+
+        for version, description, migration in MIGRATIONS:
+            if version <= current:
+                continue
+            cursor.execute('SAVEPOINT cache_migration')
+            try:
+                migration(cursor)
+                cursor.execute(f'PRAGMA user_version = {version}')
+                cursor.execute('RELEASE cache_migration')
+            except Exception:
+                cursor.execute('ROLLBACK TO cache_migration')
+                cursor.execute('RELEASE cache_migration')
+                raise
+            current = version
+            self.logger.info(f"Migrated pos_cache.db to schema version {version}: {description}")
+        return current
+
+
+class PosSystemIds:
+    """
+    In-process memo of the ``pos_systems`` row id of each cached source name.
+
+    Only the cache writer thread resolves ids, so the first write for a source
+    looks it up (or inserts it) through the unique name index and every later
+    write is a dictionary hit. The writer calls ``forget`` whenever it rolls a
+    write back, since an id inserted by that write no longer exists.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+
+    def resolve(self, cursor: sqlite3.Cursor, system: Dict[str, Any]) -> int:
+        """Row id of the source, inserting its row on first use"""
+        name = system.get('name')
+        system_id = self._ids.get(name)
+        if system_id is not None:
+            return system_id
+
+        cursor.execute("SELECT id FROM pos_systems WHERE name = ? AND discovery_method IS NULL", (name,))
+        result = cursor.fetchone()
+        if result:
+            system_id = result[0]
+        else:
+            cursor.execute('''
+                INSERT INTO pos_systems (name, type, config, status)
+                VALUES (?, ?, ?, ?)
+            ''', (name, system.get('type'), json.dumps(system), 'active'))
+            system_id = cursor.lastrowid
+        self._ids[name] = system_id
+        return system_id
+
+    def forget(self):
+        """Drop every memoized id; the next write of each source looks it up again"""
+        self._ids.clear()
+
+    def __len__(self) -> int:
+        return len(self._ids)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Single-writer service for the local cache in pos_cache.db
+Cache writes from every thread are queued and committed together on one WAL-mode connection
+"""
+
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable
+
+# Tells the writer thread to commit what it has and exit
+_STOP = object()
+
+
+class CacheWriter:
+    """
+    Owns the only connection that writes the cache tables.
+
+    ``submit`` queues a write, a function of an SQLite cursor, and returns at
+    once. A background thread takes every write queued within ``max_delay`` of
+    the first, up to ``max_batch``, and runs them in one transaction, so a busy
+    connector commits a few times a second instead of once per transaction and
+    monitor threads never wait on each other's locks. Each write runs in its own
+    savepoint: one that raises is rolled back and logged without losing the rest.
+    ``on_rollback`` is called on the writer thread as soon as a write is rolled
+    back, before the next write runs, so in-memory state derived from the
+    cache can be dropped.
+    Housekeeping is submitted with ``background=True``: it does not count as
+    activity, so ``idle_for`` measures how long the connector has written nothing.
+
+    The connection is in WAL mode, so readers and the outbox keep working while
+    the cache is written. ``flush`` blocks until everything submitted before it
+    is committed; ``stop`` flushes and closes the connection, and the next
+    ``submit`` starts the writer again.
+    """
+
+    MAX_BATCH = 1000
+    MAX_DELAY = 0.1
+
+    def __init__(self, db_path, logger: Optional[logging.Logger] = None,
+                 max_batch: int = MAX_BATCH, max_delay: float = MAX_DELAY,
+                 on_rollback: Optional[Callable[[], None]] = None):
+        self.db_path = Path(db_path)
+        self.logger = logger or logging.getLogger('CacheWriter')
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self.on_rollback = on_rollback
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._last_activity = time.monotonic()
+        self.stats = {'writes': 0, 'commits': 0, 'errors': 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        # Transactions are opened explicitly, so each batch is exactly one
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # Durable against a crash of the connector; a power cut may lose the last commits
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def start(self):
+        """Start the writer thread if it is not running"""
+        with self._lock:
+            self._start()
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True, name='CacheWriter')
+            self._thread.start()
+
+    def submit(self, write: Callable[[sqlite3.Cursor], None], background: bool = False):
+        """Queue a write; it is committed with the next batch"""
+        with self._lock:
+            self._start()
+            self._queue.put(write)
+            if not background:
+                self._last_activity = time.monotonic()
+
+    def pending(self) -> int:
+        """Writes and flushes queued but not yet taken by the writer"""
+        return self._queue.qsize()
+
+    def idle_for(self) -> float:
+        """Seconds since the last write that was not background, or 0 while writes are queued"""
+        if self.pending():
+            return 0.0
+        return time.monotonic() - self._last_activity
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every write submitted so far is committed; False if the timeout passed first"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                return self._queue.empty()
+            done = threading.Event()
+            self._queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """Commit everything submitted, close the connection and end the writer thread"""
+        with self._lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                return self._queue.empty()
+            self._queue.put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():
+            self.logger.warning(f"Cache writer did not stop within {timeout}s; {self.pending()} writes queued")
+            return False
+        return True
+
+    def _run(self):
+        try:
+            conn = self._connect()
+        except Exception as e:
+            self.logger.error(f"Cache writer could not open {self.db_path}: {e}")
+            with self._lock:
+                self._thread = None
+                dropped = []
+                while not self._queue.empty():
+                    dropped.append(self._queue.get_nowait())
+            # Nothing can be written: release anyone waiting in flush
+            self.stats['errors'] += sum(callable(item) for item in dropped)
+            for item in dropped:
+                if isinstance(item, threading.Event):
+                    item.set()
+            return
+
+        try:
+            while True:
+                batch = self._take()
+                self._commit(conn, batch)
+                if _STOP in batch:
+                    with self._lock:
+                        # Writes submitted after stop start the next batch instead of being lost
+                        if self._queue.empty():
+                            self._thread = None
+                            return
+        finally:
+            conn.close()
+
+    def _take(self) -> list:
+        """The next batch: the first item and whatever follows within max_delay, up to max_batch writes"""
+        item = self._queue.get()
+        batch = [item]
+        writes = 1 if callable(item) else 0
+        deadline = time.monotonic() + self.max_delay
+        while writes < self.max_batch and item is not _STOP:
+            if isinstance(item, threading.Event):
+                # Someone is waiting: commit now instead of lingering
+                deadline = 0
+            try:
+                remaining = deadline - time.monotonic()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            if callable(item):
+                writes += 1
+        return batch
+
+    def _commit(self, conn: sqlite3.Connection, batch: list):
+        writes = [item for item in batch if callable(item)]
+        if writes:
+            cursor = conn.cursor()
+            failed = 0
+            try:
+                cursor.execute('BEGIN')
+                for write in writes:
+                    cursor.execute('SAVEPOINT cache_write')
+                    try:
+                        write(cursor)
+                        cursor.execute('RELEASE cache_write')
+                    except Exception as e:
+                        cursor.execute('ROLLBACK TO cache_write')
+                        cursor.execute('RELEASE cache_write')
+                        # The next write must not reuse anything the failed one left in memory
+                        self._rolled_back()
+                        failed += 1
+                        self.logger.error(f"Error writing to the cache: {e}")
+                cursor.execute('COMMIT')
+                self.stats['writes'] += len(writes) - failed
+                self.stats['errors'] += failed
+                self.stats['commits'] += 1
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._rolled_back()
+                self.stats['errors'] += len(writes)
+                self.logger.error(f"Error committing {len(writes)} cache writes: {e}")
+
+        # Flushes return once the writes queued before them are committed (or have failed)
+        for item in batch:
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def _rolled_back(self):
+        if self.on_rollback is None:
+            return
+        try:
+            self.on_rollback()
+        except Exception as e:
+            self.logger.error(f"Error in cache writer rollback hook: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return dict(self.stats, pending=self.pending())
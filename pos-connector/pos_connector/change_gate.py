@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Change gate for file and SQLite sources
+Decides with a few stat calls whether a source may have new data before it is extracted
+"""
+
+import os
+import time
+import struct
+from typing import Dict, Iterable, Optional, Callable
+
+# Filesystems with coarse timestamps (FAT: 2s) can hide a write that keeps the size
+COARSE_MTIME_NS = 2 * 10**9
+
+
+class ChangeGate:
+    """
+    Cheap "has this source changed since the last extraction?" check.
+
+    Watched files are stamped with (size, mtime); SQLite files also with their
+    ``-wal`` file, because WAL commits do not touch the main file. When a
+    SQLite file was modified too recently for its mtime to be trusted, the
+    header file-change counter is read as well. Watched directories are
+    stamped with their mtime, which changes when files are added, removed or
+    renamed. An idle source therefore costs one ``stat`` per watched path.
+
+    ``changed()`` takes the stamps *before* extraction and ``mark_seen()``
+    commits them after a successful one, so writes made during an extraction
+    (or an extraction that failed) fire the gate again on the next tick. As a
+    safety net for changes no stamp reveals (for example an in-place edit of
+    a file in an unwatched subdirectory) the gate also fires once every
+    ``max_quiet`` seconds.
+    """
+
+    DEFAULT_MAX_QUIET = 900
+
+    def __init__(self, files: Iterable[str] = (), directories: Iterable[str] = (),
+                 sqlite_files: Iterable[str] = (), max_quiet: Optional[float] = DEFAULT_MAX_QUIET,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_quiet = max_quiet
+        self.clock = clock
+        self.files: set = set()
+        self.sqlite_files: set = set()
+        self.directories: set = set()
+        self._seen: Optional[Dict[str, tuple]] = None
+        self._pending: Dict[str, tuple] = {}
+        self._last_seen = 0.0
+        self.stats = {'checks': 0, 'skips': 0}
+        self.watch(files, directories, sqlite_files)
+
+    def watch(self, files: Iterable[str] = (), directories: Iterable[str] = (), sqlite_files: Iterable[str] = ()):
+        """
+        Replace the watched paths (e.g. with the files found by the latest scan)
+
+        Paths that were already stamped by ``changed()`` keep that stamp, so a
+        change made while the scan was running is still detected.
+        """
+        self.files = {path for path in files if path}
+        self.sqlite_files = {path for path in sqlite_files if path}
+        self.directories = {path for path in directories if path}
+        pending = {}
+        for key in self._keys():
+            pending[key] = self._pending[key] if key in self._pending else self._stamp(key)
+        self._pending = pending
+
+    def changed(self) -> bool:
+        """Stamp the watched paths and return True if they differ from the last extraction"""
+        self.stats['checks'] += 1
+        self._pending = {key: self._stamp(key) for key in self._keys()}
+
+        if self._seen is None or self._pending != self._seen:
+            return True
+        if self.max_quiet and self.clock() - self._last_seen >= self.max_quiet:
+            return True
+
+        self.stats['skips'] += 1
+        return False
+
+    def mark_seen(self):
+        """Record the stamps of the last ``changed()`` as extracted"""
+        self._seen = dict(self._pending)
+        self._last_seen = self.clock()
+
+    def _keys(self):
+        return ([('file', path) for path in self.files]
+                + [('sqlite', path) for path in self.sqlite_files]
+                + [('dir', path) for path in self.directories])
+
+    def _stamp(self, key: tuple) -> Optional[tuple]:
+        kind, path = key
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+
+        if kind == 'dir':
+            return (stat_result.st_mtime_ns,)
+
+        stamp = (stat_result.st_size, stat_result.st_mtime_ns)
+        if kind == 'sqlite':
+            try:
+                wal_stat = os.stat(path + '-wal')
+                stamp += (wal_stat.st_size, wal_stat.st_mtime_ns)
+            except OSError:
+                stamp += (0, 0)
+            if time.time_ns() - stat_result.st_mtime_ns < COARSE_MTIME_NS:
+                stamp += (self._change_counter(path),)
+        return stamp
+
+    @staticmethod
+    def _change_counter(path: str) -> Optional[int]:
+        """SQLite header file-change counter (bytes 24-27), incremented by every rollback-mode commit"""
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(28)
+        except OSError:
+            return None
+        return struct.unpack('>I', header[24:28])[0] if len(header) == 28 else None
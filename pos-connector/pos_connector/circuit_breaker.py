@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker for the API clients and the monitored sources
+After repeated failures calls are refused cheaply, and a single probe tests whether the other side is back
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional, Callable
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """A call was refused without being attempted because its circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker, safe to share between threads.
+
+    ``closed``: calls go through; ``failure_threshold`` failures in a row open
+    the circuit. ``open``: ``allow`` refuses every call until ``reset_timeout``
+    has passed, then lets exactly one probe through (``half_open``). A
+    successful probe closes the circuit; a failed one opens it again for twice
+    as long, up to ``max_reset_timeout``. Every allowed call must be followed
+    by ``record_success`` or ``record_failure``; ``call`` does both.
+    """
+
+    FAILURE_THRESHOLD = 5
+    RESET_TIMEOUT = 30
+    MAX_RESET_TIMEOUT = 600
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT, max_reset_timeout: float = MAX_RESET_TIMEOUT,
+                 logger: Optional[logging.Logger] = None, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max(reset_timeout, max_reset_timeout)
+        self.logger = logger or logging.getLogger('CircuitBreaker')
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self.failures = 0
+        self._timeout = reset_timeout
+        self._opened_at = 0.0
+        self._probe_started = 0.0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be made now; in an open circuit the first call after the timeout is the probe"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            now = self.clock()
+            if self._state == OPEN and now - self._opened_at < self._timeout:
+                return False
+            # A probe that never reported back does not block the circuit for good
+            if self._state == HALF_OPEN and now - self._probe_started < self._timeout:
+                return False
+            self._state = HALF_OPEN
+            self._probe_started = now
+        self.logger.info(f"Circuit {self.name} half-open: probing")
+        return True
+
+    def retry_after(self) -> float:
+        """Seconds until a call could be allowed (0 when closed or a probe is due)"""
+        with self._lock:
+            if self._state == CLOSED:
+                return 0.0
+            started = self._opened_at if self._state == OPEN else self._probe_started
+            return max(0.0, started + self._timeout - self.clock())
+
+    def record_success(self):
+        with self._lock:
+            recovered = self._state != CLOSED
+            self._state = CLOSED
+            self.failures = 0
+            self._timeout = self.reset_timeout
+        if recovered:
+            self.logger.info(f"Circuit {self.name} closed")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._state == HALF_OPEN:
+                # The probe failed: stay open, for longer each time
+                self._timeout = min(self._timeout * 2, self.max_reset_timeout)
+            elif self._state == OPEN or self.failures < self.failure_threshold:
+                return
+            self._state = OPEN
+            self._opened_at = self.clock()
+            timeout = self._timeout
+        self.logger.warning(f"Circuit {self.name} open after {self.failures} failures; next probe in {timeout:g}s")
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Run func through the breaker; raises CircuitOpenError if the circuit refuses it"""
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit {self.name} is open")
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        return {'state': self.state, 'failures': self.failures, 'retry_after': round(self.retry_after(), 1)}
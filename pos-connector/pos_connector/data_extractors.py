@@ -8,16 +8,11 @@ import json
 import sqlite3
 import csv
 import xml.etree.ElementTree as ET
-import pandas as pd
-import pyodbc
-import pymysql
-import psycopg2
-import winreg
-import win32com.client
-import wmi
-import psutil
+try:
+    import winreg
+except ImportError:
+    winreg = None
 import socket
-import requests
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Generator
 import logging
@@ -25,24 +20,48 @@ import re
 import struct
 import codecs
 
+from .fs_walker import FileSystemWalker
+from .sqlite_probe import SQLiteSchemaProbe
+from .patterns import POS_PATTERNS, POS_NAME
+from .system_snapshot import SystemSnapshot
+from .lazy_import import LazyModule
+
+# Drivers and system libraries are imported on first use
+pyodbc = LazyModule('pyodbc')
+psutil = LazyModule('psutil')
+
 class DatabaseScanner:
     """Scans for database files and connections"""
 
-    def __init__(self):
+    # Database file extensions
+    DB_EXTENSIONS = {
+        '.db': 'sqlite',
+        '.sqlite': 'sqlite',
+        '.sqlite3': 'sqlite',
+        '.mdb': 'access',
+        '.accdb': 'access',
+        '.dbf': 'dbase',
+        '.fdb': 'firebird',
+        '.gdb': 'firebird',
+    }
+
+    def __init__(self, schema_probe: Optional[SQLiteSchemaProbe] = None):
         self.logger = logging.getLogger('DatabaseScanner')
+        self.schema_probe = schema_probe or SQLiteSchemaProbe(logger=self.logger)
 
     def scan_for_databases(self, search_paths: List[str] = None) -> List[Dict[str, Any]]:
         """Scan for database files in specified paths"""
+        walker = FileSystemWalker(self.logger)
+        self.register(walker, search_paths)
+        return walker.walk().get('database_files', [])
+
+    def register(self, walker: FileSystemWalker, search_paths: List[str] = None):
+        """Register this scanner on a shared FileSystemWalker"""
         if search_paths is None:
             search_paths = self._get_default_search_paths()
 
-        databases = []
-
-        for path in search_paths:
-            if os.path.exists(path):
-                databases.extend(self._scan_directory(path))
-
-        return databases
+        # Limit depth to avoid deep scanning
+        walker.add_matcher('database_files', search_paths, 3, self._match_entry)
 
     def _get_default_search_paths(self) -> List[str]:
         """Get default paths to search for databases"""
@@ -58,60 +77,32 @@ class DatabaseScanner:
 
     def _scan_directory(self, directory: str) -> List[Dict[str, Any]]:
         """Scan a directory for database files"""
-        databases = []
-
-        # Database file extensions
-        db_extensions = {
-            '.db': 'sqlite',
-            '.sqlite': 'sqlite',
-            '.sqlite3': 'sqlite',
-            '.mdb': 'access',
-            '.accdb': 'access',
-            '.dbf': 'dbase',
-            '.fdb': 'firebird',
-            '.gdb': 'firebird',
-        }
+        return self.scan_for_databases([directory])
 
-        try:
-            for root, dirs, files in os.walk(directory):
-                # Limit depth to avoid deep scanning
-                if root.count(os.sep) - directory.count(os.sep) > 3:
-                    continue
-
-                for file in files:
-                    file_lower = file.lower()
-                    file_path = os.path.join(root, file)
-
-                    for ext, db_type in db_extensions.items():
-                        if file_lower.endswith(ext):
-                            db_info = self._analyze_database_file(file_path, db_type)
-                            if db_info:
-                                databases.append(db_info)
-                            break
+    def _match_entry(self, entry, root: str) -> Optional[Dict[str, Any]]:
+        """Analyze a directory entry if it has a database file extension"""
+        file_lower = entry.name.lower()
 
-        except Exception as e:
-            self.logger.error(f"Error scanning directory {directory}: {e}")
+        for ext, db_type in self.DB_EXTENSIONS.items():
+            if file_lower.endswith(ext):
+                return self._analyze_database_file(entry.path, db_type, entry.stat())
 
-        return databases
+        return None
 
-    def _analyze_database_file(self, file_path: str, db_type: str) -> Optional[Dict[str, Any]]:
+    def _analyze_database_file(self, file_path: str, db_type: str,
+                               stat_result: Optional[os.stat_result] = None) -> Optional[Dict[str, Any]]:
         """Analyze a database file to determine if it's POS-related"""
         try:
-            file_size = os.path.getsize(file_path)
-            file_modified = datetime.fromtimestamp(os.path.getmtime(file_path))
+            stat_result = stat_result or os.stat(file_path)
+            file_size = stat_result.st_size
+            file_modified = datetime.fromtimestamp(stat_result.st_mtime)
 
             # Skip very small files (likely not real databases)
             if file_size < 1024:
                 return None
 
             # Check if file contains POS-related keywords in name
-            filename = os.path.basename(file_path).lower()
-            pos_keywords = [
-                'pos', 'retail', 'sales', 'transaction', 'cash', 'checkout',
-                'inventory', 'customer', 'product', 'invoice', 'receipt'
-            ]
-
-            has_pos_keywords = any(keyword in filename for keyword in pos_keywords)
+            has_pos_keywords = POS_PATTERNS.matches(os.path.basename(file_path), POS_NAME)
 
             db_info = {
                 'path': file_path,
@@ -124,13 +115,12 @@ class DatabaseScanner:
 
             # Try to get table information
             if db_type == 'sqlite':
-                db_info['tables'] = self._get_sqlite_tables(file_path)
+                db_info['tables'] = self._get_sqlite_tables(file_path, stat_result)
             elif db_type == 'access':
                 db_info['tables'] = self._get_access_tables(file_path)
 
             # Check if tables suggest this is a POS database
-            table_names = ' '.join(db_info['tables']).lower()
-            has_pos_tables = any(keyword in table_names for keyword in pos_keywords)
+            has_pos_tables = any(POS_PATTERNS.matches(table, POS_NAME) for table in db_info['tables'])
 
             db_info['likely_pos'] = has_pos_keywords or has_pos_tables
 
@@ -140,19 +130,9 @@ class DatabaseScanner:
             self.logger.debug(f"Error analyzing database {file_path}: {e}")
             return None
 
-    def _get_sqlite_tables(self, db_path: str) -> List[str]:
-        """Get table names from SQLite database"""
-        tables = []
-        try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [row[0] for row in cursor.fetchall()]
-            conn.close()
-        except Exception as e:
-            self.logger.debug(f"Error getting SQLite tables from {db_path}: {e}")
-
-        return tables
+    def _get_sqlite_tables(self, db_path: str, stat_result: Optional[os.stat_result] = None) -> List[str]:
+        """Get table names from SQLite database (read-only, cached until the file changes)"""
+        return self.schema_probe.get_tables(db_path, stat_result) or []
 
     def _get_access_tables(self, db_path: str) -> List[str]:
         """Get table names from Access database"""
@@ -174,8 +154,10 @@ class DatabaseScanner:
 class NetworkScanner:
     """Scans for network services and connections"""
 
-    def __init__(self):
+    def __init__(self, snapshot: Optional[SystemSnapshot] = None):
         self.logger = logging.getLogger('NetworkScanner')
+        # Shared process/port snapshot; a fresh one is taken per scan when none is given
+        self.snapshot = snapshot
 
     def scan_network_services(self) -> List[Dict[str, Any]]:
         """Scan for network services that might be POS-related"""
@@ -196,12 +178,13 @@ class NetworkScanner:
         ]
 
         try:
-            for connection in psutil.net_connections(kind='inet'):
+            snapshot = self.snapshot or SystemSnapshot(self.logger)
+            for connection in snapshot.connections():
                 if connection.status == psutil.CONN_LISTEN and connection.laddr:
                     port = connection.laddr.port
 
                     if port in pos_ports:
-                        service_info = self._analyze_network_service(connection)
+                        service_info = self._analyze_network_service(connection, snapshot)
                         if service_info:
                             services.append(service_info)
 
@@ -210,7 +193,7 @@ class NetworkScanner:
 
         return services
 
-    def _analyze_network_service(self, connection) -> Optional[Dict[str, Any]]:
+    def _analyze_network_service(self, connection, snapshot: SystemSnapshot) -> Optional[Dict[str, Any]]:
         """Analyze a network connection to determine if it's POS-related"""
         try:
             service_info = {
@@ -222,19 +205,14 @@ class NetworkScanner:
                 'likely_pos': False
             }
 
-            # Get process information
+            # Get process information from the snapshot (one lookup per pid)
             if connection.pid:
-                try:
-                    process = psutil.Process(connection.pid)
-                    service_info['process_name'] = process.name()
+                service_info['process_name'] = snapshot.process_name(connection.pid)
 
-                    # Check if process name suggests POS system
-                    process_name_lower = process.name().lower()
-                    pos_keywords = ['pos', 'retail', 'cash', 'sql', 'mysql', 'postgres']
-                    service_info['likely_pos'] = any(keyword in process_name_lower for keyword in pos_keywords)
-
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
+                # Check if process name suggests POS system
+                process_name_lower = service_info['process_name'].lower()
+                pos_keywords = ['pos', 'retail', 'cash', 'sql', 'mysql', 'postgres']
+                service_info['likely_pos'] = any(keyword in process_name_lower for keyword in pos_keywords)
 
             return service_info
 
@@ -303,6 +281,8 @@ class RegistryScanner:
     def scan_installed_software(self) -> List[Dict[str, Any]]:
         """Scan registry for installed POS software"""
         software = []
+        if winreg is None:
+            return software
 
         # Registry locations to check
         registry_locations = [
@@ -387,6 +367,8 @@ class RegistryScanner:
     def scan_com_objects(self) -> List[Dict[str, Any]]:
         """Scan for COM objects that might be POS-related"""
         com_objects = []
+        if winreg is None:
+            return com_objects
 
         try:
             # Scan HKEY_CLASSES_ROOT for COM objects
@@ -444,35 +426,45 @@ class RegistryScanner:
 class FileSystemScanner:
     """Scans file system for POS-related files and data"""
 
+    # File patterns to look for
+    FILE_PATTERNS = [
+        ('*.json', 'JSON data file'),
+        ('*.xml', 'XML data file'),
+        ('*.csv', 'CSV data file'),
+        ('*.txt', 'Text data file'),
+        ('*.log', 'Log file'),
+        ('*.dat', 'Data file'),
+        ('*.dbf', 'dBase file'),
+        ('transactions.*', 'Transaction data'),
+        ('sales.*', 'Sales data'),
+        ('receipts.*', 'Receipt data'),
+    ]
+
     def __init__(self):
         self.logger = logging.getLogger('FileSystemScanner')
 
     def scan_for_pos_files(self, search_paths: List[str] = None) -> List[Dict[str, Any]]:
         """Scan for POS-related files"""
+        walker = FileSystemWalker(self.logger)
+        self.register(walker, search_paths)
+        return walker.walk().get('pos_files', [])
+
+    def register(self, walker: FileSystemWalker, search_paths: List[str] = None,
+                 patterns: List[tuple] = None):
+        """Register this scanner on a shared FileSystemWalker"""
         if search_paths is None:
             search_paths = self._get_default_search_paths()
+        patterns = [(pattern.lower(), description) for pattern, description in (patterns or self.FILE_PATTERNS)]
 
-        pos_files = []
-
-        # File patterns to look for
-        file_patterns = [
-            ('*.json', 'JSON data file'),
-            ('*.xml', 'XML data file'),
-            ('*.csv', 'CSV data file'),
-            ('*.txt', 'Text data file'),
-            ('*.log', 'Log file'),
-            ('*.dat', 'Data file'),
-            ('*.dbf', 'dBase file'),
-            ('transactions.*', 'Transaction data'),
-            ('sales.*', 'Sales data'),
-            ('receipts.*', 'Receipt data'),
-        ]
-
-        for path in search_paths:
-            if os.path.exists(path):
-                pos_files.extend(self._scan_directory_for_patterns(path, file_patterns))
+        def match(entry, root: str) -> Optional[Dict[str, Any]]:
+            filename = entry.name.lower()
+            for pattern, description in patterns:
+                if self._matches_pattern(filename, pattern):
+                    return self._analyze_file(entry.path, description, entry.stat())
+            return None
 
-        return pos_files
+        # Limit depth
+        walker.add_matcher('pos_files', search_paths, 2, match)
 
     def _get_default_search_paths(self) -> List[str]:
         """Get default paths to search for POS files"""
@@ -487,38 +479,22 @@ class FileSystemScanner:
 
     def _scan_directory_for_patterns(self, directory: str, patterns: List[tuple]) -> List[Dict[str, Any]]:
         """Scan directory for files matching patterns"""
-        files = []
-
-        try:
-            for root, dirs, filenames in os.walk(directory):
-                # Limit depth
-                if root.count(os.sep) - directory.count(os.sep) > 2:
-                    continue
-
-                for filename in filenames:
-                    for pattern, description in patterns:
-                        if self._matches_pattern(filename.lower(), pattern.lower()):
-                            file_path = os.path.join(root, filename)
-                            file_info = self._analyze_file(file_path, description)
-                            if file_info:
-                                files.append(file_info)
-                            break
-
-        except Exception as e:
-            self.logger.error(f"Error scanning directory {directory}: {e}")
-
-        return files
+        walker = FileSystemWalker(self.logger)
+        self.register(walker, [directory], patterns)
+        return walker.walk().get('pos_files', [])
 
     def _matches_pattern(self, filename: str, pattern: str) -> bool:
         """Check if filename matches pattern"""
         import fnmatch
         return fnmatch.fnmatch(filename, pattern)
 
-    def _analyze_file(self, file_path: str, description: str) -> Optional[Dict[str, Any]]:
+    def _analyze_file(self, file_path: str, description: str,
+                      stat_result: Optional[os.stat_result] = None) -> Optional[Dict[str, Any]]:
         """Analyze a file to determine if it's POS-related"""
         try:
-            file_size = os.path.getsize(file_path)
-            file_modified = datetime.fromtimestamp(os.path.getmtime(file_path))
+            stat_result = stat_result or os.stat(file_path)
+            file_size = stat_result.st_size
+            file_modified = datetime.fromtimestamp(stat_result.st_mtime)
 
             # Skip very small files
             if file_size < 100:
@@ -543,27 +519,22 @@ class FileSystemScanner:
         """Determine if a file is likely POS-related"""
         filename = os.path.basename(file_path).lower()
 
-        pos_keywords = [
-            'pos', 'retail', 'sales', 'transaction', 'cash', 'checkout',
-            'receipt', 'invoice', 'customer', 'product', 'inventory'
-        ]
-
         # Check filename
-        if any(keyword in filename for keyword in pos_keywords):
+        if POS_PATTERNS.matches(filename, POS_NAME):
             return True
 
         # Check file content for certain file types
         if filename.endswith(('.json', '.xml', '.csv')):
-            return self._check_file_content(file_path, pos_keywords)
+            return self._check_file_content(file_path, POS_NAME)
 
         return False
 
-    def _check_file_content(self, file_path: str, keywords: List[str]) -> bool:
-        """Check file content for POS-related keywords"""
+    def _check_file_content(self, file_path: str, category: str) -> bool:
+        """Check file content for keywords of a POS_PATTERNS category"""
         try:
             # Read first few lines/kb to check content
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read(1024).lower()  # Read first 1KB
-                return any(keyword in content for keyword in keywords)
+                content = f.read(1024)  # Read first 1KB
+                return POS_PATTERNS.matches(content, category)
         except Exception:
             return False
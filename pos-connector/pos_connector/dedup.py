@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Content-hash deduplication of extracted transactions backed by pos_cache.db
+A sale extracted again (overlapping sources, restarts, cursor overlap) is dropped before it is queued
+"""
+
+import math
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime, date
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+# Fields the adapters add to say where a record was read from; the same sale read
+# through two overlapping sources differs only in these
+PROVENANCE_FIELDS = {'pos_system', 'source_file'}
+
+
+def normalize_transaction(value: Any) -> Any:
+    """Canonical form of a transaction: lower-case keys without provenance, trimmed strings, plain numbers"""
+    if isinstance(value, dict):
+        return {
+            str(key).strip().lower(): normalize_transaction(item)
+            for key, item in value.items()
+            if str(key).strip().lower() not in PROVENANCE_FIELDS
+        }
+    if isinstance(value, (list, tuple)):
+        return [normalize_transaction(item) for item in value]
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, bool) or value is None or isinstance(value, int):
+        return value
+    if isinstance(value, (float, Decimal)):
+        # 5, 5.0 and Decimal('5.00') are the same amount
+        number = round(float(value), 6)
+        return int(number) if number.is_integer() else number
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def content_hash(transaction: Dict[str, Any]) -> str:
+    """Stable SHA-256 hex digest of a normalized transaction"""
+    canonical = json.dumps(normalize_transaction(transaction), sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class BloomFilter:
+    """
+    Bit-array Bloom filter over hex digests.
+
+    A miss means the digest was never added; a hit may be a false positive
+    (about ``error_rate`` once ``capacity`` digests are in) and must be confirmed.
+    The bit positions are taken from the digest itself, so nothing is rehashed.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.size = max(64, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: str):
+        first = int(digest[:16], 16)
+        step = int(digest[16:32], 16) | 1
+        return ((first + i * step) % self.size for i in range(self.hashes))
+
+    def add(self, digest: str):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+
+class TransactionDeduplicator:
+    """
+    Hashes of every transaction ever queued, in the ``transaction_hashes`` table.
+
+    ``filter`` drops transactions whose content hash is already known. Most
+    transactions are new, and for those the in-memory Bloom filter answers
+    without touching SQLite; only Bloom hits are confirmed against the indexed
+    table, in one query per batch. ``record`` stores the hashes of a batch
+    inside the transaction that queues it, so a hash is only known once its
+    transaction is in the outbox.
+
+    Callers hold ``lock`` from ``filter`` until the batch is committed, so two
+    sources extracting the same sale at once cannot both queue it.
+
+    Hashes are kept for ``HASH_DAYS``: ``prune`` deletes older ones, and
+    ``reset_filter`` rebuilds the Bloom filter without them afterwards.
+    """
+
+    CAPACITY = 1_000_000
+    ERROR_RATE = 0.001
+    # Hashes per IN (...) lookup, below SQLite's bound parameter limit
+    LOOKUP_CHUNK = 500
+    # Larger tables are loaded into the filter in the background (about 10 s per million hashes)
+    SYNC_LOAD_LIMIT = 100_000
+    # Days a sale is recognised as a repeat; the source cursors keep older sales from being read again
+    HASH_DAYS = 90
+
+    def __init__(self, db_path, logger: Optional[logging.Logger] = None,
+                 capacity: int = CAPACITY, error_rate: float = ERROR_RATE):
+        self.db_path = Path(db_path)
+        self.logger = logger or logging.getLogger('TransactionDeduplicator')
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.lock = threading.RLock()
+        self._bloom: Optional[BloomFilter] = None
+        self._building = False
+        # Hashes recorded while the filter is being built
+        self._pending: List[str] = []
+        self.stats = {'checked': 0, 'duplicates': 0, 'lookups': 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_schema(self, cursor: sqlite3.Cursor):
+        """Create the hash table"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS transaction_hashes (
+                hash TEXT PRIMARY KEY,
+                source_id TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_transaction_hashes_created ON transaction_hashes (created_at)')
+
+    def filter(self, transactions: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Return (transactions not seen before, their hashes); repeats within the batch are dropped too"""
+        with self.lock:
+            bloom = self._current_bloom()
+            hashes = [content_hash(transaction) for transaction in transactions]
+            # Until the filter is built every hash is confirmed against the table
+            known = self._lookup([digest for digest in set(hashes) if bloom is None or digest in bloom])
+
+            fresh, fresh_hashes = [], []
+            for transaction, digest in zip(transactions, hashes):
+                if digest in known:
+                    continue
+                known.add(digest)
+                fresh.append(transaction)
+                fresh_hashes.append(digest)
+
+            self.stats['checked'] += len(transactions)
+            self.stats['duplicates'] += len(transactions) - len(fresh)
+            return fresh, fresh_hashes
+
+    def record(self, hashes: List[str], source_id: str, conn: sqlite3.Connection):
+        """Store hashes as part of the caller's open transaction"""
+        conn.executemany(
+            "INSERT OR IGNORE INTO transaction_hashes (hash, source_id) VALUES (?, ?)",
+            [(digest, source_id) for digest in hashes]
+        )
+        with self.lock:
+            # Added before the commit: if it fails, a stale bit only costs one extra lookup
+            if self._bloom is None:
+                # Not in the table yet as the builder reads it, so handed over separately
+                self._pending.extend(hashes)
+                return
+            for digest in hashes:
+                self._bloom.add(digest)
+            if self._bloom.count > self._bloom.capacity:
+                self._bloom, self._pending = None, list(hashes)
+                self._current_bloom()
+
+    def prune(self, cursor: sqlite3.Cursor, days: Optional[float] = HASH_DAYS, limit: int = 2000) -> int:
+        """Delete up to limit hashes recorded more than days ago on the caller's cursor; returns the number deleted"""
+        if not days or days <= 0:
+            return 0
+        cursor.execute('''
+            DELETE FROM transaction_hashes WHERE hash IN (
+                SELECT hash FROM transaction_hashes
+                WHERE created_at < datetime('now', ?)
+                LIMIT ?
+            )
+        ''', (f'-{float(days)} days', limit))
+        return cursor.rowcount
+
+    def reset_filter(self):
+        """
+        Rebuild the Bloom filter from the table, e.g. once pruned hashes are committed
+
+        The deleted hashes only cost a lookup each while they are still in the
+        filter, but they keep it filling up towards its capacity.
+        """
+        with self.lock:
+            if self._bloom is None:
+                # Not built yet, or being built
+                return
+            self._bloom = None
+            self._current_bloom()
+
+    def _lookup(self, hashes: List[str]) -> set:
+        """The subset of hashes present in the table"""
+        if not hashes:
+            return set()
+        self.stats['lookups'] += 1
+        found = set()
+        conn = self._connect()
+        try:
+            for start in range(0, len(hashes), self.LOOKUP_CHUNK):
+                chunk = hashes[start:start + self.LOOKUP_CHUNK]
+                rows = conn.execute(
+                    f"SELECT hash FROM transaction_hashes WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        finally:
+            conn.close()
+        return found
+
+    def _current_bloom(self) -> Optional[BloomFilter]:
+        """
+        The Bloom filter, built from the table on first use and again once it is full
+
+        Small tables are loaded at once; a large one is loaded in the background
+        and None is returned until it is ready.
+        """
+        if self._bloom is not None or self._building:
+            return self._bloom
+
+        conn = self._connect()
+        try:
+            count = conn.execute("SELECT COUNT(*) FROM transaction_hashes").fetchone()[0]
+        finally:
+            conn.close()
+
+        capacity = max(self.capacity, (count + len(self._pending)) * 2)
+        if count <= self.SYNC_LOAD_LIMIT:
+            self._build(capacity)
+        else:
+            self._building = True
+            threading.Thread(target=self._build, args=(capacity,), daemon=True,
+                             name='TransactionDeduplicator').start()
+        return self._bloom
+
+    def _build(self, capacity: int):
+        bloom = BloomFilter(capacity, self.error_rate)
+        try:
+            conn = self._connect()
+            try:
+                for (digest,) in conn.execute("SELECT hash FROM transaction_hashes"):
+                    bloom.add(digest)
+            finally:
+                conn.close()
+        except Exception as e:
+            self.logger.error(f"Error loading transaction hashes: {e}")
+            bloom = None
+
+        with self.lock:
+            self._building = False
+            if bloom is None:
+                return
+            for digest in self._pending:
+                bloom.add(digest)
+            self._pending = []
+            self._bloom = bloom
+        self.logger.debug(f"Loaded {bloom.count} transaction hashes into a Bloom filter of {bloom.size} bits")
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Persistent, incremental discovery inventory backed by pos_cache.db
+Remembers directory mtimes and discovered systems so warm starts only rescan what changed
+"""
+
+import os
+import json
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from .fs_walker import FileSystemWalker
+
+# A file matcher receives (full_path, file_name) and returns a system dict or None
+FileMatcher = Callable[[str, str], Optional[Dict[str, Any]]]
+
+
+class DiscoveryCache:
+    """
+    Incremental directory scanner that persists its results in pos_cache.db.
+
+    Directory traversal is done by FileSystemWalker; this class only persists its
+    results. Every scanned directory is recorded in ``discovery_dirs`` with its mtime and
+    subdirectory list. Systems found in a directory are stored in the existing
+    ``pos_systems`` table, keyed by source path, size and mtime. On later scans a
+    directory whose mtime is unchanged is not listed again: its subdirectories and
+    systems are taken from the cache, so a warm start costs one ``stat`` per
+    directory instead of a full tree walk.
+    """
+
+    def __init__(self, db_path, logger: Optional[logging.Logger] = None):
+        self.db_path = Path(db_path)
+        self.logger = logger or logging.getLogger('DiscoveryCache')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_schema(self, cursor: sqlite3.Cursor):
+        """Create the discovery tables and extend pos_systems with source columns"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS discovery_dirs (
+                scope TEXT NOT NULL,
+                path TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                subdirs TEXT,
+                scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (scope, path)
+            )
+        ''')
+
+        cursor.execute("PRAGMA table_info(pos_systems)")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+
+        source_columns = [
+            ('discovery_method', 'TEXT'),
+            ('source_path', 'TEXT'),
+            ('source_dir', 'TEXT'),
+            ('source_size', 'INTEGER'),
+            ('source_mtime_ns', 'INTEGER'),
+        ]
+        for column, column_type in source_columns:
+            if column not in existing_columns:
+                cursor.execute(f"ALTER TABLE pos_systems ADD COLUMN {column} {column_type}")
+
+    def session(self, scope: str, matcher_names: List[str], roots: List[str]) -> 'DiscoverySession':
+        """Open a cache session for one walk over roots by the given matchers"""
+        return DiscoverySession(self, scope, matcher_names, roots)
+
+    def scan_tree(self, scope: str, root: str, max_depth: int,
+                  match_file: FileMatcher) -> List[Dict[str, Any]]:
+        """
+        Scan a single directory tree with one matcher, listing only directories whose mtime changed
+
+        Args:
+            scope: Discovery method name; cached directories and systems are kept per scope
+            root: Root directory of the scan
+            max_depth: Maximum depth below root whose files are inspected
+            match_file: Called for every file in a rescanned directory
+
+        Returns:
+            List of discovered system dicts for the whole tree
+        """
+        walker = FileSystemWalker(self.logger, cache_session=self.session(scope, [scope], [root]))
+        walker.add_matcher(scope, [root], max_depth, lambda entry, _root: match_file(entry.path, entry.name))
+        return walker.walk()[scope]
+
+    def _under_root(self, column: str, root: str) -> Tuple[str, Tuple[str, str]]:
+        """Build a WHERE fragment matching root and every path below it"""
+        prefix = root.rstrip(os.sep) + os.sep
+        # Escape LIKE wildcards that can legitimately appear in Windows paths
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f"({column} = ? OR {column} LIKE ? ESCAPE '\\')", (root, escaped + '%')
+
+    def _load_dirs(self, scope: str, roots: List[str]) -> Dict[str, Tuple[int, List[str]]]:
+        """Load cached directory mtimes and subdirectory lists below the roots"""
+        dirs = {}
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+            for root in roots:
+                condition, params = self._under_root('path', root)
+                cursor.execute(
+                    f"SELECT path, mtime_ns, subdirs FROM discovery_dirs WHERE scope = ? AND {condition}",
+                    (scope,) + params
+                )
+                for path, mtime_ns, subdirs in cursor.fetchall():
+                    dirs[path] = (mtime_ns, json.loads(subdirs or '[]'))
+            conn.close()
+        except Exception as e:
+            self.logger.debug(f"Could not load discovery cache for {scope}: {e}")
+
+        return dirs
+
+    def _load_systems(self, matcher_names: List[str], roots: List[str]) -> Dict[str, List[Tuple[str, str, Dict[str, Any]]]]:
+        """Load cached systems below the roots, grouped by source directory"""
+        systems = {}
+        try:
+            placeholders = ', '.join('?' for _ in matcher_names)
+            conn = self._connect()
+            cursor = conn.cursor()
+            for root in roots:
+                condition, params = self._under_root('source_dir', root)
+                cursor.execute(
+                    f"SELECT discovery_method, source_dir, source_path, config FROM pos_systems "
+                    f"WHERE discovery_method IN ({placeholders}) AND {condition}",
+                    tuple(matcher_names) + params
+                )
+                for method, source_dir, source_path, config in cursor.fetchall():
+                    try:
+                        entry = (method, source_path, json.loads(config))
+                    except (TypeError, ValueError):
+                        continue
+                    dir_systems = systems.setdefault(source_dir, [])
+                    if entry[:2] not in {(m, p) for m, p, _ in dir_systems}:
+                        dir_systems.append(entry)
+            conn.close()
+        except Exception as e:
+            self.logger.debug(f"Could not load cached systems: {e}")
+
+        return systems
+
+    def _persist(self, scope: str, matcher_names: List[str], changed_dirs: Dict[str, Tuple[int, List[str]]],
+                 changed_systems: Dict[str, List[Tuple[str, Dict[str, Any]]]], removed_dirs: List[str]):
+        """Write rescanned directories and their systems back to the cache"""
+        if not changed_dirs and not changed_systems and not removed_dirs:
+            return
+
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+
+            for path in removed_dirs:
+                cursor.execute("DELETE FROM discovery_dirs WHERE scope = ? AND path = ?", (scope, path))
+                changed_systems.setdefault(path, [])
+
+            for path, (mtime_ns, subdirs) in changed_dirs.items():
+                cursor.execute('''
+                    INSERT OR REPLACE INTO discovery_dirs (scope, path, mtime_ns, subdirs)
+                    VALUES (?, ?, ?, ?)
+                ''', (scope, path, mtime_ns, json.dumps(subdirs)))
+
+            for path, dir_systems in changed_systems.items():
+                self._store_directory_systems(cursor, matcher_names, path, dir_systems)
+
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            self.logger.error(f"Error saving discovery cache: {e}")
+
+    def _store_directory_systems(self, cursor: sqlite3.Cursor, matcher_names: List[str], path: str,
+                                 dir_systems: List[Tuple[str, Dict[str, Any]]]):
+        """Upsert the systems of one directory, keeping row ids stable for sync_log references"""
+        placeholders = ', '.join('?' for _ in matcher_names)
+        cursor.execute(
+            f"SELECT id, discovery_method, source_path FROM pos_systems "
+            f"WHERE discovery_method IN ({placeholders}) AND source_dir = ?",
+            tuple(matcher_names) + (path,)
+        )
+        existing = {(method, source_path): row_id for row_id, method, source_path in cursor.fetchall()}
+
+        for method, system in dir_systems:
+            source = system.get('_source')
+            if not source:
+                continue
+            values = (
+                system.get('name'), system.get('type'), json.dumps(system),
+                source['size'], source['mtime_ns']
+            )
+            row_id = existing.pop((method, source['path']), None)
+            if row_id is not None:
+                cursor.execute('''
+                    UPDATE pos_systems SET name = ?, type = ?, config = ?, source_size = ?, source_mtime_ns = ?
+                    WHERE id = ?
+                ''', values + (row_id,))
+            else:
+                cursor.execute('''
+                    INSERT INTO pos_systems
+                    (name, type, config, status, source_size, source_mtime_ns, discovery_method, source_path, source_dir)
+                    VALUES (?, ?, ?, 'discovered', ?, ?, ?, ?, ?)
+                ''', values + (method, source['path'], path))
+
+        for row_id in existing.values():
+            cursor.execute("DELETE FROM pos_systems WHERE id = ?", (row_id,))
+
+    def clear(self, scope: Optional[str] = None):
+        """Forget cached directories so the next scan walks the full tree"""
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+            if scope:
+                cursor.execute("DELETE FROM discovery_dirs WHERE scope = ?", (scope,))
+            else:
+                cursor.execute("DELETE FROM discovery_dirs")
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            self.logger.error(f"Error clearing discovery cache: {e}")
+
+
+class DiscoverySession:
+    """
+    Cache state for a single FileSystemWalker run.
+
+    The walker asks ``lookup`` before listing a directory; a hit returns the cached
+    subdirectories and systems. Freshly listed directories are handed to ``store``
+    and everything is written back in one transaction by ``finish``.
+    """
+
+    def __init__(self, cache: DiscoveryCache, scope: str, matcher_names: List[str], roots: List[str]):
+        self.cache = cache
+        self.scope = scope
+        self.matcher_names = list(matcher_names)
+        roots = [os.path.normpath(root) for root in roots if root]
+        self.cached_dirs = cache._load_dirs(scope, roots)
+        self.cached_systems = cache._load_systems(self.matcher_names, roots)
+        self.changed_dirs = {}
+        self.changed_systems = {}
+
+    def lookup(self, path: str, mtime_ns: int) -> Optional[Tuple[List[str], List[Tuple[str, str, Dict[str, Any]]]]]:
+        """Return (subdirs, [(matcher_name, source_path, system)]) if the directory is unchanged"""
+        cached = self.cached_dirs.get(path)
+        if cached is None or cached[0] != mtime_ns:
+            return None
+        return cached[1], self.cached_systems.get(path, [])
+
+    def store(self, path: str, mtime_ns: int, subdirs: List[str], results: List[Tuple[str, Dict[str, Any]]]):
+        """Record a freshly listed directory"""
+        self.changed_dirs[path] = (mtime_ns, subdirs)
+        self.changed_systems[path] = results
+
+    def store_results(self, path: str, results: List[Tuple[str, Dict[str, Any]]]):
+        """Record refreshed systems for a directory whose listing was reused"""
+        self.changed_systems[path] = results
+
+    def finish(self, visited):
+        """Persist changes and drop directories that were not reached by this walk"""
+        removed_dirs = [path for path in self.cached_dirs if os.path.normcase(path) not in visited]
+        self.cache._persist(self.scope, self.matcher_names, self.changed_dirs,
+                            self.changed_systems, removed_dirs)
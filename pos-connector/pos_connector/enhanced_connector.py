@@ -5,50 +5,86 @@ Enhanced POS Connector that can connect to any Windows POS system
 
 import os
 import json
+try:
+    import winreg
+except ImportError:
+    winreg = None
 import time
 import logging
 import threading
 import asyncio
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Tuple, Optional, Callable, AsyncIterator
 import queue
 import sqlite3
-import hashlib
-import win32serviceutil
-import win32service
-import win32event
-import winreg
-import subprocess
-import psutil
-import pyodbc
-import pymysql
-import sqlite3
-import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from .pos_adapters import *
-from .data_extractors import *
 from .laravel_api import LaravelAPI
-from .pos_api_client import PosApiClient
+from .pos_api_client import PosApiClient, ERROR, UNSENT
 from .folder_detector import InvoiceFolderDetector
+from .adapter_registry import AdapterRegistry
+from .discovery_cache import DiscoveryCache
+from .fs_walker import FileSystemWalker
+from .sqlite_probe import SQLiteSchemaProbe
+from .patterns import POS_PATTERNS, POS_NAME, POS_TABLE, POS_FILE
+from .system_snapshot import SystemSnapshot
+from .source_identity import SourceIndex, source_id
+from .scheduler import PollScheduler
+from .adaptive_interval import AdaptiveInterval
+from .source_cursors import SourceCursorStore
+from .outbox import TransactionOutbox
+from .batch_sender import BatchSender
+from .dedup import TransactionDeduplicator, content_hash
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .cache_writer import CacheWriter
+from .cache_schema import CacheSchema, PosSystemIds, encode_payload
+from .cache_maintenance import CacheMaintenance
+from .retry_worker import RetrySchedule, RetryWorker
+from .sync_stats import SyncStats, transaction_amount
 
 class EnhancedPOSConnector:
     """
     Universal POS Connector that can detect and connect to any Windows POS system
     """
 
+    # Default soft deadline for each discovery method, in seconds
+    DISCOVERY_METHOD_TIMEOUT = 120
+    # Extra time a method gets to return partial results before it is abandoned
+    DISCOVERY_GRACE_PERIOD = 5
+    # Default number of connection tests run at once, and the timeout of each, in seconds
+    VALIDATION_CONCURRENCY = 8
+    VALIDATION_TIMEOUT = 15
+    # Default polling workers shared by all monitored sources, and the default poll interval
+    MONITOR_WORKERS = 4
+    SYNC_INTERVAL = 60
+    # Default failures in a row before a source is left alone, and the first and longest pause in seconds
+    SOURCE_FAILURE_THRESHOLD = 3
+    SOURCE_RETRY_INTERVAL = 30
+    MAX_SOURCE_RETRY_INTERVAL = 300
+    # Default batch limits of the sender: transactions, stored bytes and linger time in seconds,
+    # and the number of batches sent at once
+    SEND_BATCH_SIZE = 200
+    SEND_BATCH_BYTES = 1024 * 1024
+    SEND_BATCH_WAIT = 0.5
+    SEND_CONCURRENCY = 4
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.logger = self._setup_logging()
         self.running = False
         self.pos_systems = []
-        self.data_queue = queue.Queue()
         self.error_queue = queue.Queue()
-        self.sync_threads = []
+        self.scheduler = None
+        self.source_adapters = {}
+        self.source_intervals = {}
+        self.source_circuits = {}
         self.pos_adapters = {}
         self.last_sync_times = {}
         self.failed_syncs = {}
+        self._discovery_cancel = threading.Event()
+        self._discovery_local = threading.local()
+        self._system_snapshot = None
 
         # Initialize API client
         # Use POS API client if API key is provided, otherwise use Laravel API
@@ -67,10 +103,52 @@ class EnhancedPOSConnector:
             )
             self.use_pos_api = False
 
-        # Initialize database for local caching
-        self.db_path = Path(__file__).parent.parent / 'data' / 'pos_cache.db'
-        self.db_path.parent.mkdir(exist_ok=True)
+        # Initialize database for local caching (config: cache_db_path)
+        self.db_path = Path(config.get('cache_db_path') or Path(__file__).parent.parent / 'data' / 'pos_cache.db')
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.discovery_cache = DiscoveryCache(self.db_path, self.logger)
+        self.schema_probe = SQLiteSchemaProbe(self.db_path, self.logger)
+        self.source_cursors = SourceCursorStore(self.db_path, self.logger)
+        # Extracted transactions wait in pos_cache.db until the API has accepted them
+        self.outbox = TransactionOutbox(self.db_path, self.logger)
+        # Content hashes of every queued transaction, so re-extracted sales are dropped locally
+        self.deduplicator = TransactionDeduplicator(self.db_path, self.logger)
+        self.cache_schema = CacheSchema(self.logger)
+        # The cache tables are written by one thread on one connection, in batched transactions;
+        # source row ids are memoized for it and forgotten when a write is rolled back
+        self.pos_system_ids = PosSystemIds()
+        self.cache_writer = CacheWriter(self.db_path, self.logger, on_rollback=self.pos_system_ids.forget)
+        # Expired history, outbox rows and dedup hashes are pruned and the file compacted while the connector is idle
+        self.cache_maintenance = CacheMaintenance(
+            self.db_path, self.cache_writer, self.logger,
+            sync_log_days=config.get('sync_log_retention_days', CacheMaintenance.SYNC_LOG_DAYS),
+            processed_days=config.get('cache_retention_days', CacheMaintenance.PROCESSED_DAYS),
+            failed_days=config.get('failed_cache_retention_days', CacheMaintenance.FAILED_DAYS),
+            outbox=self.outbox,
+            outbox_days=config.get('outbox_retention_days', TransactionOutbox.DELIVERED_DAYS),
+            failed_outbox_rows=config.get('outbox_max_failed', TransactionOutbox.MAX_FAILED),
+            deduplicator=self.deduplicator,
+            hash_days=config.get('dedup_retention_days', TransactionDeduplicator.HASH_DAYS),
+            idle_after=float(config.get('cache_maintenance_idle', CacheMaintenance.IDLE_AFTER)),
+            convert=bool(config.get('cache_vacuum_convert', False))
+        )
+        # Per-source hourly and daily sync figures, kept in step with every cache write
+        self.sync_stats = SyncStats(self.db_path, self.logger)
+        # Failed transactions are sent again on an exponential schedule
+        self.retry_schedule = RetrySchedule(
+            base_delay=float(config.get('retry_base_delay', RetrySchedule.BASE_DELAY)),
+            max_delay=float(config.get('retry_max_delay', RetrySchedule.MAX_DELAY)),
+            max_attempts=int(config.get('retry_max_attempts', RetrySchedule.MAX_ATTEMPTS))
+        )
+        self.retry_worker = RetryWorker(
+            self.db_path, self.cache_writer, self.outbox, self._requeue_transactions,
+            circuit=self.api_client.circuit, logger=self.logger,
+            batch_size=int(config.get('retry_batch_size', RetryWorker.BATCH_SIZE)),
+            max_backlog=int(config.get('send_batch_size', self.SEND_BATCH_SIZE))
+                        * int(config.get('send_concurrency', self.SEND_CONCURRENCY))
+        )
         self._init_database()
+        self.outbox.recover()
 
         # Load POS adapters
         self._load_pos_adapters()
@@ -83,11 +161,14 @@ class EnhancedPOSConnector:
 
     def _setup_logging(self) -> logging.Logger:
         """Setup logging configuration"""
-        log_dir = Path(__file__).parent.parent / 'logs'
-        log_dir.mkdir(exist_ok=True)
+        log_dir = Path(os.environ.get('POS_CONNECTOR_LOG_DIR') or Path(__file__).parent.parent / 'logs')
+        log_dir.mkdir(parents=True, exist_ok=True)
 
         logger = logging.getLogger('EnhancedPOSConnector')
         logger.setLevel(logging.INFO)
+        if logger.handlers:
+            # Already set up by an earlier connector in this process
+            return logger
 
         # File handler
         file_handler = logging.FileHandler(log_dir / 'enhanced_connector.log')
@@ -115,44 +196,23 @@ class EnhancedPOSConnector:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
 
-            # Create tables
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS pos_systems (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    connection_string TEXT,
-                    config TEXT,
-                    status TEXT DEFAULT 'active',
-                    last_sync TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sync_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    pos_system_id INTEGER,
-                    transaction_id TEXT,
-                    sync_status TEXT,
-                    error_message TEXT,
-                    data_hash TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (pos_system_id) REFERENCES pos_systems (id)
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS cached_transactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    pos_system_id INTEGER,
-                    transaction_id TEXT UNIQUE,
-                    transaction_data TEXT,
-                    processed INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (pos_system_id) REFERENCES pos_systems (id)
-                )
-            ''')
+            # New databases give freed pages back to the disk in small steps
+            self.cache_maintenance.init_schema(cursor)
+            # Readers and the outbox are not blocked while the cache writer commits
+            cursor.execute('PRAGMA journal_mode=WAL')
+
+            # Cache tables (pos_systems, sync_log, cached_transactions)
+            self.cache_schema.init_schema(cursor)
+
+            # Persistent discovery inventory (directory mtimes + source columns on pos_systems)
+            self.discovery_cache.init_schema(cursor)
+            self.schema_probe.init_schema(cursor)
+            self.source_cursors.init_schema(cursor)
+            self.outbox.init_schema(cursor)
+            self.deduplicator.init_schema(cursor)
+
+            # Versioned changes to the cache tables, once every table and column they touch exists
+            self.cache_schema.migrate(cursor)
 
             conn.commit()
             conn.close()
@@ -163,49 +223,28 @@ class EnhancedPOSConnector:
             raise
 
     def _load_pos_adapters(self):
-        """Load all available POS adapters"""
-        self.pos_adapters = {
-            'square': SquarePOSAdapter(),
-            'shopify': ShopifyPOSAdapter(),
-            'quickbooks': QuickBooksPOSAdapter(),
-            'sage': SagePOSAdapter(),
-            'dynamics': DynamicsPOSAdapter(),
-            'generic_sql': GenericSQLAdapter(),
-            'generic_file': GenericFileAdapter(),
-            'generic_api': GenericAPIAdapter(),
-            'odbc': ODBCAdapter(),
-            'csv': CSVAdapter(),
-            'xml': XMLAdapter(),
-            'json': JSONAdapter(),
-            'excel': ExcelAdapter(),
-            'access': AccessAdapter(),
-            'foxpro': FoxProAdapter(),
-            'dbase': DBaseAdapter(),
-            'firebird': FirebirdAdapter(),
-            'sqlite': SQLiteAdapter(),
-            'mysql': MySQLAdapter(),
-            'postgresql': PostgreSQLAdapter(),
-            'mssql': MSSQLAdapter(),
-            'oracle': OracleAdapter(),
-            'registry': RegistryAdapter(),
-            'network': NetworkAdapter(),
-            'service': ServiceAdapter(),
-            'com': COMAdapter(),
-            'wmi': WMIAdapter(),
-            'aronium': AroniumPOSAdapter(),
-            'universal': UniversalPOSAdapter(),
-        }
+        """Register all available POS adapters; each is imported when a system first needs it"""
+        self.pos_adapters = AdapterRegistry(logger=self.logger)
+
+        # Extra adapters from config: {"key": "package.module:ClassName"}
+        for key, path in self.config.get('adapters', {}).items():
+            self.pos_adapters.register(key, path)
 
-        self.logger.info(f"Loaded {len(self.pos_adapters)} POS adapters")
+        self.logger.info(f"Registered {len(self.pos_adapters)} POS adapters")
 
     async def discover_pos_systems(self) -> List[Dict[str, Any]]:
         """
         Discover all POS systems on the current machine
         """
-        self.logger.info("Starting POS system discovery...")
-        discovered_systems = []
+        validated_systems = []
+        async for system in self.discover_pos_systems_stream():
+            validated_systems.append(system)
 
-        # Use multiple discovery methods with names for logging
+        self.logger.info(f"Discovered {len(validated_systems)} valid POS systems")
+        return validated_systems
+
+    def _get_discovery_methods(self) -> List[tuple]:
+        """Return the (name, method) pairs to run for this discovery"""
         # Start with faster methods first, then slower ones
         fast_discovery_methods = [
             ("Services Scan", self._discover_by_services),
@@ -214,53 +253,162 @@ class EnhancedPOSConnector:
 
         slow_discovery_methods = [
             ("Registry Scan", self._discover_by_registry),
-            ("Files Scan", self._discover_by_files),
-            ("Databases Scan", self._discover_by_databases),
+            ("Filesystem Scan", self._discover_by_filesystem),
+            ("SQL Server Scan", self._discover_by_sql_server),
             ("Network Scan", self._discover_by_network),
             ("Common Paths Scan", self._discover_by_common_paths),
         ]
 
         # Check if we should run quick discovery only
         quick_discovery = self.config.get('quick_discovery', False)
-        discovery_methods = fast_discovery_methods if quick_discovery else (fast_discovery_methods + slow_discovery_methods)
-
-        # Run discovery methods concurrently with timeout
-        with ThreadPoolExecutor(max_workers=len(discovery_methods)) as executor:
-            # Submit all tasks with names
-            futures = {}
-            for method_name, method_func in discovery_methods:
-                future = executor.submit(method_func)
-                futures[future] = method_name
-                self.logger.info(f"Started {method_name}...")
-
-            # Process completed futures with timeout
-            for future in as_completed(futures, timeout=120):  # 2 minute timeout per method
-                method_name = futures[future]
-                try:
-                    self.logger.info(f"Processing results from {method_name}...")
-                    systems = future.result(timeout=30)  # 30 second timeout for result
+        return fast_discovery_methods if quick_discovery else (fast_discovery_methods + slow_discovery_methods)
+
+    def _get_discovery_timeout(self, method_name: str) -> float:
+        """Per-method discovery deadline in seconds (config: discovery_timeouts / discovery_method_timeout)"""
+        timeouts = self.config.get('discovery_timeouts', {})
+        return float(timeouts.get(method_name, self.config.get('discovery_method_timeout', self.DISCOVERY_METHOD_TIMEOUT)))
+
+    async def discover_pos_systems_stream(self, validate: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Discover POS systems, yielding each one as soon as its discovery method finishes
+
+        Every discovery method runs in its own worker thread with its own deadline. A method
+        that runs past its deadline is asked to stop and returns the systems it found so far;
+        the results of the other methods are never lost. Closing the generator (or calling
+        cancel_discovery) cancels all methods that are still running.
+
+        Args:
+            validate: Only yield systems whose adapter passes its connection test; tests run
+                concurrently (config: validation_concurrency, validation_timeout)
+
+        Yields:
+            Discovered (and, if requested, validated) system dicts, deduplicated across methods
+        """
+        self.logger.info("Starting POS system discovery...")
+        discovery_methods = self._get_discovery_methods()
+
+        loop = asyncio.get_running_loop()
+        self._discovery_cancel = threading.Event()
+        # Services, processes and network scans share one process/port snapshot per run
+        self._system_snapshot = SystemSnapshot(self.logger)
+        executor = ThreadPoolExecutor(max_workers=len(discovery_methods), thread_name_prefix='discovery')
+
+        pending = {}
+        for method_name, method_func in discovery_methods:
+            timeout = self._get_discovery_timeout(method_name)
+            stop_event = threading.Event()
+            future = loop.run_in_executor(
+                executor, self._run_discovery_method, method_name, method_func, timeout, stop_event
+            )
+            # Hard limit: abandon a method that ignores its soft deadline
+            task = asyncio.ensure_future(asyncio.wait_for(future, timeout + self.DISCOVERY_GRACE_PERIOD))
+            pending[task] = (method_name, stop_event)
+            self.logger.info(f"Started {method_name} (deadline {timeout:.0f}s)...")
+
+        # One record per physical source: later finds of a known source are merged into it
+        sources = SourceIndex()
+        found = 0
+
+        # Connection tests run concurrently with the remaining discovery methods
+        concurrency = self._get_validation_concurrency()
+        validation_semaphore = asyncio.Semaphore(concurrency)
+        validation_executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='validation')
+        validating = set()
+
+        try:
+            while pending or validating:
+                done, _ = await asyncio.wait(set(pending) | validating, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    if task in validating:
+                        validating.discard(task)
+                        system = task.result()
+                        if system:
+                            yield system
+                        continue
+
+                    method_name, stop_event = pending.pop(task)
+                    try:
+                        systems = task.result()
+                    except asyncio.TimeoutError:
+                        stop_event.set()
+                        self.logger.warning(f"{method_name} did not finish before its deadline - skipped")
+                        continue
+                    except Exception as e:
+                        self.logger.error(f"{method_name} failed: {e}")
+                        continue
+
                     if systems:
-                        discovered_systems.extend(systems)
                         self.logger.info(f"{method_name} found {len(systems)} potential systems")
                     else:
                         self.logger.info(f"{method_name} completed - no systems found")
-                except Exception as e:
-                    self.logger.error(f"{method_name} failed: {e}")
-
-        self.logger.info(f"Discovery phase completed. Found {len(discovered_systems)} potential systems")
 
-        # Remove duplicates and validate systems
-        unique_systems = self._deduplicate_systems(discovered_systems)
-        self.logger.info(f"After deduplication: {len(unique_systems)} unique systems")
-
-        validated_systems = await self._validate_systems(unique_systems)
+                    for system in SourceIndex.merge_batch(systems or []):
+                        system, is_new = sources.add(system)
+                        if not is_new:
+                            self.logger.debug(f"{method_name} found known source {system['source_id']} - merged")
+                            continue
+                        found += 1
 
-        self.logger.info(f"Discovered {len(validated_systems)} valid POS systems")
-        return validated_systems
+                        if validate:
+                            validating.add(asyncio.ensure_future(
+                                self._validate_system(system, validation_semaphore, validation_executor)
+                            ))
+                        else:
+                            yield system
+        finally:
+            # Cancel whatever is still running (deadline, consumer stopped early or shutdown)
+            self._discovery_cancel.set()
+            for task, (_method_name, stop_event) in pending.items():
+                stop_event.set()
+                task.cancel()
+            for task in validating:
+                task.cancel()
+            executor.shutdown(wait=False)
+            validation_executor.shutdown(wait=False)
+            self._system_snapshot = None
+
+        self.logger.info(f"Discovery phase completed. Found {found} unique potential systems")
+
+    def _run_discovery_method(self, method_name: str, method_func: Callable[[], List[Dict[str, Any]]],
+                              timeout: float, stop_event: threading.Event) -> List[Dict[str, Any]]:
+        """Run one discovery method in a worker thread with a cooperative deadline"""
+        self._discovery_local.deadline = time.monotonic() + timeout
+        self._discovery_local.stop_event = stop_event
+        try:
+            systems = method_func()
+            if self._discovery_should_stop():
+                self.logger.warning(f"{method_name} stopped at its deadline - keeping {len(systems or [])} partial results")
+            return systems
+        finally:
+            self._discovery_local.deadline = None
+            self._discovery_local.stop_event = None
+
+    def _discovery_should_stop(self) -> bool:
+        """True when the current discovery method passed its deadline or discovery was cancelled"""
+        if self._discovery_cancel.is_set():
+            return True
+
+        stop_event = getattr(self._discovery_local, 'stop_event', None)
+        if stop_event is not None and stop_event.is_set():
+            return True
+
+        deadline = getattr(self._discovery_local, 'deadline', None)
+        return deadline is not None and time.monotonic() > deadline
+
+    def _get_system_snapshot(self) -> SystemSnapshot:
+        """Snapshot of the running discovery, or a fresh one when a method is called on its own"""
+        return self._system_snapshot or SystemSnapshot(self.logger)
+
+    def cancel_discovery(self):
+        """Cancel all running discovery methods; they return their partial results"""
+        self._discovery_cancel.set()
 
     def _discover_by_registry(self) -> List[Dict[str, Any]]:
         """Discover POS systems by scanning Windows registry"""
         systems = []
+        if winreg is None:
+            return systems
 
         try:
             # Common registry locations for POS software
@@ -366,11 +514,12 @@ class EnhancedPOSConnector:
                 'user data storage', 'network store', 'still image'
             ]
 
-            for service in psutil.win_service_iter():
+            for service_info in self._get_system_snapshot().services():
+                if self._discovery_should_stop():
+                    break
                 try:
-                    service_info = service.as_dict()
-                    service_name = service_info.get('name', '').lower()
-                    display_name = service_info.get('display_name', '').lower()
+                    service_name = (service_info.get('name') or '').lower()
+                    display_name = (service_info.get('display_name') or '').lower()
 
                     # Check if it matches POS keywords
                     has_pos_keyword = any(keyword in service_name or keyword in display_name
@@ -381,20 +530,13 @@ class EnhancedPOSConnector:
                                         for keyword in exclude_keywords)
 
                     if has_pos_keyword and not should_exclude:
-
-                        # Get executable path
-                        try:
-                            service_obj = psutil.win_service_get(service_info['name'])
-                            binpath = service_obj.binpath()
-                        except:
-                            binpath = ""
-
                         systems.append({
                             'name': service_info.get('display_name', service_info.get('name')),
                             'type': 'service',
                             'service_name': service_info.get('name'),
                             'status': service_info.get('status'),
-                            'executable_path': binpath,
+                            # as_dict() already includes the executable path
+                            'executable_path': service_info.get('binpath') or "",
                             'discovery_method': 'service'
                         })
                 except Exception:
@@ -437,10 +579,11 @@ class EnhancedPOSConnector:
                 'calculator', 'paint', 'cmd', 'powershell', 'conhost'
             ]
 
-            for proc in psutil.process_iter(['pid', 'name', 'exe', 'cmdline']):
+            for process_info in self._get_system_snapshot().processes().values():
+                if self._discovery_should_stop():
+                    break
                 try:
-                    process_info = proc.info
-                    process_name = process_info.get('name', '').lower()
+                    process_name = (process_info.get('name') or '').lower()
 
                     # Check if it matches business/POS keywords
                     has_pos_keyword = any(keyword in process_name for keyword in pos_process_keywords)
@@ -457,7 +600,7 @@ class EnhancedPOSConnector:
                             'command_line': process_info.get('cmdline'),
                             'discovery_method': 'process'
                         })
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                except Exception:
                     continue
 
         except Exception as e:
@@ -467,125 +610,125 @@ class EnhancedPOSConnector:
 
     def _discover_by_files(self) -> List[Dict[str, Any]]:
         """Discover POS systems by scanning common file locations"""
-        systems = []
+        return self._walk_filesystem([self._register_file_scan]).get('file_scan', [])
 
-        try:
-            # Common POS installation directories
-            search_paths = [
-                r"C:\Program Files",
-                r"C:\Program Files (x86)",
-                r"C:\POS",
-                r"C:\Retail",
-                r"C:\Cash",
-                r"C:\Square",
-                r"C:\Shopify",
-                r"C:\QuickBooks",
-                r"C:\Sage",
-                r"C:\NCR",
-                r"C:\Micros",
-                r"C:\Aloha",
-                r"C:\Toast",
-                os.path.expanduser("~\\AppData\\Local"),
-                os.path.expanduser("~\\AppData\\Roaming"),
-            ]
+    def _discover_by_databases(self) -> List[Dict[str, Any]]:
+        """Discover POS systems by scanning for database files and connections"""
+        systems = self._walk_filesystem([self._register_database_scan]).get('database_scan', [])
+        systems.extend(self._discover_by_sql_server())
+        return systems
 
-            # Universal business software patterns
-            pos_file_patterns = [
-                # Executable patterns
-                'pos*.exe', 'retail*.exe', 'store*.exe', 'shop*.exe', 'cash*.exe',
-                'checkout*.exe', 'till*.exe', 'register*.exe', 'payment*.exe',
-                'invoice*.exe', 'billing*.exe', 'order*.exe', 'sale*.exe',
-                'business*.exe', 'restaurant*.exe', 'merchant*.exe',
-                # Database patterns
-                'pos*.db', 'retail*.db', 'store*.db', 'shop*.db', 'sales*.db',
-                'transactions*.db', 'orders*.db', 'customers*.db', 'invoice*.db',
-                'pos*.mdb', 'pos*.accdb', 'retail*.mdb', 'sales*.mdb',
-                # Data file patterns
-                'pos*.sqlite', 'sales*.sqlite', 'transactions*.sqlite',
-                'pos*.csv', 'sales*.csv', 'orders*.csv', 'invoices*.csv',
-                'pos*.json', 'sales*.json', 'transactions*.json'
-            ]
+    def _discover_by_filesystem(self) -> List[Dict[str, Any]]:
+        """Run the file and database scans over a single shared walk of their search paths"""
+        results = self._walk_filesystem([self._register_file_scan, self._register_database_scan])
+        return results.get('file_scan', []) + results.get('database_scan', [])
 
-            for search_path in search_paths:
-                if os.path.exists(search_path):
-                    for root, dirs, files in os.walk(search_path):
-                        # Limit depth to avoid scanning entire system
-                        if root.count(os.sep) - search_path.count(os.sep) > 3:
-                            continue
+    def _walk_filesystem(self, registrations: List[Callable[[FileSystemWalker], None]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Register the given scanners on one FileSystemWalker and walk their roots once"""
+        try:
+            walker = FileSystemWalker(self.logger, should_stop=self._discovery_should_stop)
+            for register in registrations:
+                register(walker)
 
-                        for file in files:
-                            file_lower = file.lower()
-                            if any(pattern.replace('*', '') in file_lower
-                                   for pattern in pos_file_patterns):
+            names = [matcher.name for matcher in walker.matchers]
+            roots = [root for matcher in walker.matchers for root in matcher.roots]
+            scope = '+'.join(sorted(names))
 
-                                full_path = os.path.join(root, file)
-                                systems.append({
-                                    'name': f"POS System ({file})",
-                                    'type': 'file_based',
-                                    'file_path': full_path,
-                                    'file_type': os.path.splitext(file)[1],
-                                    'discovery_method': 'file_scan'
-                                })
+            # Persistent discovery inventory: unchanged directories are served from pos_cache.db
+            if not self.config.get('incremental_discovery', True):
+                self.discovery_cache.clear(scope)
+            walker.cache_session = self.discovery_cache.session(scope, names, roots)
+
+            results = walker.walk()
+            self.logger.info(f"File system walk ({scope}): {walker.stats['directories_listed']} directories listed, "
+                             f"{walker.stats['directories_cached']} unchanged")
+            return results
 
         except Exception as e:
-            self.logger.error(f"File discovery failed: {e}")
+            self.logger.error(f"File system discovery failed: {e}")
+            return {}
+
+    def _register_file_scan(self, walker: FileSystemWalker):
+        """Register the POS file name scanner on a shared walker"""
+        # Common POS installation directories
+        search_paths = [
+            r"C:\Program Files",
+            r"C:\Program Files (x86)",
+            r"C:\POS",
+            r"C:\Retail",
+            r"C:\Cash",
+            r"C:\Square",
+            r"C:\Shopify",
+            r"C:\QuickBooks",
+            r"C:\Sage",
+            r"C:\NCR",
+            r"C:\Micros",
+            r"C:\Aloha",
+            r"C:\Toast",
+            os.path.expanduser("~\\AppData\\Local"),
+            os.path.expanduser("~\\AppData\\Roaming"),
+        ]
 
-        return systems
+        def match(entry, root: str) -> Optional[Dict[str, Any]]:
+            # Universal business software patterns, precompiled in POS_PATTERNS
+            if POS_PATTERNS.matches(entry.name, POS_FILE):
+                return {
+                    'name': f"POS System ({entry.name})",
+                    'type': 'file_based',
+                    'file_path': entry.path,
+                    'file_type': os.path.splitext(entry.name)[1],
+                    'discovery_method': 'file_scan'
+                }
+            return None
 
-    def _discover_by_databases(self) -> List[Dict[str, Any]]:
-        """Discover POS systems by scanning for database files and connections"""
-        systems = []
+        # Limit depth to avoid scanning entire system
+        walker.add_matcher('file_scan', search_paths, 3, match)
+
+    def _register_database_scan(self, walker: FileSystemWalker):
+        """Register the database file scanner on a shared walker"""
+        # Universal database file extensions
+        db_extensions = ('.db', '.sqlite', '.sqlite3', '.mdb', '.accdb', '.dbf', '.sdf', '.ldf', '.mdf')
+
+        # Universal business data locations
+        db_search_paths = [
+            r"C:\POS", r"C:\Data", r"C:\Business", r"C:\Store", r"C:\Retail",
+            r"C:\Restaurant", r"C:\Shop", r"C:\Sales", r"C:\Inventory",
+            r"C:\Program Files", r"C:\Program Files (x86)",
+            os.path.expanduser("~\\Documents"),
+            os.path.expanduser("~\\AppData\\Local"),
+            os.path.expanduser("~\\AppData\\Roaming"),
+        ]
 
-        try:
-            # Universal database file extensions
-            db_extensions = ['.db', '.sqlite', '.sqlite3', '.mdb', '.accdb', '.dbf', '.sdf', '.ldf', '.mdf']
-
-            # Universal business data locations
-            db_search_paths = [
-                r"C:\POS", r"C:\Data", r"C:\Business", r"C:\Store", r"C:\Retail",
-                r"C:\Restaurant", r"C:\Shop", r"C:\Sales", r"C:\Inventory",
-                r"C:\Program Files", r"C:\Program Files (x86)",
-                os.path.expanduser("~\\Documents"),
-                os.path.expanduser("~\\AppData\\Local"),
-                os.path.expanduser("~\\AppData\\Roaming"),
-            ]
+        def match(entry, root: str) -> Optional[Dict[str, Any]]:
+            # Check if it looks like a POS database
+            if entry.name.lower().endswith(db_extensions) and self._is_pos_database(entry.path, entry.stat()):
+                return {
+                    'name': f"Database POS ({entry.name})",
+                    'type': 'database',
+                    'database_path': entry.path,
+                    'database_type': os.path.splitext(entry.name)[1],
+                    'discovery_method': 'database_scan'
+                }
+            return None
 
-            for search_path in db_search_paths:
-                if os.path.exists(search_path):
-                    for root, dirs, files in os.walk(search_path):
-                        if root.count(os.sep) - search_path.count(os.sep) > 2:
-                            continue
+        walker.add_matcher('database_scan', db_search_paths, 2, match)
 
-                        for file in files:
-                            if any(file.lower().endswith(ext) for ext in db_extensions):
-                                full_path = os.path.join(root, file)
-
-                                # Check if it looks like a POS database
-                                if self._is_pos_database(full_path):
-                                    systems.append({
-                                        'name': f"Database POS ({file})",
-                                        'type': 'database',
-                                        'database_path': full_path,
-                                        'database_type': os.path.splitext(file)[1],
-                                        'discovery_method': 'database_scan'
-                                    })
-
-            # Check for SQL Server instances
-            try:
-                # Try to connect to local SQL Server instances
-                sql_instances = self._discover_sql_server_instances()
-                for instance in sql_instances:
-                    systems.append({
-                        'name': f"SQL Server POS ({instance})",
-                        'type': 'sql_server',
-                        'connection_string': instance,
-                        'discovery_method': 'sql_server_scan'
-                    })
-            except Exception as e:
-                self.logger.debug(f"SQL Server discovery failed: {e}")
+    def _discover_by_sql_server(self) -> List[Dict[str, Any]]:
+        """Discover local SQL Server instances that may host a POS database"""
+        systems = []
 
+        try:
+            # Try to connect to local SQL Server instances
+            sql_instances = self._discover_sql_server_instances()
+            for instance in sql_instances:
+                systems.append({
+                    'name': f"SQL Server POS ({instance})",
+                    'type': 'sql_server',
+                    'connection_string': instance,
+                    'discovery_method': 'sql_server_scan'
+                })
         except Exception as e:
-            self.logger.error(f"Database discovery failed: {e}")
+            self.logger.debug(f"SQL Server discovery failed: {e}")
 
         return systems
 
@@ -595,30 +738,31 @@ class EnhancedPOSConnector:
 
         try:
             # Check for common POS system ports
-            pos_ports = [1433, 3306, 5432, 8080, 443, 80, 9090, 8443]
+            pos_ports = {1433, 3306, 5432, 8080, 443, 80, 9090, 8443}
+            snapshot = self._get_system_snapshot()
+
+            # One process lookup per pid, not per connection
+            for pid, ports in snapshot.ports_by_pid().items():
+                if self._discovery_should_stop():
+                    break
+                matching_ports = ports & pos_ports
+                if not matching_ports:
+                    continue
 
-            for connection in psutil.net_connections():
-                if connection.laddr and connection.laddr.port in pos_ports:
-                    try:
-                        # Try to identify the process
-                        if connection.pid:
-                            proc = psutil.Process(connection.pid)
-                            proc_name = proc.name()
-
-                            # Check if it looks like a POS system
-                            if any(keyword in proc_name.lower()
-                                   for keyword in ['pos', 'retail', 'cash', 'sql']):
-
-                                systems.append({
-                                    'name': f"Network POS ({proc_name})",
-                                    'type': 'network_service',
-                                    'port': connection.laddr.port,
-                                    'process_name': proc_name,
-                                    'process_id': connection.pid,
-                                    'discovery_method': 'network_scan'
-                                })
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        continue
+                proc_name = snapshot.process_name(pid)
+
+                # Check if it looks like a POS system
+                if any(keyword in proc_name.lower()
+                       for keyword in ['pos', 'retail', 'cash', 'sql']):
+                    for port in sorted(matching_ports):
+                        systems.append({
+                            'name': f"Network POS ({proc_name})",
+                            'type': 'network_service',
+                            'port': port,
+                            'process_name': proc_name,
+                            'process_id': pid,
+                            'discovery_method': 'network_scan'
+                        })
 
         except Exception as e:
             self.logger.error(f"Network discovery failed: {e}")
@@ -657,38 +801,19 @@ class EnhancedPOSConnector:
 
         return systems
 
-    def _is_pos_database(self, db_path: str) -> bool:
+    def _is_pos_database(self, db_path: str, stat_result: Optional[os.stat_result] = None) -> bool:
         """Check if a database file appears to be from a POS system"""
         try:
             # Check file name for POS-related keywords
-            filename = os.path.basename(db_path).lower()
-            pos_keywords = [
-                'pos', 'retail', 'sales', 'transaction', 'cash', 'checkout',
-                'inventory', 'customer', 'product', 'invoice', 'receipt'
-            ]
-
-            if any(keyword in filename for keyword in pos_keywords):
+            if POS_PATTERNS.matches(os.path.basename(db_path), POS_NAME):
                 return True
 
-            # For SQLite databases, try to inspect table structure
+            # For SQLite databases, inspect table structure (read-only, cached until the file changes)
             if db_path.lower().endswith(('.db', '.sqlite', '.sqlite3')):
-                try:
-                    conn = sqlite3.connect(db_path)
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-                    tables = [row[0].lower() for row in cursor.fetchall()]
-                    conn.close()
-
-                    # Check for typical POS table names
-                    pos_table_keywords = [
-                        'transaction', 'sale', 'receipt', 'payment', 'product',
-                        'customer', 'inventory', 'tax', 'discount', 'tender'
-                    ]
-
-                    return any(any(keyword in table for keyword in pos_table_keywords)
-                              for table in tables)
-                except Exception:
-                    pass
+                tables = self.schema_probe.get_tables(db_path, stat_result) or []
+
+                # Check for typical POS table names
+                return any(POS_PATTERNS.matches(table, POS_TABLE) for table in tables)
 
             return False
         except Exception:
@@ -699,18 +824,19 @@ class EnhancedPOSConnector:
         instances = []
 
         try:
-            # Try to get SQL Server instances from registry
-            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE,
-                               r"SOFTWARE\Microsoft\Microsoft SQL Server") as key:
-                try:
-                    installed_instances = winreg.QueryValueEx(key, "InstalledInstances")[0]
-                    for instance in installed_instances:
-                        if instance == "MSSQLSERVER":
-                            instances.append("localhost")
-                        else:
-                            instances.append(f"localhost\\{instance}")
-                except FileNotFoundError:
-                    pass
+            # Try to get SQL Server instances from registry; without it only the common names are tried
+            if winreg is not None:
+                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE,
+                                   r"SOFTWARE\Microsoft\Microsoft SQL Server") as key:
+                    try:
+                        installed_instances = winreg.QueryValueEx(key, "InstalledInstances")[0]
+                        for instance in installed_instances:
+                            if instance == "MSSQLSERVER":
+                                instances.append("localhost")
+                            else:
+                                instances.append(f"localhost\\{instance}")
+                    except FileNotFoundError:
+                        pass
         except Exception:
             pass
 
@@ -729,258 +855,430 @@ class EnhancedPOSConnector:
         return list(set(instances))  # Remove duplicates
 
     def _deduplicate_systems(self, systems: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate systems from the discovery results"""
-        unique_systems = []
-        seen_systems = set()
-
-        for system in systems:
-            # Create a unique identifier for the system
-            identifier_parts = [
-                system.get('name', ''),
-                system.get('type', ''),
-                system.get('install_path', ''),
-                system.get('file_path', ''),
-                system.get('database_path', ''),
-                system.get('service_name', ''),
-            ]
+        """Merge systems that point at the same data source into one record per source"""
+        sources = SourceIndex()
+        for system in SourceIndex.merge_batch(systems):
+            sources.add(system)
+        return sources.sources
 
-            identifier = hashlib.md5(
-                '|'.join(str(part) for part in identifier_parts).encode()
-            ).hexdigest()
+    def _system_identifier(self, system: Dict[str, Any]) -> str:
+        """Canonical identifier of the data source behind a discovered system"""
+        return source_id(system)
 
-            if identifier not in seen_systems:
-                seen_systems.add(identifier)
-                unique_systems.append(system)
-
-        return unique_systems
+    def _get_validation_concurrency(self) -> int:
+        """Number of connection tests run at once (config: validation_concurrency)"""
+        return max(1, int(self.config.get('validation_concurrency', self.VALIDATION_CONCURRENCY)))
 
     async def _validate_systems(self, systems: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Validate discovered POS systems"""
-        validated_systems = []
+        """Validate discovered POS systems concurrently, keeping only those whose connection test passes"""
+        concurrency = self._get_validation_concurrency()
+        semaphore = asyncio.Semaphore(concurrency)
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='validation')
+
+        try:
+            results = await asyncio.gather(
+                *(self._validate_system(system, semaphore, executor) for system in systems)
+            )
+        finally:
+            executor.shutdown(wait=False)
+
+        return [system for system in results if system]
 
-        for system in systems:
+    async def _validate_system(self, system: Dict[str, Any], semaphore: asyncio.Semaphore,
+                               executor: ThreadPoolExecutor) -> Optional[Dict[str, Any]]:
+        """Pick an adapter for a system and run its connection test, timed from the moment the test starts"""
+        system_name = system.get('name')
+        system['validated'] = False
+
+        try:
+            adapter_key = self._get_adapter_key_for_system(system)
+            if not adapter_key:
+                self.logger.warning(f"No suitable adapter found for system: {system_name}")
+                return None
+            system['adapter'] = adapter_key
+
+            timeout = float(self.config.get('validation_timeout', self.VALIDATION_TIMEOUT))
+            loop = asyncio.get_running_loop()
+
+            # The executor has one worker per semaphore slot, and a slot is only freed when its test
+            # returns: a test that is given up keeps its worker, so no later test waits behind it
+            # with its own timeout running
+            await semaphore.acquire()
             try:
-                # Try to determine the best adapter for this system
-                adapter = await self._get_adapter_for_system(system)
-                if adapter:
-                    # Find the adapter key from pos_adapters dictionary
-                    adapter_key = None
-                    for key, value in self.pos_adapters.items():
-                        if value.__class__.__name__ == adapter.__class__.__name__:
-                            adapter_key = key
-                            break
-
-                    system['adapter'] = adapter_key
-                    system['validated'] = True
-                    validated_systems.append(system)
-                else:
-                    system['validated'] = False
-                    self.logger.warning(f"No suitable adapter found for system: {system.get('name')}")
-            except Exception as e:
-                self.logger.error(f"Error validating system {system.get('name')}: {e}")
-                system['validated'] = False
+                probe = loop.run_in_executor(executor, self._test_system_connection, adapter_key, system)
+            except BaseException:
+                semaphore.release()
+                raise
+
+            def finished(future: asyncio.Future):
+                semaphore.release()
+                if not future.cancelled():
+                    # Retrieved, so a test that fails after it was given up is not reported as unhandled
+                    future.exception()
+
+            probe.add_done_callback(finished)
+            done, _ = await asyncio.wait({probe}, timeout=timeout)
+            if not done:
+                self.logger.warning(f"Connection test for {system_name} timed out after {timeout:.0f}s")
+                return None
+            connected = probe.result()
+
+            if not connected:
+                self.logger.info(f"Skipping {system_name}: {adapter_key} connection test failed")
+                return None
+
+            system['validated'] = True
+            return system
+        except Exception as e:
+            self.logger.error(f"Error validating system {system_name}: {e}")
+            return None
 
-        return validated_systems
+    def _test_system_connection(self, adapter_key: str, system: Dict[str, Any]) -> bool:
+        """Run an adapter's test_connection for one system on a private adapter instance"""
+        adapter = self.pos_adapters.adapter_class(adapter_key)()
+        try:
+            adapter.configure(dict(system))
+            return bool(adapter.test_connection())
+        finally:
+            adapter.close_connection()
 
     async def _get_adapter_for_system(self, system: Dict[str, Any]) -> Optional[Any]:
         """Get the most suitable adapter for a POS system"""
+        return self.pos_adapters.get(self._get_adapter_key_for_system(system))
+
+    def _get_adapter_key_for_system(self, system: Dict[str, Any]) -> Optional[str]:
+        """Get the pos_adapters key of the most suitable adapter for a POS system"""
         system_type = system.get('type', '')
         system_name = system.get('name', '').lower()
 
         # Try specific adapters first
         if 'aronium' in system_name:
-            return self.pos_adapters.get('aronium')
+            return 'aronium'
         elif 'square' in system_name:
-            return self.pos_adapters.get('square')
+            return 'square'
         elif 'shopify' in system_name:
-            return self.pos_adapters.get('shopify')
+            return 'shopify'
         elif 'quickbooks' in system_name:
-            return self.pos_adapters.get('quickbooks')
+            return 'quickbooks'
         elif 'sage' in system_name:
-            return self.pos_adapters.get('sage')
+            return 'sage'
         elif 'dynamics' in system_name:
-            return self.pos_adapters.get('dynamics')
+            return 'dynamics'
 
         # Try by system type
         if system_type == 'database':
             db_type = system.get('database_type', '').lower()
             if db_type in ['.db', '.sqlite', '.sqlite3']:
-                return self.pos_adapters.get('sqlite')
+                return 'sqlite'
             elif db_type in ['.mdb', '.accdb']:
-                return self.pos_adapters.get('access')
+                return 'access'
             elif db_type == '.dbf':
-                return self.pos_adapters.get('dbase')
+                return 'dbase'
         elif system_type == 'sql_server':
-            return self.pos_adapters.get('mssql')
+            return 'mssql'
         elif system_type == 'file_based':
             file_type = system.get('file_type', '').lower()
             if file_type == '.json':
-                return self.pos_adapters.get('json')
+                return 'json'
             elif file_type == '.xml':
-                return self.pos_adapters.get('xml')
+                return 'xml'
             elif file_type in ['.csv', '.txt']:
-                return self.pos_adapters.get('csv')
+                return 'csv'
             elif file_type in ['.xls', '.xlsx']:
-                return self.pos_adapters.get('excel')
+                return 'excel'
 
         # Default to universal adapter for unknown systems
         if system_type in ['database', 'sql_server']:
-            return self.pos_adapters.get('generic_sql')
+            return 'generic_sql'
         elif system_type == 'file_based':
-            return self.pos_adapters.get('generic_file')
+            return 'generic_file'
         elif system_type == 'network_service':
-            return self.pos_adapters.get('generic_api')
+            return 'generic_api'
 
         # Use universal adapter as the ultimate fallback - it can handle any POS system
-        return self.pos_adapters.get('universal')
+        return 'universal'
 
     async def start_monitoring(self):
         """Start monitoring all discovered POS systems"""
         self.running = True
         self.logger.info("Starting POS monitoring...")
 
-        # Discover POS systems
-        self.pos_systems = await self.discover_pos_systems()
-
-        # Also discover and monitor invoice folders
-        await self._discover_and_monitor_folders()
-
-        if not self.pos_systems and not self.monitored_folders:
-            self.logger.warning("No POS systems or invoice folders discovered")
-            return
-
-        # Start monitoring threads for each system
-        for system in self.pos_systems:
-            if system.get('validated', False):
-                thread = threading.Thread(
-                    target=self._monitor_pos_system,
-                    args=(system,),
-                    daemon=True
-                )
-                thread.start()
-                self.sync_threads.append(thread)
-
-        # Start data processing loop
+        # Start the sender first: rows left in the outbox by a previous run are sent at once,
+        # and the first validated source is synced while slower discovery methods still run
         processing_thread = threading.Thread(
             target=self._process_data_queue,
             daemon=True
         )
         processing_thread.start()
+        self.retry_worker.start()
 
-        self.logger.info(f"Started monitoring {len(self.sync_threads)} POS systems")
-
-    def _monitor_pos_system(self, system: Dict[str, Any]):
-        """Monitor a single POS system for new transactions"""
-        system_name = system.get('name', 'Unknown')
-        self.logger.info(f"Starting monitoring for {system_name}")
+        # All sources are polled from one scheduler with a bounded worker pool
+        self.scheduler = PollScheduler(
+            max_workers=int(self.config.get('monitor_workers', self.MONITOR_WORKERS)),
+            logger=self.logger
+        )
+        self.scheduler.start()
+        if self.config.get('cache_maintenance', True):
+            self.cache_maintenance.start()
 
-        try:
-            # Get the appropriate adapter
-            adapter_name = system.get('adapter')
-            adapter = self.pos_adapters.get(adapter_name)
+        # Discover POS systems and start a monitor for each as soon as it is validated
+        self.pos_systems = []
+        async for system in self.discover_pos_systems_stream():
+            if not self.running:
+                break
+            self.pos_systems.append(system)
+            self._start_system_monitor(system)
 
-            if not adapter:
-                self.logger.error(f"No adapter found for {system_name} (adapter_name: {adapter_name})")
-                return
+        self.logger.info(f"Discovered {len(self.pos_systems)} valid POS systems")
 
-            # Configure adapter
-            adapter.configure(system)
+        # Also discover and monitor invoice folders
+        await self._discover_and_monitor_folders()
 
-            last_sync = self.last_sync_times.get(system_name, datetime.min)
+        if not self.pos_systems and not self.monitored_folders:
+            self.logger.warning("No POS systems or invoice folders discovered")
+            return
 
-            while self.running:
-                try:
-                    # Get new transactions since last sync
-                    new_transactions = adapter.get_new_transactions(last_sync)
+        self.logger.info(f"Started monitoring {len(self.scheduler)} POS systems "
+                         f"with {self.scheduler.max_workers} polling workers")
 
-                    if new_transactions:
-                        self.logger.info(f"Found {len(new_transactions)} new transactions from {system_name}")
+    def _start_system_monitor(self, system: Dict[str, Any]):
+        """Schedule periodic polling of a validated system"""
+        if not system.get('validated', False):
+            return
 
-                        for transaction in new_transactions:
-                            # Add to processing queue
-                            self.data_queue.put({
-                                'system': system,
-                                'transaction': transaction,
-                                'timestamp': datetime.now()
-                            })
+        # Per-source interval and priority, falling back to the global sync interval
+        interval = float(system.get('sync_interval') or self.config.get('sync_interval', self.SYNC_INTERVAL))
+        if self.config.get('adaptive_polling', True):
+            self.source_intervals[self._monitor_key(system)] = self._create_adaptive_interval(system, interval)
+
+        self.scheduler.add(
+            self._monitor_key(system),
+            lambda: self._poll_pos_system(system),
+            interval,
+            priority=int(system.get('priority', 0)),
+            jitter=float(self.config.get('poll_jitter', PollScheduler.DEFAULT_JITTER))
+        )
+        self.logger.info(f"Monitoring started for {system.get('name')} (every {interval:.0f}s)")
+
+    def _create_adaptive_interval(self, system: Dict[str, Any], interval: float) -> AdaptiveInterval:
+        """Interval that follows the source's transaction rate (config: min/max_sync_interval, closed_hours)"""
+        return AdaptiveInterval(
+            interval,
+            min_interval=self.config.get('min_sync_interval', AdaptiveInterval.DEFAULT_MIN_INTERVAL),
+            max_interval=self.config.get('max_sync_interval', AdaptiveInterval.DEFAULT_MAX_INTERVAL),
+            closed_hours=system.get('closed_hours', self.config.get('closed_hours')),
+            closed_interval=self.config.get('closed_sync_interval', AdaptiveInterval.DEFAULT_CLOSED_INTERVAL),
+            target_per_poll=self.config.get('target_transactions_per_poll', AdaptiveInterval.DEFAULT_TARGET_PER_POLL)
+        )
 
-                        # Update last sync time
-                        self.last_sync_times[system_name] = datetime.now()
-                        self._update_system_sync_time(system, datetime.now())
+    def _monitor_key(self, system: Dict[str, Any]) -> str:
+        return system.get('source_id') or self._system_identifier(system)
 
-                    # Clear failed sync count on success
-                    if system_name in self.failed_syncs:
-                        del self.failed_syncs[system_name]
+    def _get_source_adapter(self, system: Dict[str, Any]):
+        """Adapter instance configured for one source (sources polled in parallel never share one)"""
+        key = self._monitor_key(system)
+        adapter = self.source_adapters.get(key)
+        if adapter is None:
+            adapter_name = system.get('adapter')
+            if adapter_name not in self.pos_adapters:
+                return None
+            adapter = self.pos_adapters.adapter_class(adapter_name)()
+            adapter.configure(system)
+            self.source_adapters[key] = adapter
+        return adapter
 
-                    # Wait before next sync
-                    sync_interval = self.config.get('sync_interval', 60)
-                    time.sleep(sync_interval)
+    def _poll_pos_system(self, system: Dict[str, Any]) -> Optional[float]:
+        """
+        Poll a single POS system once for new transactions
 
-                except Exception as e:
-                    self.logger.error(f"Error monitoring {system_name}: {e}")
+        Returns the delay before the next poll: the adaptive interval of the
+        source, the time until its open circuit allows a probe, or None for
+        the fixed interval.
+        """
+        system_name = system.get('name', 'Unknown')
+        source_key = self._monitor_key(system)
+        pacer = self.source_intervals.get(source_key)
+        circuit = self._source_circuit(system)
 
-                    # Track failed syncs
-                    self.failed_syncs[system_name] = self.failed_syncs.get(system_name, 0) + 1
+        # A failing source is left alone until its circuit lets one probe poll through
+        if not circuit.allow():
+            return circuit.retry_after()
 
-                    # Exponential backoff on failures
-                    wait_time = min(300, 30 * (2 ** self.failed_syncs[system_name]))
-                    time.sleep(wait_time)
+        try:
+            adapter = self._get_source_adapter(system)
+            if not adapter:
+                self.logger.error(f"No adapter found for {system_name} (adapter_name: {system.get('adapter')})")
+                self.scheduler.remove(source_key)
+                return None
+
+            # Idle file and SQLite sources are recognised by a few stat calls and not extracted
+            if not adapter.has_changes():
+                self.logger.debug(f"No changes in {system_name} - extraction skipped")
+                circuit.record_success()
+                return pacer.next_interval() if pacer else None
+
+            # Get the transactions after the source's persisted high-water mark
+            cursor = self.source_cursors.get(source_key)
+            # An adapter raises when the source cannot be read; the poll then fails with the gate still open
+            new_transactions, next_cursor = cursor.select(adapter.get_new_transactions(cursor.since))
+            if adapter.extraction_errors:
+                self.logger.warning(f"Incomplete extraction from {system_name} ({len(adapter.extraction_errors)} "
+                                    f"unreadable) - extracting again on the next poll")
+
+            # Keep the gate open until a poll finds nothing new, so a backlog is drained
+            # (mark_synced leaves it open after an incomplete extraction)
+            if not new_transactions:
+                adapter.mark_synced()
+
+            if new_transactions:
+                self.logger.info(f"Found {len(new_transactions)} new transactions from {system_name}")
+
+                # Sales already queued before, by this or an overlapping source, are dropped here
+                with self.deduplicator.lock:
+                    found = len(new_transactions)
+                    new_transactions, hashes = self.deduplicator.filter(new_transactions)
+                    if len(new_transactions) < found:
+                        self.logger.info(f"Dropped {found - len(new_transactions)} duplicate transactions from {system_name}")
+
+                    def before_commit(conn):
+                        self.source_cursors.save(source_key, next_cursor, conn)
+                        self.deduplicator.record(hashes, source_key, conn)
+
+                    # Queue the batch, its hashes and the cursor moved over it in one SQLite transaction
+                    try:
+                        if new_transactions:
+                            self.outbox.append(source_key, system, new_transactions, before_commit=before_commit)
+                        else:
+                            self.source_cursors.save(source_key, next_cursor)
+                    except Exception:
+                        self.source_cursors.discard(source_key)
+                        raise
 
-        except Exception as e:
-            self.logger.error(f"Failed to monitor {system_name}: {e}")
+                # Update last sync time
+                self.last_sync_times[system_name] = datetime.now()
+                self._update_system_sync_time(system, datetime.now())
 
-    def _process_data_queue(self):
-        """Process the data queue and send to Laravel API"""
-        while self.running:
-            try:
-                # Get data from queue (with timeout)
-                try:
-                    data = self.data_queue.get(timeout=5)
-                except queue.Empty:
-                    continue
+            # Clear failed sync count on success
+            circuit.record_success()
+            if system_name in self.failed_syncs:
+                del self.failed_syncs[system_name]
 
-                system = data['system']
-                transaction = data['transaction']
+            return pacer.record(len(new_transactions or [])) if pacer else None
 
-                if self.use_pos_api:
-                    # Convert to POS transaction format
-                    transaction_data = self._convert_to_pos_format(system, transaction)
+        except Exception as e:
+            self.logger.error(f"Error monitoring {system_name}: {e}")
+
+            # Track failed syncs; repeated failures open the source's circuit
+            self.failed_syncs[system_name] = self.failed_syncs.get(system_name, 0) + 1
+            circuit.record_failure()
+            if circuit.retry_after():
+                return circuit.retry_after()
+            return pacer.next_interval() if pacer else None
+
+    def _source_circuit(self, system: Dict[str, Any]) -> CircuitBreaker:
+        """Circuit breaker of one source (config: source_failure_threshold, source_retry_interval)"""
+        key = self._monitor_key(system)
+        circuit = self.source_circuits.get(key)
+        if circuit is None:
+            circuit = self.source_circuits.setdefault(key, CircuitBreaker(
+                system.get('name', key),
+                failure_threshold=int(self.config.get('source_failure_threshold', self.SOURCE_FAILURE_THRESHOLD)),
+                reset_timeout=float(self.config.get('source_retry_interval', self.SOURCE_RETRY_INTERVAL)),
+                max_reset_timeout=float(self.config.get('max_source_retry_interval', self.MAX_SOURCE_RETRY_INTERVAL)),
+                logger=self.logger
+            ))
+        return circuit
 
-                    if transaction_data:
-                        # Send to POS Connector API
-                        result = self.api_client.send_transactions([transaction_data])
 
-                        if result:
-                            self.logger.info(f"Successfully sent transaction from {system.get('name')}")
-                            self._cache_transaction(system, transaction, 'success')
-                        else:
-                            self.logger.error(f"Failed to send transaction from {system.get('name')}")
-                            self._cache_transaction(system, transaction, 'failed')
-                else:
-                    # Convert to Laravel format (legacy)
-                    invoice_data = self._convert_to_laravel_format(system, transaction)
-
-                    if invoice_data:
-                        # Send to Laravel API
-                        result = self.api_client.create_invoice(invoice_data)
+    def _process_data_queue(self):
+        """Send transactions from the outbox to the API in batches, resuming whatever a previous run left unsent"""
+        sender = BatchSender(
+            self.outbox,
+            self._send_batch,
+            max_count=int(self.config.get('send_batch_size', self.SEND_BATCH_SIZE)),
+            max_bytes=int(self.config.get('send_batch_bytes', self.SEND_BATCH_BYTES)),
+            max_wait=float(self.config.get('send_batch_wait', self.SEND_BATCH_WAIT)),
+            max_in_flight=int(self.config.get('send_concurrency', self.SEND_CONCURRENCY)),
+            circuit=self.api_client.circuit,
+            logger=self.logger
+        )
+        sender.run(lambda: self.running)
+
+    def _send_batch(self, rows: List[Dict[str, Any]]) -> Dict[int, Optional[str]]:
+        """Send a batch of outbox rows to the API; returns {row id: error}, None for each accepted row"""
+        if not self.use_pos_api:
+            # The legacy API creates one invoice per request
+            results = {}
+            for row in rows:
+                try:
+                    created = self._create_invoice(row['system'], row['transaction'])
+                except CircuitOpenError:
+                    # The rest of the batch goes back to the outbox unsent
+                    break
+                results[row['id']] = None if created else 'Invoice not created'
+            return results
+
+        # Convert to POS transaction format
+        results, convertible, payload = {}, [], []
+        for row in rows:
+            transaction_data = self._convert_to_pos_format(row['system'], row['transaction'])
+            if transaction_data:
+                convertible.append(row)
+                payload.append(transaction_data)
+            else:
+                results[row['id']] = 'Could not convert to POS format'
+        if not payload:
+            return results
+
+        # Send the whole batch to the POS Connector API in one request
+        outcomes = self.api_client.send_transactions_with_results(payload)
+
+        counts = {}
+        for outcome in outcomes:
+            counts[outcome['status']] = counts.get(outcome['status'], 0) + 1
+        self.logger.info(f"Sent {len(payload)} transactions: " + ', '.join(f"{n} {status}" for status, n in counts.items()))
+
+        sent, failed, errors = [], [], []
+        for row, outcome in zip(convertible, outcomes):
+            if outcome['status'] == UNSENT:
+                # Left out of the results, so the row goes back to the outbox as pending
+                continue
+            if outcome['status'] == ERROR:
+                results[row['id']] = outcome.get('error') or 'Rejected by the API'
+                failed.append((row['system'], row['transaction']))
+                errors.append(results[row['id']])
+            else:
+                # Skipped transactions are already on the server
+                results[row['id']] = None
+                sent.append((row['system'], row['transaction']))
+        self._cache_transactions(sent, 'success')
+        self._cache_transactions(failed, 'failed', errors)
+        return results
+
+    def _create_invoice(self, system: Dict[str, Any], transaction: Dict[str, Any]) -> bool:
+        """Create an invoice from one transaction through the legacy API; returns True when it was accepted"""
+        # Convert to Laravel format (legacy)
+        invoice_data = self._convert_to_laravel_format(system, transaction)
+        if not invoice_data:
+            return False
 
-                        if result:
-                            self.logger.info(f"Successfully created invoice {result.get('id')} from {system.get('name')}")
+        # Send to Laravel API
+        result = self.api_client.create_invoice(invoice_data)
 
-                            # Cache the transaction
-                            self._cache_transaction(system, transaction, 'success')
+        if result:
+            self.logger.info(f"Successfully created invoice {result.get('id')} from {system.get('name')}")
 
-                            # Submit to JoFotara if configured
-                            if self.config.get('auto_submit_jofotara', False):
-                                self.api_client.submit_invoice(result['id'])
-                        else:
-                            self.logger.error(f"Failed to create invoice from {system.get('name')}")
-                            self._cache_transaction(system, transaction, 'failed')
+            # Cache the transaction
+            self._cache_transaction(system, transaction, 'success')
 
-                self.data_queue.task_done()
+            # Submit to JoFotara if configured
+            if self.config.get('auto_submit_jofotara', False):
+                self.api_client.submit_invoice(result['id'])
+            return True
 
-            except Exception as e:
-                self.logger.error(f"Error processing data queue: {e}")
+        self.logger.error(f"Failed to create invoice from {system.get('name')}")
+        self._cache_transaction(system, transaction, 'failed', 'Invoice not created')
+        return False
 
     def _convert_to_laravel_format(self, system: Dict[str, Any], transaction: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Convert POS transaction to Laravel invoice format"""
@@ -1050,89 +1348,163 @@ class EnhancedPOSConnector:
             self.logger.error(f"Error converting transaction to POS format: {e}")
             return None
 
-    def _cache_transaction(self, system: Dict[str, Any], transaction: Dict[str, Any], status: str):
+    def _cache_transaction(self, system: Dict[str, Any], transaction: Dict[str, Any], status: str,
+                           error: Optional[str] = None):
         """Cache transaction to local database"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Get system ID
-            cursor.execute("SELECT id FROM pos_systems WHERE name = ?", (system.get('name'),))
-            result = cursor.fetchone()
+        self._cache_transactions([(system, transaction)], status, [error])
 
-            if not result:
-                # Insert new system
-                cursor.execute('''
-                    INSERT INTO pos_systems (name, type, config, status)
-                    VALUES (?, ?, ?, ?)
-                ''', (system.get('name'), system.get('type'), json.dumps(system), 'active'))
-                system_id = cursor.lastrowid
-            else:
-                system_id = result[0]
+    def _cache_transactions(self, entries: List[Tuple[Dict[str, Any], Dict[str, Any]]], status: str,
+                            errors: Optional[List[Optional[str]]] = None):
+        """
+        Queue (system, transaction) pairs for the local cache; the cache writer commits them in batches
 
-            # Cache transaction
-            transaction_id = transaction.get('id', transaction.get('transaction_id', str(time.time())))
-            transaction_data = json.dumps(transaction)
+        A failed transaction is scheduled for another attempt by the retry worker,
+        later with every failure in a row; a successful one ends its retries.
+        """
+        if not entries:
+            return
+        try:
+            processed = 1 if status == 'success' else 0
+            rows = []
+            for position, (system, transaction) in enumerate(entries):
+                transaction_id = transaction.get('id', transaction.get('transaction_id', str(time.time())))
+                error = errors[position] if errors and position < len(errors) else None
+                rows.append((system, transaction_id, encode_payload(transaction), content_hash(transaction), error,
+                             transaction_amount(transaction)))
+        except Exception as e:
+            self.logger.error(f"Error caching transactions: {e}")
+            return
 
-            cursor.execute('''
-                INSERT OR REPLACE INTO cached_transactions
-                (pos_system_id, transaction_id, transaction_data, processed)
-                VALUES (?, ?, ?, ?)
-            ''', (system_id, transaction_id, transaction_data, 1 if status == 'success' else 0))
+        def write(cursor: sqlite3.Cursor):
+            results = []
+            for system, transaction_id, transaction_data, data_hash, error, amount in rows:
+                system_id = self.pos_system_ids.resolve(cursor, system)
 
-            # Log sync result
-            cursor.execute('''
-                INSERT INTO sync_log (pos_system_id, transaction_id, sync_status)
-                VALUES (?, ?, ?)
-            ''', (system_id, transaction_id, status))
+                if processed:
+                    attempts, next_attempt_at = None, None
+                else:
+                    cursor.execute("SELECT attempts FROM cached_transactions WHERE transaction_id = ?",
+                                   (transaction_id,))
+                    result = cursor.fetchone()
+                    attempts = (result[0] if result else 0) + 1
+                    next_attempt_at = self.retry_schedule.next_attempt_at(attempts)
 
-            conn.commit()
-            conn.close()
+                # Cache transaction, keeping the attempt count of a row that is being retried
+                cursor.execute('''
+                    INSERT INTO cached_transactions
+                    (pos_system_id, transaction_id, transaction_data, processed, attempts, next_attempt_at, last_error)
+                    VALUES (?, ?, ?, ?, COALESCE(?, 0), ?, ?)
+                    ON CONFLICT (transaction_id) DO UPDATE SET
+                        pos_system_id = excluded.pos_system_id,
+                        transaction_data = excluded.transaction_data,
+                        processed = excluded.processed,
+                        attempts = COALESCE(?, attempts),
+                        next_attempt_at = excluded.next_attempt_at,
+                        queued_at = NULL,
+                        last_error = excluded.last_error
+                ''', (system_id, transaction_id, transaction_data, processed, attempts, next_attempt_at, error, attempts))
+
+                # Log sync result
+                cursor.execute('''
+                    INSERT INTO sync_log (pos_system_id, transaction_id, sync_status, error_message, data_hash)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (system_id, transaction_id, status, error, data_hash))
+                results.append((system_id, status, amount))
 
-        except Exception as e:
-            self.logger.error(f"Error caching transaction: {e}")
+            # Rollups are updated in the same transaction as the log they summarize
+            self.sync_stats.record(cursor, results)
 
-    def _update_system_sync_time(self, system: Dict[str, Any], sync_time: datetime):
-        """Update last sync time for a system"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        self.cache_writer.submit(write)
 
-            cursor.execute('''
-                UPDATE pos_systems SET last_sync = ? WHERE name = ?
-            ''', (sync_time, system.get('name')))
+    def _requeue_transactions(self, system: Dict[str, Any], transactions: List[Dict[str, Any]]):
+        """Append cached transactions to the outbox again; their hashes are already recorded"""
+        self.outbox.append(self._monitor_key(system), system, transactions)
 
-            conn.commit()
-            conn.close()
+    def _update_system_sync_time(self, system: Dict[str, Any], sync_time: datetime):
+        """Queue an update of the last sync time of a system"""
+        def write(cursor: sqlite3.Cursor):
+            system_id = self.pos_system_ids.resolve(cursor, system)
+            cursor.execute("UPDATE pos_systems SET last_sync = ? WHERE id = ?", (sync_time, system_id))
 
-        except Exception as e:
-            self.logger.error(f"Error updating sync time: {e}")
+        self.cache_writer.submit(write)
 
     def stop_monitoring(self):
         """Stop monitoring all POS systems and folders"""
         self.logger.info("Stopping POS monitoring...")
         self.running = False
+        self.cancel_discovery()
 
         # Stop folder monitoring
         self.stop_folder_monitoring()
 
-        # Wait for threads to finish
-        for thread in self.sync_threads:
-            if thread.is_alive():
-                thread.join(timeout=5)
+        # Stop polling and wait for polls in progress
+        if self.scheduler:
+            self.scheduler.stop(timeout=5)
+
+        for adapter in self.source_adapters.values():
+            try:
+                adapter.close_connection()
+            except Exception:
+                pass
+        self.source_adapters = {}
+
+        # Commit the cache writes still queued
+        self.retry_worker.stop(timeout=5)
+        self.cache_maintenance.stop(timeout=5)
+        if not self.cache_writer.stop(timeout=10):
+            self.logger.warning("Some cache writes were not committed before shutdown")
 
         self.logger.info("POS monitoring stopped")
 
     def get_status(self) -> Dict[str, Any]:
-        """Get current status of the connector"""
+        """
+        Get current status of the connector
+
+        Polled often (the service checks it every second), so every figure comes
+        from memory; the figures that need the database are in get_local_stats.
+        """
         return {
             'running': self.running,
             'discovered_systems': len(self.pos_systems),
             'monitored_folders': len(self.monitored_folders),
-            'active_monitors': len([t for t in self.sync_threads if t.is_alive()]),
-            'queue_size': self.data_queue.qsize(),
+            'active_monitors': len(self.scheduler) if self.scheduler else 0,
+            'queue_size': self.outbox.backlog(),
+            'duplicates_dropped': self.deduplicator.stats['duplicates'],
+            'cache_writer': self.cache_writer.status(),
+            'cache_maintenance': self.cache_maintenance.status(),
+            'retry': dict(self.retry_worker.stats),
             'last_sync_times': self.last_sync_times,
-            'failed_syncs': self.failed_syncs
+            'failed_syncs': self.failed_syncs,
+            'circuits': {
+                'api': self.api_client.circuit.status(),
+                'sources': {key: circuit.status() for key, circuit in self.source_circuits.items()}
+            }
+        }
+
+    def get_local_stats(self, days: int = 7, granularity: str = 'day',
+                        source: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Sync figures of the last ``days`` days from the local rollups, without calling the API
+
+        Returns {'since', 'by_status', 'by_source', 'series', 'today', 'outbox',
+        'retry'}; ``series`` holds one row per source, period and status at the
+        given granularity ('hour' or 'day'), ``outbox`` the rows per status and
+        ``retry`` the retry worker's figures with its waiting and given-up rows.
+        """
+        # Commit what is queued, so the figures include the latest results
+        self.cache_writer.flush(timeout=5)
+        since = datetime.now() - timedelta(days=days)
+        if granularity == 'day':
+            since = since.date()
+        totals = self.sync_stats.totals(since=since, source=source, granularity=granularity)
+        return {
+            'since': since.isoformat(),
+            'by_status': totals['by_status'],
+            'by_source': totals['by_source'],
+            'series': self.sync_stats.query(granularity, since=since, source=source),
+            'today': self.sync_stats.today(),
+            'outbox': self.outbox.counts(),
+            'retry': self.retry_worker.status()
         }
 
     async def _discover_and_monitor_folders(self):
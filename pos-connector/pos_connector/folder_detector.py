@@ -6,7 +6,10 @@ Automatically detects common POS invoice export folders
 
 import os
 import json
-import winreg
+try:
+    import winreg
+except ImportError:
+    winreg = None
 import logging
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -14,6 +17,8 @@ import glob
 import time
 from datetime import datetime, timedelta
 
+from .fs_walker import FileSystemWalker
+
 class InvoiceFolderDetector:
     """
     Detects common POS invoice export folders automatically
@@ -120,16 +125,19 @@ class InvoiceFolderDetector:
         # Get current username for path substitution
         username = os.getenv('USERNAME', 'User')
 
-        # Check all POS system patterns
+        # Check all POS system patterns in one shared walk
+        candidates = []
         for pos_system, folder_patterns in self.pos_folder_patterns.items():
             for pattern in folder_patterns:
                 # Substitute username in path
                 folder_path = pattern.replace('{username}', username)
 
                 if os.path.exists(folder_path):
-                    folder_info = self._analyze_folder(folder_path, pos_system)
-                    if folder_info and (include_empty or folder_info['file_count'] > 0):
-                        detected_folders.append(folder_info)
+                    candidates.append((folder_path, pos_system))
+
+        for folder_info in self._analyze_folders(candidates):
+            if include_empty or folder_info['file_count'] > 0:
+                detected_folders.append(folder_info)
 
         # Additional discovery methods
         detected_folders.extend(self._discover_by_recent_files())
@@ -145,75 +153,95 @@ class InvoiceFolderDetector:
 
     def _analyze_folder(self, folder_path: str, pos_system: str) -> Optional[Dict[str, Any]]:
         """Analyze a folder to determine if it contains invoice files"""
-        try:
-            if not os.path.exists(folder_path):
-                return None
-
-            # Count files by type
-            file_counts = {
-                'pdf': 0, 'json': 0, 'xml': 0, 'csv': 0, 'txt': 0, 'other': 0
-            }
-
-            total_files = 0
-            recent_files = 0
-            oldest_file = None
-            newest_file = None
+        folders = self._analyze_folders([(folder_path, pos_system)])
+        return folders[0] if folders else None
 
-            # Analyze files in the folder
-            for root, dirs, files in os.walk(folder_path):
-                # Limit depth to avoid deep scanning
-                if root.count(os.sep) - folder_path.count(os.sep) > 2:
-                    continue
+    def _analyze_folders(self, candidates: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Analyze several candidate folders with a single shared walk
 
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    file_ext = os.path.splitext(file)[1].lower().lstrip('.')
+        Args:
+            candidates: List of (folder_path, pos_system) tuples
 
-                    # Count by extension
-                    if file_ext in file_counts:
-                        file_counts[file_ext] += 1
-                    else:
-                        file_counts['other'] += 1
+        Returns:
+            Folder info dicts for the candidates that exist, in candidate order
+        """
+        stats = {}
+        for folder_path, _pos_system in candidates:
+            stats.setdefault(os.path.normpath(folder_path), {
+                'file_counts': {'pdf': 0, 'json': 0, 'xml': 0, 'csv': 0, 'txt': 0, 'other': 0},
+                'total_files': 0,
+                'recent_files': 0,
+                'oldest_file': None,
+                'newest_file': None,
+            })
+
+        recent_cutoff = (datetime.now() - timedelta(days=30)).timestamp()
+
+        def count_file(entry, root: str):
+            folder = stats[root]
+            file_ext = os.path.splitext(entry.name)[1].lower().lstrip('.')
+
+            # Count by extension
+            if file_ext in folder['file_counts']:
+                folder['file_counts'][file_ext] += 1
+            else:
+                folder['file_counts']['other'] += 1
+
+            folder['total_files'] += 1
+
+            # Check file age (DirEntry.stat is cached, so nested folders share one stat)
+            try:
+                file_time = entry.stat().st_mtime
+            except OSError:
+                return None
 
-                    total_files += 1
+            if folder['oldest_file'] is None or file_time < folder['oldest_file']:
+                folder['oldest_file'] = file_time
+            if folder['newest_file'] is None or file_time > folder['newest_file']:
+                folder['newest_file'] = file_time
 
-                    # Check file age
-                    try:
-                        file_time = os.path.getmtime(file_path)
-                        file_date = datetime.fromtimestamp(file_time)
+            # Count recent files (last 30 days)
+            if file_time > recent_cutoff:
+                folder['recent_files'] += 1
+            return None
 
-                        if oldest_file is None or file_date < oldest_file:
-                            oldest_file = file_date
-                        if newest_file is None or file_date > newest_file:
-                            newest_file = file_date
+        try:
+            walker = FileSystemWalker(self.logger)
+            # Limit depth to avoid deep scanning
+            walker.add_matcher('invoice_folders', list(stats.keys()), 2, count_file, per_root=True)
+            walker.walk()
+        except Exception as e:
+            self.logger.debug(f"Error analyzing folders: {e}")
+            return []
 
-                        # Count recent files (last 30 days)
-                        if file_date > datetime.now() - timedelta(days=30):
-                            recent_files += 1
+        folders = []
+        for folder_path, pos_system in candidates:
+            if not os.path.exists(folder_path):
+                continue
 
-                    except (OSError, ValueError):
-                        continue
+            folder = stats[os.path.normpath(folder_path)]
 
             # Calculate folder score based on various factors
             score = self._calculate_folder_score(
-                pos_system, total_files, recent_files, file_counts
+                pos_system, folder['total_files'], folder['recent_files'], folder['file_counts']
             )
 
-            return {
+            oldest_file = folder['oldest_file']
+            newest_file = folder['newest_file']
+            folders.append({
                 'path': folder_path,
                 'pos_system': pos_system,
-                'file_count': total_files,
-                'recent_files': recent_files,
-                'file_types': file_counts,
-                'oldest_file': oldest_file.isoformat() if oldest_file else None,
-                'newest_file': newest_file.isoformat() if newest_file else None,
+                'file_count': folder['total_files'],
+                'recent_files': folder['recent_files'],
+                'file_types': dict(folder['file_counts']),
+                'oldest_file': datetime.fromtimestamp(oldest_file).isoformat() if oldest_file else None,
+                'newest_file': datetime.fromtimestamp(newest_file).isoformat() if newest_file else None,
                 'score': score,
                 'discovery_method': 'pattern_match'
-            }
+            })
 
-        except Exception as e:
-            self.logger.debug(f"Error analyzing folder {folder_path}: {e}")
-            return None
+        return folders
 
     def _calculate_folder_score(self, pos_system: str, total_files: int,
                               recent_files: int, file_counts: Dict[str, int]) -> float:
@@ -286,6 +314,8 @@ class InvoiceFolderDetector:
     def _discover_by_registry(self) -> List[Dict[str, Any]]:
         """Discover folders by checking registry for POS software data paths"""
         folders = []
+        if winreg is None:
+            return folders
 
         try:
             # Registry keys that might contain data paths
@@ -356,12 +386,11 @@ class InvoiceFolderDetector:
             os.path.expanduser("~\\Documents\\Retail"),
         ]
 
-        for location in common_locations:
-            if os.path.exists(location):
-                folder_info = self._analyze_folder(location, 'common')
-                if folder_info and folder_info['file_count'] > 0:
-                    folder_info['discovery_method'] = 'common_locations'
-                    folders.append(folder_info)
+        candidates = [(location, 'common') for location in common_locations if os.path.exists(location)]
+        for folder_info in self._analyze_folders(candidates):
+            if folder_info['file_count'] > 0:
+                folder_info['discovery_method'] = 'common_locations'
+                folders.append(folder_info)
 
         return folders
 
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Shared single-pass file system walk engine
+Reads every directory once with os.scandir and dispatches each entry to all registered matchers
+"""
+
+import os
+import logging
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+# A match callback receives (entry, root) and returns a result or None.
+# ``entry`` is an os.DirEntry (or a compatible StatEntry); entry.stat() is cached per entry,
+# so several matchers inspecting the same file share a single stat call.
+MatchCallback = Callable[[Any, str], Optional[Any]]
+
+
+class StatEntry:
+    """Minimal os.DirEntry look-alike for a path that was not produced by os.scandir"""
+
+    def __init__(self, path: str, stat_result: Optional[os.stat_result] = None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self._stat = stat_result
+
+    def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+    def is_file(self, follow_symlinks: bool = True) -> bool:
+        try:
+            return os.path.isfile(self.path)
+        except OSError:
+            return False
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        try:
+            return os.path.isdir(self.path)
+        except OSError:
+            return False
+
+
+class WalkMatcher:
+    """A scanner registered with the walker: its roots, depth limit and match callback"""
+
+    def __init__(self, name: str, roots: List[str], max_depth: int, match: MatchCallback,
+                 per_root: bool = False):
+        self.name = name
+        self.roots = list(dict.fromkeys(os.path.normpath(root) for root in roots if root))
+        self.max_depth = max_depth
+        self.match = match
+        # When True the callback runs once per containing root (used for per-folder statistics)
+        self.per_root = per_root
+
+
+class FileSystemWalker:
+    """
+    Walks the union of all registered roots exactly once.
+
+    Each directory is listed with a single ``os.scandir`` call and every file entry
+    is handed to each matcher whose root contains it within that matcher's depth
+    limit. Overlapping roots (for example ``~\\AppData\\Local`` registered by two
+    scanners) are therefore read once instead of once per scanner.
+
+    An optional cache session (see ``DiscoveryCache.session``) lets unchanged
+    directories be skipped entirely on warm runs.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, cache_session=None,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        self.logger = logger or logging.getLogger('FileSystemWalker')
+        self.matchers: List[WalkMatcher] = []
+        self.cache_session = cache_session
+        self.should_stop = should_stop
+        self.stats = {'directories_listed': 0, 'directories_cached': 0, 'entries_seen': 0}
+
+    def add_matcher(self, name: str, roots: List[str], max_depth: int, match: MatchCallback,
+                    per_root: bool = False) -> WalkMatcher:
+        """Register a matcher; results are returned under ``name`` by walk()"""
+        matcher = WalkMatcher(name, roots, max_depth, match, per_root)
+        self.matchers.append(matcher)
+        return matcher
+
+    def walk(self) -> Dict[str, List[Any]]:
+        """Run the shared walk and return the results of every matcher"""
+        results = {matcher.name: [] for matcher in self.matchers}
+
+        # Index every root once; directories are compared by normalized case
+        root_contexts: Dict[str, List[Tuple[int, str]]] = {}
+        for index, matcher in enumerate(self.matchers):
+            for root in matcher.roots:
+                root_contexts.setdefault(os.path.normcase(root), []).append((index, root))
+
+        # Ancestors of nested roots must be traversed even beyond other matchers' depth limits
+        root_ancestors = set()
+        for key in root_contexts:
+            parent = os.path.dirname(key)
+            while parent and parent not in root_ancestors and parent != os.path.dirname(parent):
+                root_ancestors.add(parent)
+                parent = os.path.dirname(parent)
+
+        visited = set()
+        start_roots = sorted({root for matcher in self.matchers for root in matcher.roots}, key=len)
+
+        for start in start_roots:
+            if os.path.normcase(start) in visited or not os.path.isdir(start):
+                continue
+
+            contexts = self._contexts_for(start, root_contexts)
+            stack = [(start, contexts)]
+
+            while stack:
+                if self.should_stop and self.should_stop():
+                    self.logger.debug("File system walk cancelled")
+                    return results
+
+                path, contexts = stack.pop()
+                key = os.path.normcase(path)
+                if key in visited:
+                    continue
+                visited.add(key)
+
+                subdirs = self._visit(path, contexts, results)
+
+                for name in subdirs:
+                    child = os.path.join(path, name)
+                    child_key = os.path.normcase(child)
+                    child_contexts = [(index, root, depth + 1) for index, root, depth in contexts
+                                      if depth < self.matchers[index].max_depth]
+                    child_contexts.extend((index, root, 0) for index, root in root_contexts.get(child_key, []))
+
+                    if child_contexts or child_key in root_ancestors:
+                        stack.append((child, child_contexts))
+
+        if self.cache_session:
+            self.cache_session.finish(visited)
+
+        self.logger.debug(f"Walk finished: {self.stats['directories_listed']} directories listed, "
+                          f"{self.stats['directories_cached']} served from cache, "
+                          f"{self.stats['entries_seen']} entries")
+        return results
+
+    def _contexts_for(self, path: str, root_contexts: Dict[str, List[Tuple[int, str]]]) -> List[Tuple[int, str, int]]:
+        """Find every registered root containing path and the depth of path below it"""
+        contexts = []
+        key = os.path.normcase(path)
+        for root_key, entries in root_contexts.items():
+            if key == root_key:
+                depth = 0
+            elif key.startswith(root_key.rstrip(os.sep) + os.sep):
+                depth = key[len(root_key.rstrip(os.sep)) + 1:].count(os.sep) + 1
+            else:
+                continue
+            for index, root in entries:
+                if depth <= self.matchers[index].max_depth:
+                    contexts.append((index, root, depth))
+        return contexts
+
+    def _active_matchers(self, contexts: List[Tuple[int, str, int]]) -> List[Tuple[WalkMatcher, List[str]]]:
+        """Group contexts by matcher, keeping the roots that contain the current directory"""
+        active: Dict[int, List[str]] = {}
+        for index, root, _depth in contexts:
+            active.setdefault(index, []).append(root)
+        return [(self.matchers[index], roots) for index, roots in active.items()]
+
+    def _visit(self, path: str, contexts: List[Tuple[int, str, int]], results: Dict[str, List[Any]]) -> List[str]:
+        """List one directory (or reuse its cached listing) and dispatch its files"""
+        active = self._active_matchers(contexts)
+
+        if self.cache_session:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                return []
+
+            cached = self.cache_session.lookup(path, mtime_ns)
+            if cached is not None:
+                self.stats['directories_cached'] += 1
+                subdirs, cached_results = cached
+                for matcher_name, result in self._revalidate(path, cached_results, active):
+                    results[matcher_name].append(result)
+                return subdirs
+
+        subdirs = []
+        dir_results = []
+        self.stats['directories_listed'] += 1
+
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    self.stats['entries_seen'] += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif active and entry.is_file():
+                            matched = self._dispatch(entry, active)
+                            if matched and self.cache_session:
+                                for _matcher_name, result in matched:
+                                    self._with_source(result, entry.path, entry.stat())
+                            dir_results.extend(matched)
+                    except OSError:
+                        continue
+        except OSError as e:
+            self.logger.debug(f"Cannot list {path}: {e}")
+            return []
+
+        for matcher_name, result in dir_results:
+            results[matcher_name].append(result)
+
+        if self.cache_session:
+            self.cache_session.store(path, mtime_ns, subdirs, dir_results)
+
+        return subdirs
+
+    def _dispatch(self, entry, active: List[Tuple[WalkMatcher, List[str]]]) -> List[Tuple[str, Any]]:
+        """Hand one file entry to every active matcher"""
+        matched = []
+        for matcher, roots in active:
+            for root in (roots if matcher.per_root else roots[:1]):
+                try:
+                    result = matcher.match(entry, root)
+                except Exception as e:
+                    self.logger.debug(f"{matcher.name} failed on {entry.path}: {e}")
+                    continue
+                if result is not None:
+                    matched.append((matcher.name, result))
+        return matched
+
+    def _with_source(self, result: Any, path: str, stat_result: os.stat_result) -> Any:
+        """Record the file identity a cached result was derived from"""
+        if isinstance(result, dict):
+            result['_source'] = {
+                'path': path,
+                'size': stat_result.st_size,
+                'mtime_ns': stat_result.st_mtime_ns,
+            }
+        return result
+
+    def _revalidate(self, path: str, cached_results: List[Tuple[str, str, Dict[str, Any]]],
+                    active: List[Tuple[WalkMatcher, List[str]]]) -> List[Tuple[str, Any]]:
+        """Keep cached results whose file is unchanged; re-run the matcher for modified files"""
+        matchers = {matcher.name: (matcher, roots) for matcher, roots in active}
+        kept = []
+        changed = False
+
+        for matcher_name, source_path, result in cached_results:
+            if matcher_name not in matchers:
+                continue
+            try:
+                stat_result = os.stat(source_path)
+            except OSError:
+                changed = True
+                continue
+
+            source = result.get('_source', {})
+            if source.get('size') == stat_result.st_size and source.get('mtime_ns') == stat_result.st_mtime_ns:
+                kept.append((matcher_name, result))
+                continue
+
+            changed = True
+            matcher, roots = matchers[matcher_name]
+            try:
+                refreshed = matcher.match(StatEntry(source_path, stat_result), roots[0])
+            except Exception as e:
+                self.logger.debug(f"{matcher_name} failed on {source_path}: {e}")
+                refreshed = None
+            if refreshed is not None:
+                kept.append((matcher_name, self._with_source(refreshed, source_path, stat_result)))
+
+        if changed:
+            self.cache_session.store_results(path, kept)
+
+        return kept
@@ -6,8 +6,11 @@ import logging
 from pathlib import Path
 from datetime import datetime, timedelta
 
-# Set up logging
-log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED
+
+# Set up logging (POS_CONNECTOR_LOG_DIR moves the logs out of the install directory)
+log_dir = os.environ.get('POS_CONNECTOR_LOG_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
 os.makedirs(log_dir, exist_ok=True)
 logging.basicConfig(
     filename=os.path.join(log_dir, 'laravel_api.log'),
@@ -26,6 +29,8 @@ class LaravelAPI:
         self.headers = {}
         self.max_retries = 3
         self.retry_delay = 2  # seconds
+        # Shared by every caller: during an outage requests stop and one probe tests for recovery
+        self.circuit = CircuitBreaker('api', logger=logging.getLogger('LaravelAPI'))
         self.config_file = Path(os.path.dirname(os.path.dirname(__file__))) / 'config.json'
         self.load_config()
 
@@ -191,6 +196,10 @@ class LaravelAPI:
             return False
 
         for attempt in range(1, self.max_retries + 1):
+            if not self.circuit.allow():
+                logging.warning(f"Authentication skipped: API circuit open, next probe in {self.circuit.retry_after():.0f}s")
+                return False
+
             try:
                 response = requests.post(
                     f"{self.base_url}/api/vendors/login",
@@ -200,6 +209,7 @@ class LaravelAPI:
                     },
                     timeout=15
                 )
+                self._record_outcome(response)
 
                 if response.status_code == 200:
                     try:
@@ -221,46 +231,43 @@ class LaravelAPI:
                         print(error_msg)
                         print(f"Response content: {response.text[:200]}...")
 
-                        if attempt < self.max_retries:
-                            time.sleep(self.retry_delay * attempt)
+                        self._backoff(attempt)
                         continue
                 else:
                     error_msg = f"Authentication failed (Attempt {attempt}/{self.max_retries}): {response.status_code} - {response.text}"
                     logging.error(error_msg)
                     print(error_msg)
 
-                    if attempt < self.max_retries:
-                        time.sleep(self.retry_delay * attempt)  # Exponential backoff
+                    self._backoff(attempt)
             except requests.exceptions.ConnectionError as e:
+                self.circuit.record_failure()
                 error_msg = f"Connection error (Attempt {attempt}/{self.max_retries}): Cannot connect to {self.base_url}"
                 logging.error(error_msg)
                 print(error_msg)
                 print(f"💡 Tip: Make sure the Laravel backend is running at {self.base_url}")
 
-                if attempt < self.max_retries:
-                    time.sleep(self.retry_delay * attempt)
+                self._backoff(attempt)
             except requests.exceptions.Timeout as e:
+                self.circuit.record_failure()
                 error_msg = f"Timeout error (Attempt {attempt}/{self.max_retries}): Request timed out"
                 logging.error(error_msg)
                 print(error_msg)
 
-                if attempt < self.max_retries:
-                    time.sleep(self.retry_delay * attempt)
+                self._backoff(attempt)
             except requests.exceptions.RequestException as e:
+                self.circuit.record_failure()
                 error_msg = f"Authentication request error (Attempt {attempt}/{self.max_retries}): {e}"
                 logging.error(error_msg)
                 print(error_msg)
 
-                if attempt < self.max_retries:
-                    time.sleep(self.retry_delay * attempt)  # Exponential backoff
+                self._backoff(attempt)
             except json.JSONDecodeError as e:
                 error_msg = f"Invalid JSON response (Attempt {attempt}/{self.max_retries}): {e}"
                 logging.error(error_msg)
                 print(error_msg)
                 print(f"💡 Tip: The API endpoint {self.base_url}/api/vendors/login may not exist or is returning HTML")
 
-                if attempt < self.max_retries:
-                    time.sleep(self.retry_delay * attempt)
+                self._backoff(attempt)
 
         return False
 
@@ -268,6 +275,10 @@ class LaravelAPI:
         """Make an API request with automatic token refresh if needed"""
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
 
+        # Refused before any token refresh or retry while the API is known to be down
+        if self.circuit.retry_after() > 0:
+            raise CircuitOpenError(f"API circuit open, next probe in {self.circuit.retry_after():.0f}s")
+
         if endpoint != 'api/vendors/login':
             if not self.ensure_valid_token():
                 raise Exception("Cannot make API request: failed to obtain valid authentication token")
@@ -282,8 +293,12 @@ class LaravelAPI:
             kwargs['timeout'] = 30
 
         for attempt in range(1, self.max_retries + 1):
+            if not self.circuit.allow():
+                raise CircuitOpenError(f"API circuit open, next probe in {self.circuit.retry_after():.0f}s")
+
             try:
                 response = requests.request(method, url, **kwargs)
+                self._record_outcome(response)
 
                 # If unauthorized and not already trying to authenticate, refresh token and retry
                 if response.status_code == 401 and endpoint != 'api/vendors/login':
@@ -298,15 +313,27 @@ class LaravelAPI:
 
                 return response
             except requests.exceptions.RequestException as e:
+                self.circuit.record_failure()
                 error_msg = f"API request error ({method} {url}) (Attempt {attempt}/{self.max_retries}): {e}"
                 logging.error(error_msg)
 
-                if attempt < self.max_retries:
-                    time.sleep(self.retry_delay * attempt)  # Exponential backoff
+                self._backoff(attempt)
 
         # If we get here, all attempts failed
         raise Exception(f"Failed to make API request after {self.max_retries} attempts")
 
+    def _record_outcome(self, response):
+        """Report a request to the circuit breaker: 429 and 5xx count as failures"""
+        if response.status_code == 429 or response.status_code >= 500:
+            self.circuit.record_failure()
+        else:
+            self.circuit.record_success()
+
+    def _backoff(self, attempt):
+        """Wait before the next attempt, unless there is none or the circuit has opened and would refuse it"""
+        if attempt < self.max_retries and self.circuit.state == CLOSED:
+            time.sleep(self.retry_delay * attempt)
+
     def create_invoice(self, invoice_data):
         """Create a new invoice in the Laravel system"""
         try:
@@ -327,6 +354,9 @@ class LaravelAPI:
                 logging.error(error_msg)
                 print(error_msg)
                 return None
+        except CircuitOpenError:
+            # Not attempted: the caller keeps the invoice for later
+            raise
         except Exception as e:
             error_msg = f"Error creating invoice: {e}"
             logging.error(error_msg)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Deferred imports for optional, heavy dependencies
+Modules are imported on first use instead of when the connector starts
+"""
+
+import importlib
+import threading
+from typing import Any
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    ``pyodbc = LazyModule('pyodbc')`` keeps call sites such as
+    ``pyodbc.connect(...)`` unchanged while moving the import cost to the first
+    call. A missing dependency raises ImportError at that point; ``bool(module)``
+    tells whether it can be imported, replacing the ``module is None`` checks of
+    ``try: import ... except ImportError`` blocks.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._error = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    if self._error is not None:
+                        raise ImportError(f"{self._name} is not available: {self._error}")
+                    try:
+                        self._module = importlib.import_module(self._name)
+                    except ImportError as e:
+                        self._error = e
+                        raise
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __bool__(self) -> bool:
+        try:
+            self._load()
+            return True
+        except ImportError:
+            return False
+
+    @property
+    def loaded(self) -> bool:
+        """True once the module has been imported"""
+        return self._module is not None
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<LazyModule {self._name!r} ({state})>"
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Durable transaction outbox backed by pos_cache.db
+Extracted transactions are written ahead of sending, so a stop, crash or reboot loses nothing
+"""
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+PENDING = 'pending'
+CLAIMED = 'claimed'
+DELIVERED = 'delivered'
+FAILED = 'failed'
+
+
+class TransactionOutbox:
+    """
+    Write-ahead queue of transactions waiting to be sent to the API.
+
+    Monitors ``append`` each extracted batch in one SQLite transaction; a hook
+    can add its own writes (the source cursor) to that transaction, so a batch
+    is either queued together with its new cursor or not at all. The sender
+    ``claim``s the oldest pending rows, sends them and marks them ``delivered``
+    or ``failed``. Rows still claimed when the process died are returned to
+    pending by ``recover`` on start-up, so delivery is at-least-once and the
+    sender resumes without re-reading any source.
+
+    Only claimed rows are held in memory, however large the backlog.
+    The source record of each row is stored once per source in ``outbox_sources``.
+    Finished rows are removed by ``prune``, which the cache maintenance runs
+    while the connector is idle; ``idle_for`` tells it how long the outbox
+    (and the dedup hashes written with each batch) has not been written.
+    """
+
+    # Days delivered rows are kept, and how many failed rows are kept; failed
+    # transactions are retried from cached_transactions, not from the outbox
+    DELIVERED_DAYS = 7
+    MAX_FAILED = 10000
+
+    def __init__(self, db_path, logger: Optional[logging.Logger] = None):
+        self.db_path = Path(db_path)
+        self.logger = logger or logging.getLogger('TransactionOutbox')
+        self._systems: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Set whenever rows are appended, so an idle sender wakes up at once
+        self.ready = threading.Event()
+        self._last_activity = time.monotonic()
+        # Rows claimed by this process and not finished yet
+        self._in_flight = 0
+        # Pending rows, counted by recover and kept up to date in memory for backlog
+        self._pending = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_schema(self, cursor: sqlite3.Cursor):
+        """Create the outbox tables"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source_id TEXT NOT NULL,
+                transaction_data TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                claimed_at TIMESTAMP,
+                delivered_at TIMESTAMP
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox (status, id)')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_outbox_delivered
+            ON outbox (delivered_at) WHERE status = 'delivered'
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outbox_sources (
+                source_id TEXT PRIMARY KEY,
+                system TEXT NOT NULL
+            )
+        ''')
+
+    def append(self, source_id: str, system: Dict[str, Any], transactions: List[Dict[str, Any]],
+               before_commit: Optional[Callable[[sqlite3.Connection], None]] = None) -> int:
+        """
+        Durably queue a batch of transactions from one source
+
+        ``before_commit(conn)`` runs inside the same SQLite transaction. Raises if
+        the batch could not be stored, in which case nothing was written.
+        """
+        if not transactions:
+            return 0
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO outbox_sources (source_id, system) VALUES (?, ?)",
+                    (source_id, json.dumps(system, default=str))
+                )
+                conn.executemany(
+                    "INSERT INTO outbox (source_id, transaction_data) VALUES (?, ?)",
+                    [(source_id, json.dumps(transaction, default=str)) for transaction in transactions]
+                )
+                if before_commit:
+                    before_commit(conn)
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._systems[source_id] = system
+            self._pending += len(transactions)
+            self._last_activity = time.monotonic()
+        self.ready.set()
+        return len(transactions)
+
+    def claim(self, limit: int) -> List[Dict[str, Any]]:
+        """Claim up to limit of the oldest pending rows: [{'id', 'source_id', 'system', 'transaction', 'size'}]"""
+        # Cleared before looking, so an append that commits meanwhile leaves it set
+        self.ready.clear()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                rows = conn.execute(
+                    "SELECT id, source_id, transaction_data FROM outbox WHERE status = ? ORDER BY id LIMIT ?",
+                    (PENDING, limit)
+                ).fetchall()
+                if rows:
+                    conn.executemany(
+                        "UPDATE outbox SET status = ?, claimed_at = CURRENT_TIMESTAMP, attempts = attempts + 1 "
+                        "WHERE id = ?",
+                        [(CLAIMED, row[0]) for row in rows]
+                    )
+            if not rows:
+                return []
+            with self._lock:
+                self._pending = max(0, self._pending - len(rows))
+                self._in_flight += len(rows)
+                self._last_activity = time.monotonic()
+            # More may be waiting behind this batch
+            self.ready.set()
+
+            return [
+                {
+                    'id': row_id,
+                    'source_id': source_id,
+                    'system': self._system(conn, source_id),
+                    'transaction': json.loads(transaction_data),
+                    'size': len(transaction_data),
+                }
+                for row_id, source_id, transaction_data in rows
+            ]
+        finally:
+            conn.close()
+
+    def mark_delivered(self, ids: List[int]):
+        """Record rows as accepted by the API"""
+        self._finish(ids, DELIVERED)
+
+    def mark_failed(self, ids: List[int], error: Optional[str] = None):
+        """Record rows as rejected or unsendable"""
+        self._finish(ids, FAILED, error)
+
+    def release(self, ids: List[int]):
+        """Return claimed rows to pending, e.g. when the sender stops before sending them"""
+        self._finish(ids, PENDING)
+
+    def recover(self) -> int:
+        """Return rows claimed by a previous run that never finished to pending"""
+        try:
+            conn = self._connect()
+            with conn:
+                count = conn.execute(
+                    "UPDATE outbox SET status = ? WHERE status = ?", (PENDING, CLAIMED)
+                ).rowcount
+                pending = conn.execute("SELECT COUNT(*) FROM outbox WHERE status = ?", (PENDING,)).fetchone()[0]
+            conn.close()
+            with self._lock:
+                self._pending = pending
+        except Exception as e:
+            self.logger.error(f"Error recovering outbox: {e}")
+            return 0
+
+        if count:
+            self.logger.info(f"Recovered {count} unsent transactions from the outbox")
+            self.ready.set()
+        return count
+
+    def prune(self, cursor: sqlite3.Cursor, delivered_days: Optional[float] = DELIVERED_DAYS,
+              max_failed: Optional[int] = MAX_FAILED, limit: int = 2000) -> int:
+        """
+        Delete up to limit finished rows on the caller's cursor; returns the number deleted
+
+        Delivered rows go once they were delivered more than ``delivered_days``
+        ago, failed rows once ``max_failed`` newer failed rows exist. ``None``
+        keeps them forever; pending and claimed rows are never deleted.
+        """
+        deleted = 0
+        if delivered_days and delivered_days > 0:
+            cursor.execute('''
+                DELETE FROM outbox WHERE id IN (
+                    SELECT id FROM outbox
+                    WHERE status = ? AND delivered_at < datetime('now', ?)
+                    LIMIT ?
+                )
+            ''', (DELIVERED, f'-{float(delivered_days)} days', limit))
+            deleted += cursor.rowcount
+        if max_failed is not None and max_failed >= 0 and deleted < limit:
+            cursor.execute('''
+                DELETE FROM outbox WHERE id IN (
+                    SELECT id FROM outbox WHERE status = ?
+                    ORDER BY id DESC LIMIT ? OFFSET ?
+                )
+            ''', (FAILED, limit - deleted, int(max_failed)))
+            deleted += cursor.rowcount
+        return deleted
+
+    def idle_for(self) -> float:
+        """Seconds since rows were last appended, claimed or finished, or 0 while claimed rows are being sent"""
+        with self._lock:
+            if self._in_flight:
+                return 0.0
+            return time.monotonic() - self._last_activity
+
+    def backlog(self) -> int:
+        """Rows pending or being sent, from the in-memory counts (no query)"""
+        with self._lock:
+            return self._pending + self._in_flight
+
+    def counts(self) -> Dict[str, int]:
+        """Number of rows per status"""
+        try:
+            conn = self._connect()
+            rows = conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+            conn.close()
+            return dict(rows)
+        except Exception as e:
+            self.logger.error(f"Error counting outbox rows: {e}")
+            return {}
+
+    def _finish(self, ids: List[int], status: str, error: Optional[str] = None):
+        if not ids:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "UPDATE outbox SET status = ?, last_error = ?, "
+                    "delivered_at = CASE WHEN ? = 'delivered' THEN CURRENT_TIMESTAMP ELSE delivered_at END "
+                    "WHERE id = ?",
+                    [(status, error, status, row_id) for row_id in ids]
+                )
+        finally:
+            conn.close()
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - len(ids))
+            if status == PENDING:
+                self._pending += len(ids)
+            self._last_activity = time.monotonic()
+        if status == PENDING:
+            self.ready.set()
+
+    def _system(self, conn: sqlite3.Connection, source_id: str) -> Dict[str, Any]:
+        with self._lock:
+            system = self._systems.get(source_id)
+        if system is None:
+            row = conn.execute("SELECT system FROM outbox_sources WHERE source_id = ?", (source_id,)).fetchone()
+            system = json.loads(row[0]) if row else {'name': source_id}
+            with self._lock:
+                self._systems[source_id] = system
+        return system
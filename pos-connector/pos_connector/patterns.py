@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Compiled keyword classification for file and table names
+All scanners share one precompiled matcher instead of looping over keyword lists per name
+"""
+
+import re
+from typing import Dict, Iterable, FrozenSet, List
+
+
+class PatternClassifier:
+    """
+    Multi-keyword matcher compiled into a single alternation regex.
+
+    ``classify`` scans a name once and returns every category with a keyword
+    occurring anywhere in it. Keywords are tried longest first at each position
+    of a zero-width lookahead, and each keyword also reports the categories of
+    the shorter keywords it contains, so overlapping hits (``sales.db``
+    containing both ``sales.db`` and ``sale``) are never lost.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        self.categories: Dict[str, List[str]] = {
+            category: sorted({keyword.lower() for keyword in keywords if keyword})
+            for category, keywords in categories.items()
+        }
+
+        keyword_categories: Dict[str, set] = {}
+        for category, keywords in self.categories.items():
+            for keyword in keywords:
+                keyword_categories.setdefault(keyword, set()).add(category)
+
+        # A keyword hit implies the hits of every keyword it contains
+        self._hits: Dict[str, FrozenSet[str]] = {}
+        for keyword in keyword_categories:
+            hits = set()
+            for other, other_categories in keyword_categories.items():
+                if other in keyword:
+                    hits.update(other_categories)
+            self._hits[keyword] = frozenset(hits)
+
+        self._any = self._compile(keyword_categories)
+        self._all = self._compile(keyword_categories, lookahead=True)
+        self._by_category = {
+            category: self._compile(keywords) for category, keywords in self.categories.items()
+        }
+
+    @staticmethod
+    def _compile(keywords: Iterable[str], lookahead: bool = False) -> re.Pattern:
+        alternation = '|'.join(re.escape(keyword) for keyword in sorted(keywords, key=lambda k: (-len(k), k)))
+        if not alternation:
+            # Never matches
+            return re.compile(r'(?!)')
+        return re.compile(f'(?=({alternation}))' if lookahead else alternation)
+
+    def classify(self, name: str) -> FrozenSet[str]:
+        """Return the categories whose keywords occur in name (case-insensitive)"""
+        name = name.lower()
+        # Most names hit nothing; reject them with a single search before the overlapping scan
+        if not self._any.search(name):
+            return frozenset()
+
+        hits = set()
+        for match in self._all.finditer(name):
+            hits.update(self._hits[match.group(1)])
+        return frozenset(hits)
+
+    def matches(self, name: str, category: str) -> bool:
+        """Check whether name contains any keyword of one category (case-insensitive)"""
+        return self._by_category[category].search(name.lower()) is not None
+
+    def keywords(self, category: str) -> List[str]:
+        """Return the keywords registered for a category"""
+        return list(self.categories[category])
+
+
+# Keyword categories shared by the discovery scanners
+POS_NAME = 'pos_name'
+POS_TABLE = 'pos_table'
+POS_FILE = 'pos_file'
+
+# Universal business software file patterns; the '*' only marks where a name may
+# vary, matching is on the remaining fragment (e.g. 'pos.exe' in 'mypos.exe')
+POS_FILE_PATTERNS = [
+    # Executable patterns
+    'pos*.exe', 'retail*.exe', 'store*.exe', 'shop*.exe', 'cash*.exe',
+    'checkout*.exe', 'till*.exe', 'register*.exe', 'payment*.exe',
+    'invoice*.exe', 'billing*.exe', 'order*.exe', 'sale*.exe',
+    'business*.exe', 'restaurant*.exe', 'merchant*.exe',
+    # Database patterns
+    'pos*.db', 'retail*.db', 'store*.db', 'shop*.db', 'sales*.db',
+    'transactions*.db', 'orders*.db', 'customers*.db', 'invoice*.db',
+    'pos*.mdb', 'pos*.accdb', 'retail*.mdb', 'sales*.mdb',
+    # Data file patterns
+    'pos*.sqlite', 'sales*.sqlite', 'transactions*.sqlite',
+    'pos*.csv', 'sales*.csv', 'orders*.csv', 'invoices*.csv',
+    'pos*.json', 'sales*.json', 'transactions*.json'
+]
+
+POS_PATTERNS = PatternClassifier({
+    # POS-related keywords in file and database names
+    POS_NAME: [
+        'pos', 'retail', 'sales', 'transaction', 'cash', 'checkout',
+        'inventory', 'customer', 'product', 'invoice', 'receipt'
+    ],
+    # Typical POS table names
+    POS_TABLE: [
+        'transaction', 'sale', 'receipt', 'payment', 'product',
+        'customer', 'inventory', 'tax', 'discount', 'tender'
+    ],
+    POS_FILE: [pattern.replace('*', '') for pattern in POS_FILE_PATTERNS],
+})
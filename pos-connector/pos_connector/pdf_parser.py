@@ -9,13 +9,13 @@ import logging
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from pathlib import Path
+from importlib.util import find_spec
 
-try:
-    import pdfplumber
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
-    pdfplumber = None
+from .lazy_import import LazyModule
+
+# pdfplumber (and pdfminer/Pillow behind it) is only imported when the first PDF is parsed
+PDF_AVAILABLE = find_spec('pdfplumber') is not None
+pdfplumber = LazyModule('pdfplumber')
 
 class PDFInvoiceParser:
     """Parser for PDF invoices from various POS systems"""
@@ -7,59 +7,52 @@ Each adapter handles the specific connection and data extraction for a particula
 import os
 import json
 import sqlite3
-# Optional imports for different database types
-try:
-    import pyodbc
-except ImportError:
-    pyodbc = None
-
-try:
-    import pymysql
-except ImportError:
-    pymysql = None
-
-try:
-    import psycopg2
-except ImportError:
-    psycopg2 = None
-
-try:
-    import pandas as pd
-except ImportError:
-    pd = None
 import xml.etree.ElementTree as ET
 import csv
-try:
-    import requests
-except ImportError:
-    requests = None
 import time
 try:
     import winreg
 except ImportError:
     winreg = None
-
-try:
-    import win32com.client
-except ImportError:
-    win32com = None
-
-try:
-    import wmi
-except ImportError:
-    wmi = None
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from abc import ABC, abstractmethod
 import logging
 
+from .fs_walker import FileSystemWalker
+from .change_gate import ChangeGate
+from .lazy_import import LazyModule
+from .source_cursors import transaction_time
+
+# Optional database, data and HTTP libraries are imported on first use, so loading an
+# adapter does not pay for the drivers of every other adapter
+pyodbc = LazyModule('pyodbc')
+pymysql = LazyModule('pymysql')
+psycopg2 = LazyModule('psycopg2')
+pd = LazyModule('pandas')
+requests = LazyModule('requests')
+
+class ExtractionError(Exception):
+    """The source could not be read at all; the poll counts as failed and the source is extracted again"""
+
+
 class BasePOSAdapter(ABC):
     """Base class for all POS adapters"""
 
+    # Rows read from one table per poll by adapters that page through SQLite sources;
+    # the source cursor moves over each page, so the next poll continues after it
+    PAGE_SIZE = 1000
+
     def __init__(self):
         self.config = {}
         self.connection = None
         self.logger = logging.getLogger(self.__class__.__name__)
+        # File and SQLite adapters set a ChangeGate so unchanged sources are not extracted
+        self.change_gate: Optional[ChangeGate] = None
+        # Files or databases of the source the last extraction could not read (e.g. locked by the POS)
+        self.extraction_errors: List[str] = []
+        # Time of the last row of each table page the last extraction cut off at PAGE_SIZE
+        self._page_ends: List[datetime] = []
 
     @abstractmethod
     def configure(self, system_config: Dict[str, Any]):
@@ -76,6 +69,52 @@ class BasePOSAdapter(ABC):
         """Get new transactions since the specified datetime"""
         pass
 
+    def has_changes(self) -> bool:
+        """Cheap check run before get_new_transactions; adapters without a change gate always extract"""
+        return self.change_gate.changed() if self.change_gate else True
+
+    def mark_synced(self):
+        """Record that the changes seen by has_changes() have been extracted; not after an incomplete extraction"""
+        if self.change_gate and not self.extraction_errors:
+            self.change_gate.mark_seen()
+
+    def _read_page(self, cursor, table: str, columns: List[str], date_col: str,
+                   since: datetime) -> List[Dict[str, Any]]:
+        """
+        Rows of a table after since, oldest first: at most PAGE_SIZE, plus the rows tied with the last one
+
+        Each row carries its date_col value as ``source_time``, which the
+        source cursor advances on. Ties are read whole because the cursor's
+        tie-breaker only covers rows it has seen.
+        """
+        cursor.execute(f"SELECT * FROM {table} WHERE {date_col} > ? ORDER BY {date_col} ASC LIMIT ?",
+                       (since.strftime('%Y-%m-%d %H:%M:%S'), self.PAGE_SIZE))
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        if len(rows) >= self.PAGE_SIZE:
+            last = rows[-1][date_col]
+            cursor.execute(f"SELECT * FROM {table} WHERE {date_col} = ?", (last,))
+            rows = [row for row in rows if row[date_col] != last] + [dict(zip(columns, row)) for row in cursor.fetchall()]
+            page_end = transaction_time({'source_time': last})
+            if page_end is not None:
+                self._page_ends.append(page_end)
+
+        for row in rows:
+            row['source_time'] = row[date_col]
+        return rows
+
+    def _trim_to_pages(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop records newer than the earliest cut-off page, so the cursor cannot pass rows not read yet"""
+        if not self._page_ends:
+            return transactions
+        cutoff = min(self._page_ends)
+        return [transaction for transaction in transactions
+                if (transaction_time(transaction) or cutoff) <= cutoff]
+
+    def _extraction_error(self, path: str, error: Exception):
+        """Note a part of the source that could not be read this time; the change gate stays open for it"""
+        self.logger.warning(f"Could not read {path}: {error}")
+        self.extraction_errors.append(f"{path}: {error}")
+
     def close_connection(self):
         """Close the connection to the POS system"""
         if self.connection:
@@ -280,10 +319,11 @@ class GenericSQLAdapter(BasePOSAdapter):
 
     def get_new_transactions(self, since: datetime) -> List[Dict[str, Any]]:
         transactions = []
+        self.extraction_errors = []
         try:
             conn = self._get_connection()
             if not conn:
-                return transactions
+                raise ExtractionError(f"Could not connect to the {self.db_type} database")
 
             cursor = conn.cursor()
 
@@ -306,6 +346,7 @@ class GenericSQLAdapter(BasePOSAdapter):
 
         except Exception as e:
             self.logger.error(f"Error getting SQL transactions: {e}")
+            raise
 
         return transactions
 
@@ -360,12 +401,15 @@ class GenericFileAdapter(BasePOSAdapter):
         self.file_path = system_config.get('file_path', '')
         self.file_type = system_config.get('file_type', '.csv')
         self.watch_directory = system_config.get('watch_directory', os.path.dirname(self.file_path))
+        # New or renamed files change the directory mtime; the discovered file itself may be appended in place
+        self.change_gate = ChangeGate(files=[self.file_path], directories=[self.watch_directory])
 
     def test_connection(self) -> bool:
         return os.path.exists(self.watch_directory)
 
     def get_new_transactions(self, since: datetime) -> List[Dict[str, Any]]:
         transactions = []
+        self.extraction_errors = []
 
         try:
             # Check for new files in the watch directory
@@ -392,6 +436,7 @@ class GenericFileAdapter(BasePOSAdapter):
 
         except Exception as e:
             self.logger.error(f"Error processing files: {e}")
+            raise
 
         return transactions
 
@@ -403,6 +448,8 @@ class GenericFileAdapter(BasePOSAdapter):
                 reader = csv.DictReader(f)
                 for row in reader:
                     transactions.append(self._normalize_file_data(row))
+        except OSError as e:
+            self._extraction_error(file_path, e)
         except Exception as e:
             self.logger.error(f"Error processing CSV file {file_path}: {e}")
 
@@ -421,6 +468,8 @@ class GenericFileAdapter(BasePOSAdapter):
                 elif isinstance(data, dict):
                     transactions.append(self._normalize_file_data(data))
 
+        except OSError as e:
+            self._extraction_error(file_path, e)
         except Exception as e:
             self.logger.error(f"Error processing JSON file {file_path}: {e}")
 
@@ -440,6 +489,8 @@ class GenericFileAdapter(BasePOSAdapter):
                     data[child.tag] = child.text
                 transactions.append(self._normalize_file_data(data))
 
+        except OSError as e:
+            self._extraction_error(file_path, e)
         except Exception as e:
             self.logger.error(f"Error processing XML file {file_path}: {e}")
 
@@ -453,6 +504,8 @@ class GenericFileAdapter(BasePOSAdapter):
             for _, row in df.iterrows():
                 transactions.append(self._normalize_file_data(row.to_dict()))
 
+        except OSError as e:
+            self._extraction_error(file_path, e)
         except Exception as e:
             self.logger.error(f"Error processing Excel file {file_path}: {e}")
 
@@ -573,6 +626,9 @@ class SQLiteAdapter(GenericSQLAdapter):
     def configure(self, system_config: Dict[str, Any]):
         system_config['database_type'] = 'sqlite'
         super().configure(system_config)
+        # Discovered databases carry their file as database_path
+        self.connection_string = self.connection_string or system_config.get('database_path', '')
+        self.change_gate = ChangeGate(sqlite_files=[self.connection_string])
 
 class MySQLAdapter(GenericSQLAdapter):
     def configure(self, system_config: Dict[str, Any]):
@@ -734,6 +790,8 @@ class AroniumPOSAdapter(BasePOSAdapter):
 
     def configure(self, system_config: Dict[str, Any]):
         self.config = system_config
+        # Watched paths are filled in by the first scan
+        self.change_gate = ChangeGate()
         self.logger.info("Aronium POS adapter configured")
 
     def test_connection(self) -> bool:
@@ -751,6 +809,8 @@ class AroniumPOSAdapter(BasePOSAdapter):
     def get_new_transactions(self, since: datetime) -> List[Dict[str, Any]]:
         # Look for Aronium database files in common locations
         transactions = []
+        self.extraction_errors = []
+        self._page_ends = []
 
         try:
             # Common Aronium database locations
@@ -762,31 +822,44 @@ class AroniumPOSAdapter(BasePOSAdapter):
                 "C:/Program Files (x86)/Aronium"
             ]
 
+            db_paths = []
+            directories = list(possible_paths)
             for base_path in possible_paths:
                 if os.path.exists(base_path):
                     # Look for SQLite database files
                     for root, dirs, files in os.walk(base_path):
+                        directories.append(root)
                         for file in files:
                             if file.endswith('.db') or file.endswith('.sqlite'):
-                                db_path = os.path.join(root, file)
-                                try:
-                                    transactions.extend(self._extract_from_sqlite(db_path, since))
-                                except Exception as e:
-                                    self.logger.debug(f"Could not read {db_path}: {e}")
+                                db_paths.append(os.path.join(root, file))
+
+            # Until something in these folders or databases changes, later polls are skipped
+            self.change_gate.watch(directories=directories, sqlite_files=db_paths)
+
+            for db_path in db_paths:
+                try:
+                    transactions.extend(self._extract_from_sqlite(db_path, since))
+                except sqlite3.OperationalError as e:
+                    # Locked or unreadable for now: read again on the next poll
+                    self._extraction_error(db_path, e)
+                except Exception as e:
+                    self.logger.debug(f"Could not read {db_path}: {e}")
 
+            transactions = self._trim_to_pages(transactions)
             self.logger.info(f"Found {len(transactions)} new transactions from Aronium POS")
 
         except Exception as e:
             self.logger.error(f"Failed to get Aronium transactions: {e}")
+            raise
 
         return transactions
 
     def _extract_from_sqlite(self, db_path: str, since: datetime) -> List[Dict[str, Any]]:
-        """Extract transactions from Aronium SQLite database"""
+        """Extract transactions from Aronium SQLite database; raises if the database cannot be read"""
         transactions = []
 
+        conn = sqlite3.connect(db_path)
         try:
-            conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
 
             # Common table names in Aronium POS
@@ -813,14 +886,7 @@ class AroniumPOSAdapter(BasePOSAdapter):
 
                     if date_columns:
                         date_col = date_columns[0]
-                        since_str = since.strftime('%Y-%m-%d %H:%M:%S')
-
-                        query = f"SELECT * FROM {table} WHERE {date_col} > ? ORDER BY {date_col} DESC LIMIT 100"
-                        cursor.execute(query, (since_str,))
-
-                        rows = cursor.fetchall()
-                        for row in rows:
-                            transaction = dict(zip(columns, row))
+                        for transaction in self._read_page(cursor, table, columns, date_col, since):
                             transaction['source_table'] = table
                             transaction['pos_system'] = 'Aronium POS'
                             transactions.append(transaction)
@@ -828,11 +894,9 @@ class AroniumPOSAdapter(BasePOSAdapter):
                 except Exception as e:
                     self.logger.debug(f"Could not read table {table}: {e}")
 
+        finally:
             conn.close()
 
-        except Exception as e:
-            self.logger.debug(f"Could not connect to {db_path}: {e}")
-
         return transactions
 
 class UniversalPOSAdapter(BasePOSAdapter):
@@ -843,6 +907,11 @@ class UniversalPOSAdapter(BasePOSAdapter):
         self.system_name = system_config.get('name', 'Unknown POS')
         self.executable_path = system_config.get('executable_path', '')
         self.install_path = system_config.get('install_path', '')
+        # Data files found by the last scan -> 'sqlite' / 'csv' / 'json'
+        self._data_files: Dict[str, str] = {}
+        # Watches the data files and their folders; new files elsewhere are picked up by the
+        # periodic full scan the gate forces every max_quiet seconds
+        self.change_gate = ChangeGate()
         self.logger.info(f"Universal POS adapter configured for {self.system_name}")
 
     def test_connection(self) -> bool:
@@ -852,27 +921,44 @@ class UniversalPOSAdapter(BasePOSAdapter):
     def get_new_transactions(self, since: datetime) -> List[Dict[str, Any]]:
         """Auto-detect and extract transactions from any POS system"""
         transactions = []
+        self.extraction_errors = []
+        self._page_ends = []
 
         try:
             self.logger.info(f"Auto-detecting data sources for {self.system_name}...")
+            self._data_files = {}
 
             # Method 1: Look for databases near the executable
             if self.executable_path:
                 transactions.extend(self._find_databases_near_exe(since))
 
-            # Method 2: Look in common POS data directories
-            transactions.extend(self._scan_common_directories(since))
-
-            # Method 3: Look for common POS file patterns
-            transactions.extend(self._scan_for_pos_files(since))
+            # Methods 2 and 3: common POS data directories and POS file patterns, in one shared walk
+            transactions.extend(self._scan_data_locations(since, common_directories=True, pos_files=True))
 
+            self._watch_data_files()
+            transactions = self._trim_to_pages(transactions)
             self.logger.info(f"Found {len(transactions)} transactions from {self.system_name}")
 
         except Exception as e:
             self.logger.error(f"Failed to get transactions from {self.system_name}: {e}")
+            raise
 
         return transactions
 
+    def _watch_data_files(self):
+        """Point the change gate at the data files of the last scan, their folders and the install folders"""
+        directories = {os.path.dirname(path) for path in self._data_files}
+        if self.executable_path:
+            directories.add(os.path.dirname(self.executable_path))
+        if self.install_path:
+            directories.add(self.install_path)
+
+        self.change_gate.watch(
+            files=[path for path, kind in self._data_files.items() if kind != 'sqlite'],
+            sqlite_files=[path for path, kind in self._data_files.items() if kind == 'sqlite'],
+            directories=directories
+        )
+
     def _find_databases_near_exe(self, since: datetime) -> List[Dict[str, Any]]:
         """Look for database files near the POS executable"""
         transactions = []
@@ -891,12 +977,17 @@ class UniversalPOSAdapter(BasePOSAdapter):
 
                     try:
                         if file_lower.endswith(('.db', '.sqlite', '.sqlite3')):
+                            self._data_files[file_path] = 'sqlite'
                             transactions.extend(self._extract_from_sqlite(file_path, since))
                         elif file_lower.endswith(('.csv', '.txt')):
                             if any(keyword in file_lower for keyword in ['transaction', 'sale', 'receipt', 'invoice']):
+                                self._data_files[file_path] = 'csv'
                                 transactions.extend(self._extract_from_csv(file_path, since))
                         elif file_lower.endswith('.json'):
+                            self._data_files[file_path] = 'json'
                             transactions.extend(self._extract_from_json(file_path, since))
+                    except (OSError, sqlite3.OperationalError) as e:
+                        self._extraction_error(file_path, e)
                     except Exception as e:
                         self.logger.debug(f"Could not read {file_path}: {e}")
 
@@ -907,96 +998,105 @@ class UniversalPOSAdapter(BasePOSAdapter):
 
     def _scan_common_directories(self, since: datetime) -> List[Dict[str, Any]]:
         """Scan common POS data directories"""
-        transactions = []
-
-        common_paths = [
-            os.path.expanduser("~/Documents"),
-            os.path.expanduser("~/AppData/Local"),
-            os.path.expanduser("~/AppData/Roaming"),
-            "C:/ProgramData",
-            "C:/Data",
-            "C:/POS_Data",
-        ]
-
-        # Add install path if available
-        if self.install_path and os.path.exists(self.install_path):
-            common_paths.insert(0, self.install_path)
+        return self._scan_data_locations(since, common_directories=True)
 
-        for base_path in common_paths:
-            if os.path.exists(base_path):
-                try:
-                    # Only go 2 levels deep to avoid too much scanning
-                    for root, dirs, files in os.walk(base_path):
-                        depth = root[len(base_path):].count(os.sep)
-                        if depth >= 2:
-                            dirs[:] = []  # Don't go deeper
+    def _scan_for_pos_files(self, since: datetime) -> List[Dict[str, Any]]:
+        """Scan for common POS file patterns in likely locations"""
+        return self._scan_data_locations(since, pos_files=True)
 
-                        for file in files:
-                            file_lower = file.lower()
-
-                            # Look for files that might contain transaction data
-                            if any(keyword in file_lower for keyword in ['transaction', 'sale', 'receipt', 'invoice', 'order']):
-                                file_path = os.path.join(root, file)
-                                try:
-                                    if file_lower.endswith(('.db', '.sqlite', '.sqlite3')):
-                                        transactions.extend(self._extract_from_sqlite(file_path, since))
-                                    elif file_lower.endswith(('.csv', '.txt')):
-                                        transactions.extend(self._extract_from_csv(file_path, since))
-                                    elif file_lower.endswith('.json'):
-                                        transactions.extend(self._extract_from_json(file_path, since))
-                                except Exception as e:
-                                    self.logger.debug(f"Could not read {file_path}: {e}")
+    def _scan_data_locations(self, since: datetime, common_directories: bool = False,
+                             pos_files: bool = False) -> List[Dict[str, Any]]:
+        """Walk the common data directories and likely POS locations once and extract from matching files"""
+        transactions = []
+        walker = FileSystemWalker(self.logger)
+
+        if common_directories:
+            common_paths = [
+                os.path.expanduser("~/Documents"),
+                os.path.expanduser("~/AppData/Local"),
+                os.path.expanduser("~/AppData/Roaming"),
+                "C:/ProgramData",
+                "C:/Data",
+                "C:/POS_Data",
+            ]
 
-                except Exception as e:
-                    self.logger.debug(f"Error scanning {base_path}: {e}")
+            # Add install path if available
+            if self.install_path and os.path.exists(self.install_path):
+                common_paths.insert(0, self.install_path)
+
+            def match_common(entry, root: str) -> Optional[tuple]:
+                file_lower = entry.name.lower()
+
+                # Look for files that might contain transaction data
+                if any(keyword in file_lower for keyword in ['transaction', 'sale', 'receipt', 'invoice', 'order']):
+                    if file_lower.endswith(('.db', '.sqlite', '.sqlite3')):
+                        return entry.path, 'sqlite'
+                    elif file_lower.endswith(('.csv', '.txt')):
+                        return entry.path, 'csv'
+                    elif file_lower.endswith('.json'):
+                        return entry.path, 'json'
+                return None
+
+            # Only go 2 levels deep to avoid too much scanning
+            walker.add_matcher('common_directories', common_paths, 2, match_common)
+
+        if pos_files:
+            # Focus on more likely locations to avoid scanning entire drive
+            likely_paths = [
+                "C:/POS",
+                "C:/Retail",
+                "C:/Store",
+                "C:/Data",
+                os.path.expanduser("~/Documents"),
+                "C:/Program Files",
+                "C:/Program Files (x86)",
+            ]
 
-        return transactions
+            def match_pos_file(entry, root: str) -> Optional[tuple]:
+                file_lower = entry.name.lower()
+                if any(keyword in file_lower for keyword in ['pos', 'transaction', 'sale', 'receipt', 'invoice']):
+                    if file_lower.endswith(('.db', '.sqlite')):
+                        return entry.path, 'sqlite'
+                    elif file_lower.endswith(('.csv', '.txt')):
+                        return entry.path, 'csv'
+                return None
 
-    def _scan_for_pos_files(self, since: datetime) -> List[Dict[str, Any]]:
-        """Scan for common POS file patterns in likely locations"""
-        transactions = []
+            # Limit depth
+            walker.add_matcher('pos_files', likely_paths, 3, match_pos_file)
 
-        # Focus on more likely locations to avoid scanning entire drive
-        likely_paths = [
-            "C:/POS",
-            "C:/Retail",
-            "C:/Store",
-            "C:/Data",
-            os.path.expanduser("~/Documents"),
-            "C:/Program Files",
-            "C:/Program Files (x86)",
-        ]
+        try:
+            results = walker.walk()
+        except Exception as e:
+            self.logger.debug(f"Error scanning data locations: {e}")
+            return transactions
 
-        for search_path in likely_paths:
-            if os.path.exists(search_path):
-                try:
-                    for root, dirs, files in os.walk(search_path):
-                        # Limit depth
-                        depth = root[len(search_path):].count(os.sep)
-                        if depth >= 3:
-                            dirs[:] = []
+        # A file found by both scanners is extracted once
+        matched_files = {}
+        for matches in results.values():
+            for file_path, kind in matches:
+                matched_files.setdefault(file_path, kind)
 
-                        for file in files:
-                            file_lower = file.lower()
-                            if any(keyword in file_lower for keyword in ['pos', 'transaction', 'sale', 'receipt', 'invoice']):
-                                file_path = os.path.join(root, file)
-                                try:
-                                    if file_lower.endswith(('.db', '.sqlite')):
-                                        transactions.extend(self._extract_from_sqlite(file_path, since))
-                                    elif file_lower.endswith(('.csv', '.txt')):
-                                        transactions.extend(self._extract_from_csv(file_path, since))
-                                except Exception as e:
-                                    self.logger.debug(f"Could not read {file_path}: {e}")
-                except Exception as e:
-                    self.logger.debug(f"Error scanning {search_path}: {e}")
+        for file_path, kind in matched_files.items():
+            self._data_files.setdefault(file_path, kind)
+            try:
+                if kind == 'sqlite':
+                    transactions.extend(self._extract_from_sqlite(file_path, since))
+                elif kind == 'csv':
+                    transactions.extend(self._extract_from_csv(file_path, since))
+                elif kind == 'json':
+                    transactions.extend(self._extract_from_json(file_path, since))
+            except (OSError, sqlite3.OperationalError) as e:
+                self._extraction_error(file_path, e)
+            except Exception as e:
+                self.logger.debug(f"Could not read {file_path}: {e}")
 
         return transactions
 
     def _extract_from_sqlite(self, db_path: str, since: datetime) -> List[Dict[str, Any]]:
-        """Extract from SQLite database - reuse AroniumPOSAdapter logic"""
+        """Extract from SQLite database - reuse AroniumPOSAdapter logic; raises if the database cannot be read"""
         transactions = []
+        conn = sqlite3.connect(db_path)
         try:
-            conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
 
             # Find tables that might contain transaction data
@@ -1015,14 +1115,7 @@ class UniversalPOSAdapter(BasePOSAdapter):
 
                     if date_columns:
                         date_col = date_columns[0]
-                        since_str = since.strftime('%Y-%m-%d %H:%M:%S')
-
-                        query = f"SELECT * FROM {table} WHERE {date_col} > ? ORDER BY {date_col} DESC LIMIT 50"
-                        cursor.execute(query, (since_str,))
-
-                        rows = cursor.fetchall()
-                        for row in rows:
-                            transaction = dict(zip(columns, row))
+                        for transaction in self._read_page(cursor, table, columns, date_col, since):
                             transaction['source_table'] = table
                             transaction['source_file'] = os.path.basename(db_path)
                             transaction['pos_system'] = self.system_name
@@ -1031,18 +1124,16 @@ class UniversalPOSAdapter(BasePOSAdapter):
                 except Exception as e:
                     self.logger.debug(f"Could not read table {table}: {e}")
 
+        finally:
             conn.close()
 
-        except Exception as e:
-            self.logger.debug(f"Could not connect to {db_path}: {e}")
-
         return transactions
 
     def _extract_from_csv(self, file_path: str, since: datetime) -> List[Dict[str, Any]]:
         """Extract from CSV file"""
         transactions = []
         try:
-            if pd is None:
+            if not pd:
                 # Fallback to manual CSV reading
                 import csv
                 with open(file_path, 'r') as f:
@@ -1079,6 +1170,8 @@ class UniversalPOSAdapter(BasePOSAdapter):
                         transaction['source_file'] = os.path.basename(file_path)
                         transactions.append(transaction)
 
+        except OSError:
+            raise
         except Exception as e:
             self.logger.debug(f"Could not read CSV {file_path}: {e}")
         return transactions
@@ -1101,6 +1194,8 @@ class UniversalPOSAdapter(BasePOSAdapter):
                 data['source_file'] = os.path.basename(file_path)
                 transactions.append(data)
 
+        except OSError:
+            raise
         except Exception as e:
             self.logger.debug(f"Could not read JSON {file_path}: {e}")
         return transactions
@@ -11,7 +11,16 @@ import time
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Tuple, Optional
+
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+
+# Outcomes of each transaction sent with send_transactions_with_results
+PROCESSED = 'processed'
+SKIPPED = 'skipped'
+ERROR = 'error'
+# Not delivered because the API could not be reached or failed; to be sent again
+UNSENT = 'unsent'
 
 class PosApiClient:
     """API client for POS Connector specific endpoints"""
@@ -25,12 +34,18 @@ class PosApiClient:
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         }
+        # Keep-alive connections shared by the batch sender's concurrent requests
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
         self.max_retries = 3
         self.retry_delay = 2  # seconds
 
         # Setup logging
         self.logger = logging.getLogger('PosApiClient')
 
+        # Shared by every sending thread: during an outage requests stop and one probe tests for recovery
+        self.circuit = CircuitBreaker('api', logger=self.logger)
+
         # Ensure base URL has protocol
         if not self.base_url.startswith(('http://', 'https://')):
             self.base_url = f"http://{self.base_url}"
@@ -60,6 +75,54 @@ class PosApiClient:
 
     def send_transactions(self, transactions: List[Dict[str, Any]]) -> bool:
         """Send transactions to the POS Connector API"""
+        try:
+            result, _error, _invalid, _transient = self._post_transactions(transactions)
+        except CircuitOpenError as e:
+            self.logger.warning(f"Transactions not sent: {e}")
+            return False
+        return result is not None
+
+    def send_transactions_with_results(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send transactions and return one outcome per transaction, in request order
+
+        Each outcome is {'transaction_id', 'status', 'error'}, where status is
+        processed, skipped (already on the server), error (rejected by the API)
+        or unsent. If validation rejects some members of the batch, those fail
+        and the rest are sent again without them. When the API cannot be reached,
+        times out, is rate limited or fails with a 5xx, nothing was rejected and
+        every member is unsent. Raises CircuitOpenError, without sending anything,
+        while the API circuit is open.
+        """
+        result, error, invalid, transient = self._post_transactions(transactions)
+        if result is not None:
+            return self._transaction_outcomes(transactions, result)
+        if transient:
+            return [self._outcome(transaction, UNSENT, error) for transaction in transactions]
+
+        invalid = {position: reason for position, reason in invalid.items() if position < len(transactions)}
+        if invalid and len(invalid) < len(transactions):
+            valid = [position for position in range(len(transactions)) if position not in invalid]
+            self.logger.warning(f"Resending {len(valid)} transactions without {len(invalid)} invalid ones")
+            outcomes = dict(zip(valid, self.send_transactions_with_results([transactions[p] for p in valid])))
+            for position, reason in invalid.items():
+                outcomes[position] = self._outcome(transactions[position], ERROR, reason)
+            return [outcomes[position] for position in range(len(transactions))]
+
+        return [self._outcome(transaction, ERROR, error) for transaction in transactions]
+
+    def _post_transactions(self, transactions: List[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], Optional[str], Dict[int, str], bool]:
+        """
+        POST a batch; returns (response body, None, {}, False) on success
+
+        On failure returns (None, reason, {position: validation error}, transient),
+        where transient is True when the API did not answer the request itself:
+        no response, an unreadable body, 429 or 5xx.
+        """
+        if not self.circuit.allow():
+            raise CircuitOpenError(f"API circuit open, next probe in {self.circuit.retry_after():.0f}s")
+
+        response = None
         try:
             payload = {
                 'customer_id': self.customer_id,
@@ -68,9 +131,8 @@ class PosApiClient:
 
             self.logger.info(f"Sending {len(transactions)} transactions to API")
 
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/pos-connector/transactions",
-                headers=self.headers,
                 json=payload,
                 timeout=30
             )
@@ -82,17 +144,73 @@ class PosApiClient:
                 if result.get('errors', 0) > 0:
                     self.logger.warning(f"Transaction errors: {result.get('error_details', [])}")
 
-                return True
+                return result, None, {}, False
             else:
                 self.logger.error(f"Failed to send transactions: {response.status_code} - {response.text}")
-                return False
+                invalid = self._invalid_transactions(response) if response.status_code == 422 else {}
+                transient = response.status_code == 429 or response.status_code >= 500
+                return None, f"HTTP {response.status_code}: {response.text[:500]}", invalid, transient
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             self.logger.error(f"Error sending transactions: {e}")
-            return False
+            return None, str(e), {}, True
+
+        finally:
+            self._record_outcome(response)
+
+    def _record_outcome(self, response):
+        """Report a request to the circuit breaker: no response, 429 and 5xx count as failures"""
+        if response is None or response.status_code == 429 or response.status_code >= 500:
+            self.circuit.record_failure()
+        else:
+            self.circuit.record_success()
+
+    def _transaction_outcomes(self, transactions: List[Dict[str, Any]], result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Match the server's per-transaction results to the transactions that were sent"""
+        results = result.get('results')
+        if isinstance(results, list) and len(results) == len(transactions):
+            # The server reports every transaction in request order
+            return [
+                self._outcome(transaction, entry.get('status', PROCESSED), entry.get('error'))
+                for transaction, entry in zip(transactions, results)
+            ]
+
+        # Older servers only report the failures
+        errors = {str(detail.get('transaction_id')): detail.get('error') for detail in result.get('error_details') or []}
+        return [
+            self._outcome(transaction, ERROR, errors[str(transaction.get('transaction_id'))])
+            if str(transaction.get('transaction_id')) in errors else self._outcome(transaction, PROCESSED)
+            for transaction in transactions
+        ]
+
+    @staticmethod
+    def _invalid_transactions(response) -> Dict[int, str]:
+        """Positions of the batch members named in a validation error ('transactions.3.total_amount')"""
+        try:
+            details = response.json().get('details') or {}
+        except ValueError:
+            return {}
+
+        invalid = {}
+        for field, messages in details.items():
+            parts = field.split('.')
+            if len(parts) > 1 and parts[0] == 'transactions' and parts[1].isdigit():
+                reason = '; '.join(messages) if isinstance(messages, list) else str(messages)
+                position = int(parts[1])
+                invalid[position] = f"{invalid[position]}; {reason}" if position in invalid else reason
+        return invalid
+
+    @staticmethod
+    def _outcome(transaction: Dict[str, Any], status: str, error: Optional[str] = None) -> Dict[str, Any]:
+        return {'transaction_id': transaction.get('transaction_id'), 'status': status, 'error': error}
 
     def send_heartbeat(self, status_data: Dict[str, Any]) -> bool:
         """Send heartbeat to track connector status"""
+        if not self.circuit.allow():
+            self.logger.debug("Heartbeat skipped: API circuit open")
+            return False
+
+        response = None
         try:
             response = requests.post(
                 f"{self.base_url}/api/pos-connector/heartbeat",
@@ -113,6 +231,9 @@ class PosApiClient:
             self.logger.error(f"Error sending heartbeat: {e}")
             return False
 
+        finally:
+            self._record_outcome(response)
+
     def get_config(self) -> Optional[Dict[str, Any]]:
         """Get connector configuration from server"""
         try:
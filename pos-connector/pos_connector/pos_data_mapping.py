@@ -6,8 +6,9 @@ import json
 import os
 import logging
 
-# Set up logging
-log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
+# Set up logging (POS_CONNECTOR_LOG_DIR moves the logs out of the install directory)
+log_dir = os.environ.get('POS_CONNECTOR_LOG_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
 os.makedirs(log_dir, exist_ok=True)
 logging.basicConfig(
     filename=os.path.join(log_dir, 'pos_mapping.log'),
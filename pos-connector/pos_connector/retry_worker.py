@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Retry worker for cached transactions the API did not accept
+Failed rows in pos_cache.db are resent through the outbox on an exponential schedule
+"""
+
+import json
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Callable
+
+from .cache_schema import decode_payload
+from .cache_writer import CacheWriter
+from .circuit_breaker import CLOSED
+
+
+class RetrySchedule:
+    """
+    When a failed transaction is tried again: ``base_delay`` seconds after its
+    first failure, doubling with every further failure up to ``max_delay``.
+    After ``max_attempts`` failures it is given up (no next attempt) and kept
+    for inspection until retention removes it.
+    """
+
+    BASE_DELAY = 60
+    MAX_DELAY = 3600
+    MAX_ATTEMPTS = 10
+
+    def __init__(self, base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY,
+                 max_attempts: int = MAX_ATTEMPTS):
+        self.base_delay = max(0.0, base_delay)
+        self.max_delay = max(self.base_delay, max_delay)
+        self.max_attempts = max(1, max_attempts)
+
+    def delay(self, attempts: int) -> Optional[float]:
+        """Seconds before the next attempt after ``attempts`` failures, None once given up"""
+        if attempts >= self.max_attempts:
+            return None
+        return min(self.max_delay, self.base_delay * 2 ** max(0, attempts - 1))
+
+    def next_attempt_at(self, attempts: int) -> Optional[str]:
+        """next_attempt_at column value (UTC, like CURRENT_TIMESTAMP) after ``attempts`` failures"""
+        delay = self.delay(attempts)
+        return None if delay is None else timestamp(delay)
+
+
+def timestamp(offset: float = 0) -> str:
+    """UTC time ``offset`` seconds from now in SQLite's CURRENT_TIMESTAMP format"""
+    return (datetime.now(timezone.utc) + timedelta(seconds=offset)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class RetryWorker:
+    """
+    Background thread that requeues failed ``cached_transactions`` rows.
+
+    Rows with ``processed = 0`` and a ``next_attempt_at`` in the past are read
+    in next-attempt order through the partial retry index, ``batch_size`` at a
+    time, and appended to the outbox with ``enqueue(system, transactions)``;
+    the batch sender resends them and the cache write of the result either
+    marks them processed or schedules their next attempt. Each requeued row is
+    first leased through the cache writer (``queued_at`` set, next attempt
+    ``lease`` seconds away), so it is not queued twice while it waits in the
+    outbox; an expired lease means its outbox row was lost. New rows are only
+    requeued while the outbox holds fewer than ``max_backlog`` unsent rows.
+
+    While the API ``circuit`` is open nothing is requeued, except one row as
+    the probe when the circuit is due for one and the outbox has nothing else
+    to send. When the circuit closes again, every waiting row is made due at
+    once (apart from those already queued), so the backlog of an outage is
+    resent at full batch throughput instead of trickling out over each row's
+    backoff.
+    """
+
+    BATCH_SIZE = 500
+    LEASE = 600
+    CHECK_INTERVAL = 5
+
+    def __init__(self, db_path, cache_writer: CacheWriter, outbox,
+                 enqueue: Callable[[Dict[str, Any], List[Dict[str, Any]]], None], circuit=None,
+                 logger: Optional[logging.Logger] = None, batch_size: int = BATCH_SIZE,
+                 max_backlog: Optional[int] = None, lease: float = LEASE,
+                 check_interval: float = CHECK_INTERVAL):
+        self.db_path = Path(db_path)
+        self.cache_writer = cache_writer
+        self.outbox = outbox
+        self.enqueue = enqueue
+        self.circuit = circuit
+        self.logger = logger or logging.getLogger('RetryWorker')
+        self.batch_size = max(1, batch_size)
+        self.max_backlog = self.batch_size if max_backlog is None else max(1, max_backlog)
+        self.lease = lease
+        self.check_interval = check_interval
+        self._systems: Dict[int, Dict[str, Any]] = {}
+        self._outage = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'requeued': 0, 'batches': 0, 'probes': 0, 'pulled_forward': 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def start(self):
+        """Start the background retry thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='RetryWorker')
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop after the batch in progress"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                delay = self.run_once()
+            except Exception as e:
+                self.logger.error(f"Error retrying failed transactions: {e}")
+                delay = self.check_interval
+            if delay:
+                self._stop.wait(delay)
+
+    def run_once(self) -> float:
+        """Requeue at most one batch; returns how long to wait before the next call"""
+        if self.circuit is not None:
+            paused = self.circuit.retry_after()
+            if paused:
+                # API down: leave the rows waiting
+                self._outage = True
+                return min(paused, self.check_interval)
+            if self.circuit.state != CLOSED:
+                self._outage = True
+                if self._backlog():
+                    # Rows in the outbox will be the probe
+                    return self.check_interval
+                rows = self._due(1, any_time=True)
+                if rows:
+                    self.stats['probes'] += 1
+                    self._requeue(rows)
+                return self.check_interval
+            if self._outage:
+                self._outage = False
+                self.pull_forward()
+
+        if self._backlog() >= self.max_backlog:
+            return 1
+        rows = self._due(self.batch_size)
+        if not rows:
+            return self.check_interval
+        self._requeue(rows)
+        # Another full batch may be due right away
+        return 0 if len(rows) == self.batch_size else self.check_interval
+
+    def pull_forward(self):
+        """Make every waiting row that is not already queued due now"""
+        result = {}
+
+        def write(cursor: sqlite3.Cursor):
+            cursor.execute('''
+                UPDATE cached_transactions SET next_attempt_at = ?
+                WHERE processed = 0 AND next_attempt_at IS NOT NULL AND next_attempt_at > ?
+                AND (queued_at IS NULL OR queued_at < ?)
+            ''', (timestamp(), timestamp(), timestamp(-self.lease)))
+            result['count'] = cursor.rowcount
+
+        self.cache_writer.submit(write)
+        self.cache_writer.flush()
+        count = result.get('count', 0)
+        self.stats['pulled_forward'] += count
+        if count:
+            self.logger.info(f"API is back: {count} failed transactions are due for retry now")
+
+    def _backlog(self) -> int:
+        """Outbox rows waiting to be sent or being sent"""
+        counts = self.outbox.counts()
+        return counts.get('pending', 0) + counts.get('claimed', 0)
+
+    def _due(self, limit: int, any_time: bool = False) -> List[Dict[str, Any]]:
+        """The next rows to retry, in next-attempt order; any_time includes rows not yet due but not queued"""
+        conn = self._connect()
+        try:
+            if any_time:
+                rows = conn.execute('''
+                    SELECT id, pos_system_id, transaction_id, transaction_data FROM cached_transactions
+                    WHERE processed = 0 AND next_attempt_at IS NOT NULL AND (queued_at IS NULL OR queued_at < ?)
+                    ORDER BY next_attempt_at LIMIT ?
+                ''', (timestamp(-self.lease), limit)).fetchall()
+            else:
+                # Pinned: without statistics the planner prefers the processed index and sorts
+                rows = conn.execute('''
+                    SELECT id, pos_system_id, transaction_id, transaction_data
+                    FROM cached_transactions INDEXED BY idx_cached_transactions_retry
+                    WHERE processed = 0 AND next_attempt_at IS NOT NULL AND next_attempt_at <= ?
+                    ORDER BY next_attempt_at LIMIT ?
+                ''', (timestamp(), limit)).fetchall()
+
+            due = []
+            for row_id, pos_system_id, transaction_id, transaction_data in rows:
+                try:
+                    transaction = decode_payload(transaction_data)
+                except Exception as e:
+                    self.logger.warning(f"Cannot retry cached transaction {transaction_id}: {e}")
+                    continue
+                # Keep the cache key, so the result updates this row
+                if transaction.get('id') in (None, '') and transaction.get('transaction_id') in (None, ''):
+                    transaction['transaction_id'] = transaction_id
+                due.append({'id': row_id, 'pos_system_id': pos_system_id,
+                            'system': self._system(conn, pos_system_id), 'transaction': transaction})
+            return due
+        finally:
+            conn.close()
+
+    def _system(self, conn: sqlite3.Connection, pos_system_id: int) -> Dict[str, Any]:
+        system = self._systems.get(pos_system_id)
+        if system is None:
+            row = conn.execute("SELECT name, type, config FROM pos_systems WHERE id = ?", (pos_system_id,)).fetchone()
+            system = {}
+            if row:
+                try:
+                    system = json.loads(row[2]) if row[2] else {}
+                except ValueError:
+                    pass
+                system.setdefault('name', row[0])
+                system.setdefault('type', row[1])
+            self._systems[pos_system_id] = system
+        return system
+
+    def _requeue(self, rows: List[Dict[str, Any]]):
+        """Lease the rows, then append them to the outbox grouped by source"""
+        leased_until, now = timestamp(self.lease), timestamp()
+        ids = [(leased_until, now, row['id']) for row in rows]
+        self.cache_writer.submit(lambda cursor: cursor.executemany(
+            "UPDATE cached_transactions SET next_attempt_at = ?, queued_at = ? WHERE id = ? AND processed = 0", ids
+        ))
+        if not self.cache_writer.flush(30):
+            return
+
+        by_source: Dict[int, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_source.setdefault(row['pos_system_id'], []).append(row)
+        for group in by_source.values():
+            try:
+                self.enqueue(group[0]['system'], [row['transaction'] for row in group])
+            except Exception as e:
+                # The lease runs out and the rows are picked up again
+                self.logger.error(f"Error requeueing {len(group)} failed transactions: {e}")
+                continue
+            self.stats['requeued'] += len(group)
+        self.stats['batches'] += 1
+        self.logger.info(f"Requeued {len(rows)} failed transactions for another attempt")
+
+    def counts(self) -> Dict[str, int]:
+        """Failed rows waiting for another attempt, and those given up"""
+        try:
+            conn = self._connect()
+            try:
+                waiting = conn.execute("SELECT COUNT(*) FROM cached_transactions "
+                                       "WHERE processed = 0 AND next_attempt_at IS NOT NULL").fetchone()[0]
+                given_up = conn.execute("SELECT COUNT(*) FROM cached_transactions "
+                                        "WHERE processed = 0 AND next_attempt_at IS NULL").fetchone()[0]
+            finally:
+                conn.close()
+            return {'waiting': waiting, 'given_up': given_up}
+        except Exception as e:
+            self.logger.error(f"Error counting failed transactions: {e}")
+            return {}
+
+    def status(self) -> Dict[str, Any]:
+        return dict(self.stats, **self.counts())
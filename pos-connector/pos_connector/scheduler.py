@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Central scheduler for source polling
+One timer thread dispatches due polls to a bounded worker pool, whatever the number of sources
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional
+
+
+class _Job:
+    __slots__ = ('key', 'func', 'interval', 'priority', 'jitter', 'due', 'running', 'removed', 'runs')
+
+    def __init__(self, key: str, func: Callable[[], Optional[float]], interval: float,
+                 priority: int, jitter: float):
+        self.key = key
+        self.func = func
+        self.interval = interval
+        self.priority = priority
+        self.jitter = jitter
+        self.due = 0.0
+        self.running = False
+        self.removed = False
+        self.runs = 0
+
+
+class PollScheduler:
+    """
+    Heap-based timer for periodic jobs backed by a fixed-size thread pool.
+
+    Each job is a callable run every ``interval`` seconds; it may return a
+    different delay for its next run (for example a backoff after a failure).
+    A job is rescheduled only after its run finishes, so one source is never
+    polled twice at once. Delays are spread by ``jitter`` (a fraction of the
+    delay) so sources added together do not hit the disk together, and when
+    more jobs are due than there are free workers the lowest ``priority``
+    value runs first. The thread count is the worker count plus one,
+    independent of how many jobs are scheduled.
+    """
+
+    DEFAULT_WORKERS = 4
+    DEFAULT_JITTER = 0.1
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, logger: Optional[logging.Logger] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_workers = max(1, int(max_workers))
+        self.logger = logger or logging.getLogger('PollScheduler')
+        self.clock = clock
+        self._jobs: Dict[str, _Job] = {}
+        self._timers: List[Any] = []   # (due, seq, job)
+        self._ready: List[Any] = []    # (priority, due, seq, job)
+        self._seq = itertools.count()
+        self._free_workers = self.max_workers
+        self._condition = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def add(self, key: str, func: Callable[[], Optional[float]], interval: float, priority: int = 0,
+            jitter: float = DEFAULT_JITTER, delay: Optional[float] = None):
+        """
+        Schedule func every interval seconds under key (replacing a job with the same key)
+
+        The first run is after ``delay`` seconds; by default it is spread randomly
+        over the first ``jitter * interval`` seconds.
+        """
+        job = _Job(key, func, max(0.0, float(interval)), priority, max(0.0, jitter))
+        if delay is None:
+            delay = random.uniform(0, job.interval * job.jitter)
+
+        with self._condition:
+            previous = self._jobs.get(key)
+            if previous is not None:
+                previous.removed = True
+            self._jobs[key] = job
+            self._push_timer(job, self.clock() + delay)
+            self._condition.notify()
+
+    def remove(self, key: str) -> bool:
+        """Stop scheduling a job; a run already in progress finishes normally"""
+        with self._condition:
+            job = self._jobs.pop(key, None)
+            if job is None:
+                return False
+            job.removed = True
+            return True
+
+    def start(self):
+        """Start the timer thread and the worker pool"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='poll')
+            self._thread = threading.Thread(target=self._run, name='poll-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop dispatching and wait up to timeout seconds for running polls"""
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify_all()
+
+        if self._thread:
+            self._thread.join(timeout)
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+            deadline = time.monotonic() + timeout
+            with self._condition:
+                while self._free_workers < self.max_workers and time.monotonic() < deadline:
+                    self._condition.wait(max(0.0, deadline - time.monotonic()))
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._jobs
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """key -> {'interval', 'priority', 'runs', 'running', 'next_run_in'} for every job"""
+        now = self.clock()
+        with self._condition:
+            return {
+                key: {
+                    'interval': job.interval,
+                    'priority': job.priority,
+                    'runs': job.runs,
+                    'running': job.running,
+                    'next_run_in': None if job.running else max(0.0, job.due - now),
+                }
+                for key, job in self._jobs.items()
+            }
+
+    def _push_timer(self, job: _Job, due: float):
+        job.due = due
+        heapq.heappush(self._timers, (due, next(self._seq), job))
+
+    def _run(self):
+        """Timer loop: move due jobs to the ready queue and hand them to free workers"""
+        with self._condition:
+            while self._running:
+                now = self.clock()
+                while self._timers and self._timers[0][0] <= now:
+                    due, seq, job = heapq.heappop(self._timers)
+                    if not job.removed:
+                        heapq.heappush(self._ready, (job.priority, due, seq, job))
+
+                while self._ready and self._free_workers:
+                    _priority, _due, _seq, job = heapq.heappop(self._ready)
+                    if job.removed:
+                        continue
+                    job.running = True
+                    self._free_workers -= 1
+                    self._executor.submit(self._execute, job)
+
+                if self._ready or not self._timers:
+                    # Waiting for a worker to finish or for a job to be added
+                    self._condition.wait()
+                else:
+                    self._condition.wait(self._timers[0][0] - now)
+
+    def _execute(self, job: _Job):
+        delay = None
+        try:
+            delay = job.func()
+        except Exception as e:
+            self.logger.error(f"Scheduled job {job.key} failed: {e}")
+
+        if delay is None:
+            delay = job.interval
+        if job.jitter:
+            delay *= 1 + random.uniform(-job.jitter, job.jitter)
+
+        with self._condition:
+            job.running = False
+            job.runs += 1
+            self._free_workers += 1
+            if not job.removed and self._running:
+                self._push_timer(job, self.clock() + delay)
+            self._condition.notify_all()
@@ -132,8 +132,8 @@ class JoFotaraService(win32serviceutil.ServiceFramework):
 
     def _setup_service_logging(self):
         """Setup logging for the service"""
-        log_dir = Path(__file__).parent.parent / 'logs'
-        log_dir.mkdir(exist_ok=True)
+        log_dir = Path(os.environ.get('POS_CONNECTOR_LOG_DIR') or Path(__file__).parent.parent / 'logs')
+        log_dir.mkdir(parents=True, exist_ok=True)
 
         logging.basicConfig(
             level=logging.INFO,
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Persistent per-source extraction cursors backed by pos_cache.db
+Each source resumes from the newest record already queued instead of from the beginning of time
+"""
+
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+# Record fields holding the transaction time and identity, in order of preference;
+# source_time is the column a paging adapter ordered the rows by
+TIMESTAMP_FIELDS = ['source_time', 'date', 'timestamp', 'date_created', 'created_at', 'transaction_date',
+                    'sale_date', 'receipt_date', 'order_date', 'datetime']
+ID_FIELDS = ['id', 'transaction_id', 'sale_id', 'receipt_id', 'order_id', 'invoice_number', 'receipt_number']
+
+
+def transaction_time(transaction: Dict[str, Any]) -> Optional[datetime]:
+    """Timestamp of a transaction record as a naive local datetime, or None if it has none"""
+    for field in TIMESTAMP_FIELDS:
+        value = transaction.get(field)
+        if value in (None, ''):
+            continue
+        try:
+            if isinstance(value, datetime):
+                moment = value
+            elif isinstance(value, (int, float)):
+                # Epoch seconds, or milliseconds for values past the year 5000
+                moment = datetime.fromtimestamp(value / 1000 if value > 1e11 else value)
+            else:
+                moment = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+        except (ValueError, TypeError, OverflowError, OSError):
+            continue
+        if moment.tzinfo is not None:
+            moment = moment.astimezone().replace(tzinfo=None)
+        return moment
+    return None
+
+
+def transaction_key(transaction: Dict[str, Any]) -> str:
+    """Identity of a transaction within its source: table plus id, or a hash of the record"""
+    for field in ID_FIELDS:
+        if transaction.get(field) not in (None, ''):
+            return f"{transaction.get('source_table', '')}:{transaction[field]}"
+    record = json.dumps(transaction, sort_keys=True, default=str)
+    return hashlib.sha1(record.encode()).hexdigest()
+
+
+class SourceCursor:
+    """
+    High-water mark of one source: newest transaction time plus the keys of the
+    transactions at exactly that time (the tie-breaker).
+
+    Adapters are asked for records after ``since``, which lies ``OVERLAP`` before
+    the mark because their queries use a strict ``>`` on second-resolution
+    columns. ``select`` then drops what is older than the mark or already
+    recorded at it, so records committed in the same second as the last batch
+    are neither skipped nor sent twice.
+    """
+
+    OVERLAP = timedelta(seconds=1)
+
+    def __init__(self, timestamp: Optional[datetime] = None, boundary: Iterable[str] = ()):
+        self.timestamp = timestamp
+        self.boundary = set(boundary)
+
+    @property
+    def since(self) -> datetime:
+        """Lower bound to query the source with"""
+        if self.timestamp is None or self.timestamp - datetime.min < self.OVERLAP:
+            return datetime.min
+        return self.timestamp - self.OVERLAP
+
+    def select(self, transactions: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], 'SourceCursor']:
+        """Return (transactions past the mark, cursor advanced over them)"""
+        selected = []
+        timestamp, boundary = self.timestamp, set(self.boundary)
+
+        for transaction in transactions:
+            moment = transaction_time(transaction)
+            if moment is None:
+                # Records without a time cannot be placed against the mark
+                selected.append(transaction)
+                continue
+
+            key = transaction_key(transaction)
+            if self.timestamp is not None:
+                if moment < self.timestamp or (moment == self.timestamp and key in self.boundary):
+                    continue
+
+            selected.append(transaction)
+            if timestamp is None or moment > timestamp:
+                timestamp, boundary = moment, {key}
+            elif moment == timestamp:
+                boundary.add(key)
+
+        return selected, SourceCursor(timestamp, boundary)
+
+    def __eq__(self, other: object) -> bool:
+        return (isinstance(other, SourceCursor) and self.timestamp == other.timestamp
+                and self.boundary == other.boundary)
+
+
+class SourceCursorStore:
+    """
+    Cursors of all monitored sources, persisted in the ``source_cursors`` table.
+
+    ``get`` is served from memory after the first load; ``save`` writes through,
+    so after a restart every source continues with one incremental query.
+    """
+
+    def __init__(self, db_path, logger: Optional[logging.Logger] = None):
+        self.db_path = Path(db_path)
+        self.logger = logger or logging.getLogger('SourceCursorStore')
+        self._cursors: Dict[str, SourceCursor] = {}
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_schema(self, cursor: sqlite3.Cursor):
+        """Create the cursor table"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS source_cursors (
+                source_id TEXT PRIMARY KEY,
+                last_timestamp TEXT,
+                boundary_keys TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+    def get(self, source_id: str) -> SourceCursor:
+        """Cursor of a source (an empty cursor if the source was never extracted)"""
+        with self._lock:
+            cursor = self._cursors.get(source_id)
+        if cursor is not None:
+            return cursor
+
+        cursor = SourceCursor()
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT last_timestamp, boundary_keys FROM source_cursors WHERE source_id = ?", (source_id,)
+            ).fetchone()
+            conn.close()
+            if row and row[0]:
+                cursor = SourceCursor(datetime.fromisoformat(row[0]), json.loads(row[1] or '[]'))
+        except Exception as e:
+            self.logger.error(f"Error loading cursor for {source_id}: {e}")
+
+        with self._lock:
+            return self._cursors.setdefault(source_id, cursor)
+
+    def save(self, source_id: str, cursor: SourceCursor, conn: Optional[sqlite3.Connection] = None):
+        """
+        Persist a cursor (no-op when unchanged)
+
+        With ``conn`` the write joins the caller's open transaction, e.g. the one
+        queueing the batch the cursor moves over; if that transaction does not
+        commit, the caller must ``discard`` the source's cursor.
+        """
+        with self._lock:
+            if self._cursors.get(source_id) == cursor:
+                return
+
+        query = '''
+            INSERT OR REPLACE INTO source_cursors (source_id, last_timestamp, boundary_keys, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        '''
+        values = (source_id, cursor.timestamp.isoformat() if cursor.timestamp else None,
+                  json.dumps(sorted(cursor.boundary)))
+
+        if conn is not None:
+            conn.execute(query, values)
+        else:
+            try:
+                own_conn = self._connect()
+                own_conn.execute(query, values)
+                own_conn.commit()
+                own_conn.close()
+            except Exception as e:
+                self.logger.error(f"Error saving cursor for {source_id}: {e}")
+                return
+
+        with self._lock:
+            self._cursors[source_id] = cursor
+
+    def discard(self, source_id: str):
+        """Forget the in-memory cursor of a source; the next get reloads the persisted one"""
+        with self._lock:
+            self._cursors.pop(source_id, None)
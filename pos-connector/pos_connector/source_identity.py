@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Canonical identity for discovered data sources
+Records from different discovery methods that point at the same physical source are merged
+"""
+
+import os
+import re
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Preferred record type when several methods find the same source: the primary record
+# keeps its name and type (and therefore its adapter); the others only add metadata
+TYPE_PRIORITY = {
+    'database': 0,
+    'sql_server': 1,
+    'file_based': 2,
+    'network_service': 3,
+    'service': 4,
+    'process': 5,
+    'registry_discovered': 6,
+    'common_path': 7,
+}
+
+# Fields that describe the record itself rather than the source; never copied when merging
+_RECORD_FIELDS = {'name', 'type', 'discovery_method', 'discovery_methods', 'aliases',
+                  'adapter', 'validated', 'source_id'}
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_path(path: str) -> str:
+    """Normalized real path: symlinks, '..', separators and (on Windows) case folded"""
+    return os.path.normcase(os.path.realpath(os.path.expanduser(path)))
+
+
+def executable_from_command(command: str) -> str:
+    """Extract the executable from a service binpath such as '"C:\\App\\svc.exe" -k run'"""
+    command = (command or '').strip()
+    if command.startswith('"'):
+        return command[1:].split('"', 1)[0]
+    match = re.match(r'(.+?\.exe)\b', command, re.IGNORECASE)
+    return match.group(1) if match else command
+
+
+def normalize_url(url: str) -> str:
+    """Scheme, lower-cased host, explicit port and path without trailing slash"""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'http').lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port or _DEFAULT_PORTS.get(scheme, '')
+    return f"{scheme}://{host}:{port}{parts.path.rstrip('/')}"
+
+
+def source_keys(system: Dict[str, Any]) -> List[str]:
+    """
+    Canonical keys of the physical source(s) a discovery record points at
+
+    Two records sharing any key describe the same source. The first key is the
+    most specific one and is used as the source id.
+    """
+    keys = []
+
+    for field in ('database_path', 'file_path'):
+        if system.get(field):
+            keys.append(f"file:{normalize_path(system[field])}")
+
+    if system.get('connection_string'):
+        keys.append(f"dsn:{' '.join(str(system['connection_string']).lower().split())}")
+
+    for field in ('api_url', 'base_url', 'url'):
+        if system.get(field):
+            keys.append(f"url:{normalize_url(system[field])}")
+
+    if system.get('service_name'):
+        keys.append(f"service:{system['service_name'].lower()}")
+
+    executable = system.get('executable_path')
+    if executable:
+        executable = executable_from_command(executable) if system.get('type') == 'service' else executable
+        if executable:
+            keys.append(f"exe:{normalize_path(executable)}")
+
+    pid = system.get('pid') or system.get('process_id')
+    if pid:
+        keys.append(f"pid:{pid}")
+
+    if system.get('install_path'):
+        keys.append(f"dir:{normalize_path(system['install_path'])}")
+
+    if not keys:
+        # Nothing physical to go on: fall back to what the record calls itself
+        keys.append(f"name:{system.get('type', '')}:{str(system.get('name', '')).lower()}")
+
+    return keys
+
+
+def source_id(system: Dict[str, Any]) -> str:
+    """Canonical id of a record's source (its most specific key)"""
+    return source_keys(system)[0]
+
+
+def merge_into(primary: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold another record of the same source into primary, keeping primary's name, type and adapter"""
+    methods = primary.setdefault('discovery_methods', [primary.get('discovery_method')])
+    if other.get('discovery_method') not in methods:
+        methods.append(other.get('discovery_method'))
+
+    if other.get('name') and other['name'] != primary.get('name'):
+        aliases = primary.setdefault('aliases', [])
+        if other['name'] not in aliases:
+            aliases.append(other['name'])
+
+    for field, value in other.items():
+        if field in _RECORD_FIELDS or value in (None, '', [], {}):
+            continue
+        if primary.get(field) in (None, '', [], {}):
+            primary[field] = value
+
+    return primary
+
+
+def _priority(system: Dict[str, Any]) -> int:
+    return TYPE_PRIORITY.get(system.get('type'), len(TYPE_PRIORITY))
+
+
+class SourceIndex:
+    """
+    Index of discovered sources by canonical key.
+
+    ``add`` returns the record that represents the source: the new record if the
+    source was not seen before, otherwise the existing record with the new
+    one's metadata merged into it. The existing record object is updated in
+    place, so a source already handed to a monitor is never polled twice.
+    """
+
+    def __init__(self):
+        self._by_key: Dict[str, Dict[str, Any]] = {}
+        self.sources: List[Dict[str, Any]] = []
+
+    def find(self, system: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the indexed record for the same source, if any"""
+        for key in source_keys(system):
+            if key in self._by_key:
+                return self._by_key[key]
+        return None
+
+    def add(self, system: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Index a record; returns (record representing the source, True if the source is new)"""
+        existing = self.find(system)
+        if existing is not None:
+            merge_into(existing, system)
+            self._index(existing, system)
+            return existing, False
+
+        system.setdefault('source_id', source_id(system))
+        self.sources.append(system)
+        self._index(system, system)
+        return system, True
+
+    def _index(self, target: Dict[str, Any], system: Dict[str, Any]):
+        for key in source_keys(system):
+            self._by_key.setdefault(key, target)
+
+    @staticmethod
+    def merge_batch(systems: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Merge records of the same source within one batch, preferring the best record type
+
+        Records are ranked by TYPE_PRIORITY (a database record wins over a plain file
+        record for the same file); original order is kept among the merged sources.
+        """
+        ranked = sorted(enumerate(systems), key=lambda item: (_priority(item[1]), item[0]))
+        index = SourceIndex()
+        first_seen = {}
+        for position, system in ranked:
+            record, is_new = index.add(system)
+            if is_new:
+                first_seen[id(record)] = position
+            else:
+                first_seen[id(record)] = min(first_seen[id(record)], position)
+        return sorted(index.sources, key=lambda record: first_seen[id(record)])
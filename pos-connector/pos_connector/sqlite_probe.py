@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Cached, read-only SQLite schema probing
+Fingerprints database schemas without write locks and never reopens unchanged files
+"""
+
+import os
+import json
+import struct
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+SQLITE_HEADER = b'SQLite format 3\x00'
+
+
+class SQLiteSchemaProbe:
+    """
+    Reads the table list and schema fingerprint of foreign SQLite databases.
+
+    Results are cached by (path, size, mtime, header change counter). The 100-byte
+    database header is read with a plain file read, so an unchanged database is
+    recognised without ever being opened by SQLite. Changed databases are opened
+    with a ``mode=ro&immutable=1`` URI: SQLite takes no locks and creates no
+    journal, so probing never contends with the POS application writing to it.
+    For WAL databases the size and mtime of the ``-wal`` file are part of the key,
+    since the header change counter is not updated by WAL commits.
+
+    With a ``db_path`` the cache is persisted in the ``schema_fingerprints`` table
+    of pos_cache.db and survives restarts; without one it is kept in memory.
+    """
+
+    def __init__(self, db_path=None, logger: Optional[logging.Logger] = None):
+        self.db_path = Path(db_path) if db_path else None
+        self.logger = logger or logging.getLogger('SQLiteSchemaProbe')
+        self._cache: Dict[str, Tuple[tuple, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'probes': 0}
+
+    def init_schema(self, cursor: sqlite3.Cursor):
+        """Create the persistent fingerprint table"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_fingerprints (
+                path TEXT PRIMARY KEY,
+                file_key TEXT NOT NULL,
+                tables TEXT,
+                fingerprint TEXT,
+                probed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+    def get_tables(self, path: str, stat_result: Optional[os.stat_result] = None) -> Optional[List[str]]:
+        """Return the table names of a SQLite database, or None if it is not a readable SQLite file"""
+        schema = self.probe(path, stat_result)
+        return list(schema['tables']) if schema else None
+
+    def fingerprint(self, path: str, stat_result: Optional[os.stat_result] = None) -> Optional[str]:
+        """Return a hash of the database schema, or None if it is not a readable SQLite file"""
+        schema = self.probe(path, stat_result)
+        return schema['fingerprint'] if schema else None
+
+    def probe(self, path: str, stat_result: Optional[os.stat_result] = None) -> Optional[Dict[str, Any]]:
+        """Return {'tables': [...], 'fingerprint': str} for a database, using the cache when unchanged"""
+        path = os.path.abspath(path)
+        file_key = self._file_key(path, stat_result)
+        if file_key is None:
+            return None
+
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached is None:
+            cached = self._load(path)
+
+        if cached is not None and cached[0] == file_key:
+            self.stats['hits'] += 1
+            return cached[1]
+
+        schema = self._read_schema(path)
+        if schema is None:
+            return None
+
+        self.stats['probes'] += 1
+        with self._lock:
+            self._cache[path] = (file_key, schema)
+        self._save(path, file_key, schema)
+        return schema
+
+    def _file_key(self, path: str, stat_result: Optional[os.stat_result]) -> Optional[tuple]:
+        """Build the cache key from the file identity and the SQLite header"""
+        try:
+            stat_result = stat_result or os.stat(path)
+            with open(path, 'rb') as f:
+                header = f.read(100)
+        except OSError:
+            return None
+
+        if len(header) < 100 or not header.startswith(SQLITE_HEADER):
+            return None
+
+        change_counter = struct.unpack('>I', header[24:28])[0]
+        key = (stat_result.st_size, stat_result.st_mtime_ns, change_counter)
+
+        # Read/write format versions of 2 mean WAL mode
+        if header[18] == 2 or header[19] == 2:
+            try:
+                wal_stat = os.stat(path + '-wal')
+                key += (wal_stat.st_size, wal_stat.st_mtime_ns)
+            except OSError:
+                key += (0, 0)
+
+        return key
+
+    def _read_schema(self, path: str) -> Optional[Dict[str, Any]]:
+        """Open the database read-only and immutable, and read sqlite_master"""
+        uri = f"{Path(path).as_uri()}?mode=ro&immutable=1"
+        try:
+            conn = sqlite3.connect(uri, uri=True)
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT type, name, sql FROM sqlite_master ORDER BY type, name")
+                rows = cursor.fetchall()
+            finally:
+                conn.close()
+        except Exception as e:
+            self.logger.debug(f"Could not probe SQLite schema of {path}: {e}")
+            return None
+
+        digest = hashlib.sha256()
+        for row_type, name, sql in rows:
+            digest.update(f"{row_type}\x00{name}\x00{sql or ''}\x00".encode('utf-8'))
+
+        return {
+            'tables': [name for row_type, name, _sql in rows if row_type == 'table'],
+            'fingerprint': digest.hexdigest(),
+        }
+
+    def _load(self, path: str) -> Optional[Tuple[tuple, Dict[str, Any]]]:
+        """Load a persisted fingerprint"""
+        if not self.db_path:
+            return None
+
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            cursor = conn.cursor()
+            cursor.execute("SELECT file_key, tables, fingerprint FROM schema_fingerprints WHERE path = ?", (path,))
+            row = cursor.fetchone()
+            conn.close()
+        except Exception as e:
+            self.logger.debug(f"Could not load schema fingerprint for {path}: {e}")
+            return None
+
+        if not row:
+            return None
+
+        cached = (tuple(json.loads(row[0])), {'tables': json.loads(row[1] or '[]'), 'fingerprint': row[2]})
+        with self._lock:
+            self._cache[path] = cached
+        return cached
+
+    def _save(self, path: str, file_key: tuple, schema: Dict[str, Any]):
+        """Persist a fingerprint"""
+        if not self.db_path:
+            return
+
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO schema_fingerprints (path, file_key, tables, fingerprint)
+                VALUES (?, ?, ?, ?)
+            ''', (path, json.dumps(file_key), json.dumps(schema['tables']), schema['fingerprint']))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            self.logger.debug(f"Could not save schema fingerprint for {path}: {e}")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Local rollups of sync results in pos_cache.db
+Per-source hourly and daily counts and totals, kept current by the cache writer and queried offline
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Tuple, Union
+
+# Transaction fields holding the amount, in order of preference
+AMOUNT_FIELDS = ['total_amount', 'total', 'amount', 'grand_total']
+
+GRANULARITIES = {
+    # granularity: (table, period column, bucket format)
+    'hour': ('sync_rollup_hourly', 'hour', '%Y-%m-%d %H:00:00'),
+    'day': ('sync_rollup_daily', 'day', '%Y-%m-%d'),
+}
+
+Moment = Union[datetime, date, str]
+
+
+def transaction_amount(transaction: Dict[str, Any]) -> float:
+    """Amount of a transaction for the rollup totals, 0 when it has none"""
+    for field in AMOUNT_FIELDS:
+        value = transaction.get(field)
+        if value in (None, ''):
+            continue
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            continue
+    return 0.0
+
+
+def _bucket(moment: Moment, granularity: str) -> str:
+    if isinstance(moment, str):
+        return moment
+    if not isinstance(moment, datetime):
+        moment = datetime(moment.year, moment.month, moment.day)
+    return moment.strftime(GRANULARITIES[granularity][2])
+
+
+class SyncStats:
+    """
+    Rollups of ``sync_log``: one row per source, hour (or day) and status with
+    the number of results and the sum of their transaction amounts.
+
+    ``record`` runs inside the cache writer's transaction, after the sync_log
+    rows it summarizes, so the rollups are never out of step with the log; it
+    adds one upsert per bucket rather than per transaction. Buckets are in
+    local time, as the till reports its day. Like sync_log, a transaction
+    that failed before it was sent counts once under each status.
+
+    Hourly rollups are pruned with sync_log; daily rollups are kept, so the
+    history outlives the retention window. Rows from before the rollups
+    existed were backfilled with counts only, since sync_log has no amounts.
+    """
+
+    def __init__(self, db_path, logger: Optional[logging.Logger] = None):
+        self.db_path = Path(db_path)
+        self.logger = logger or logging.getLogger('SyncStats')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def record(self, cursor: sqlite3.Cursor, results: Iterable[Tuple[int, str, float]],
+               moment: Optional[datetime] = None):
+        """Add (pos_system_id, status, amount) results to the rollups of the current hour and day"""
+        moment = moment or datetime.now()
+        buckets: Dict[Tuple[int, str], List[float]] = {}
+        for pos_system_id, status, amount in results:
+            bucket = buckets.setdefault((pos_system_id, status), [0, 0.0])
+            bucket[0] += 1
+            bucket[1] += amount
+        if not buckets:
+            return
+
+        for granularity, (table, column, _) in GRANULARITIES.items():
+            period = _bucket(moment, granularity)
+            cursor.executemany(f'''
+                INSERT INTO {table} (pos_system_id, {column}, status, count, total_amount)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (pos_system_id, {column}, status) DO UPDATE SET
+                    count = count + excluded.count,
+                    total_amount = total_amount + excluded.total_amount
+            ''', [(pos_system_id, period, status, count, total)
+                  for (pos_system_id, status), (count, total) in buckets.items()])
+
+    def query(self, granularity: str = 'day', since: Optional[Moment] = None, until: Optional[Moment] = None,
+              source: Optional[str] = None, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Rollup rows between since (inclusive) and until (exclusive), oldest first
+
+        Each row is {'source', 'period', 'status', 'count', 'total_amount'};
+        ``source`` is the cached system name.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity {granularity!r}; expected one of {sorted(GRANULARITIES)}")
+        table, column, _ = GRANULARITIES[granularity]
+
+        conditions, parameters = [], []
+        if since is not None:
+            conditions.append(f"r.{column} >= ?")
+            parameters.append(_bucket(since, granularity))
+        if until is not None:
+            conditions.append(f"r.{column} < ?")
+            parameters.append(_bucket(until, granularity))
+        if source is not None:
+            conditions.append("p.name = ?")
+            parameters.append(source)
+        if status is not None:
+            conditions.append("r.status = ?")
+            parameters.append(status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(f'''
+                SELECT p.name, r.{column}, r.status, r.count, r.total_amount
+                FROM {table} r LEFT JOIN pos_systems p ON p.id = r.pos_system_id
+                {where}
+                ORDER BY r.{column}, p.name, r.status
+            ''', parameters).fetchall()
+        finally:
+            conn.close()
+        return [
+            {'source': name, 'period': period, 'status': row_status, 'count': count,
+             'total_amount': round(total, 3)}
+            for name, period, row_status, count, total in rows
+        ]
+
+    def totals(self, since: Optional[Moment] = None, until: Optional[Moment] = None,
+               source: Optional[str] = None, granularity: str = 'day') -> Dict[str, Any]:
+        """Counts and amounts per status and per source over a period: {'by_status', 'by_source'}"""
+        by_status: Dict[str, Dict[str, Any]] = {}
+        by_source: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for row in self.query(granularity, since, until, source):
+            for target in (by_status.setdefault(row['status'], {'count': 0, 'total_amount': 0.0}),
+                           by_source.setdefault(row['source'], {}).setdefault(
+                               row['status'], {'count': 0, 'total_amount': 0.0})):
+                target['count'] += row['count']
+                target['total_amount'] = round(target['total_amount'] + row['total_amount'], 3)
+        return {'by_status': by_status, 'by_source': by_source}
+
+    def today(self) -> Dict[str, Dict[str, Any]]:
+        """Counts and amounts per status since local midnight"""
+        try:
+            return self.totals(since=date.today(), until=date.today() + timedelta(days=1))['by_status']
+        except Exception as e:
+            self.logger.error(f"Error reading local sync statistics: {e}")
+            return {}
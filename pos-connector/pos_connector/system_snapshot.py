@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Shared process, port and service snapshot for discovery
+Enumerates system state once per discovery run instead of once per scanner and connection
+"""
+
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Set
+
+from .lazy_import import LazyModule
+
+psutil = LazyModule('psutil')
+
+
+class SystemSnapshot:
+    """
+    Point-in-time view of running processes, inet connections and Windows services.
+
+    Each part is enumerated once, on first use, and then shared by every scanner
+    of the discovery run (the scanners run in parallel threads, so loading is
+    guarded by a lock). Process details are indexed by pid and local ports are
+    grouped by pid, so resolving the process behind a connection is a dictionary
+    lookup rather than a new ``psutil.Process`` per connection: the cost of a run
+    is linear in processes plus connections.
+    """
+
+    PROCESS_ATTRS = ['pid', 'name', 'exe', 'cmdline']
+
+    def __init__(self, logger: Optional[logging.Logger] = None, psutil_module=None):
+        self.logger = logger or logging.getLogger('SystemSnapshot')
+        self.psutil = psutil_module or psutil
+        self._lock = threading.Lock()
+        self._processes: Optional[Dict[int, Dict[str, Any]]] = None
+        self._connections: Optional[List[Any]] = None
+        self._ports_by_pid: Optional[Dict[int, Set[int]]] = None
+        self._services: Optional[List[Dict[str, Any]]] = None
+
+    def processes(self) -> Dict[int, Dict[str, Any]]:
+        """pid -> {'pid', 'name', 'exe', 'cmdline'} for every running process"""
+        with self._lock:
+            if self._processes is None:
+                processes = {}
+                try:
+                    for proc in self.psutil.process_iter(self.PROCESS_ATTRS):
+                        info = proc.info
+                        processes[info['pid']] = info
+                except Exception as e:
+                    self.logger.error(f"Process enumeration failed: {e}")
+                self._processes = processes
+            return self._processes
+
+    def process(self, pid: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Details of one process; pids missing from the snapshot are looked up once and remembered"""
+        if not pid:
+            return None
+
+        processes = self.processes()
+        info = processes.get(pid)
+        if info is None:
+            try:
+                info = self.psutil.Process(pid).as_dict(self.PROCESS_ATTRS)
+            except Exception:
+                info = {'pid': pid, 'name': None, 'exe': None, 'cmdline': None}
+            with self._lock:
+                processes[pid] = info
+        return info
+
+    def process_name(self, pid: Optional[int]) -> str:
+        """Name of a process, or '' if it is unknown or inaccessible"""
+        info = self.process(pid)
+        return (info or {}).get('name') or ''
+
+    def connections(self) -> List[Any]:
+        """All inet connections (psutil sconn tuples)"""
+        with self._lock:
+            if self._connections is None:
+                try:
+                    self._connections = list(self.psutil.net_connections(kind='inet'))
+                except Exception as e:
+                    self.logger.error(f"Connection enumeration failed: {e}")
+                    self._connections = []
+            return self._connections
+
+    def ports_by_pid(self) -> Dict[int, Set[int]]:
+        """pid -> set of local ports the process has connections on"""
+        connections = self.connections()
+        with self._lock:
+            if self._ports_by_pid is None:
+                ports_by_pid: Dict[int, Set[int]] = {}
+                for connection in connections:
+                    if connection.pid and connection.laddr:
+                        ports_by_pid.setdefault(connection.pid, set()).add(connection.laddr.port)
+                self._ports_by_pid = ports_by_pid
+            return self._ports_by_pid
+
+    def services(self) -> List[Dict[str, Any]]:
+        """as_dict() of every Windows service (name, display_name, status, binpath, ...)"""
+        with self._lock:
+            if self._services is None:
+                services = []
+                try:
+                    for service in self.psutil.win_service_iter():
+                        try:
+                            services.append(service.as_dict())
+                        except Exception:
+                            continue
+                except Exception as e:
+                    self.logger.error(f"Service enumeration failed: {e}")
+                self._services = services
+            return self._services
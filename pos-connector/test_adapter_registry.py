@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the lazy POS adapter registry
+"""
+
+import os
+import sys
+import subprocess
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.adapter_registry import AdapterRegistry, ADAPTER_PATHS
+
+
+def _run_isolated(code: str) -> str:
+    """Run code in a fresh interpreter so sys.modules starts empty"""
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=os.path.abspath(os.path.dirname(__file__)),
+        capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+def test_adapters_are_imported_on_first_use():
+    """Creating the registry imports no adapter module; get() loads only what is asked for"""
+    output = _run_isolated(
+        "import sys\n"
+        "from pos_connector.adapter_registry import AdapterRegistry\n"
+        "registry = AdapterRegistry()\n"
+        "print('pos_connector.pos_adapters' in sys.modules)\n"
+        "adapter = registry.get('sqlite')\n"
+        "print(type(adapter).__name__, registry.loaded())\n"
+        "from pos_connector import pos_adapters\n"
+        "print(pos_adapters.pyodbc.loaded, pos_adapters.pd.loaded, pos_adapters.requests.loaded)\n"
+    )
+    assert output.splitlines() == ['False', "SQLiteAdapter ['sqlite']", 'False False False']
+
+    print("✅ Adapters imported on first use")
+
+
+def test_registry_lookup():
+    """Instances are shared per key, unknown keys return the default, classes load without instances"""
+    registry = AdapterRegistry()
+
+    assert len(registry) == len(ADAPTER_PATHS) == 29
+    assert 'aronium' in registry and 'missing' not in registry
+    assert registry.get('aronium') is registry.get('aronium')
+    assert registry.get('missing') is None
+    assert registry.get(None) is None
+
+    assert registry.adapter_class('csv').__name__ == 'CSVAdapter'
+    assert registry.loaded() == ['aronium']
+
+    registry.register('custom', 'pos_connector.pos_adapters:JSONAdapter')
+    assert type(registry['custom']).__name__ == 'JSONAdapter'
+
+    print("✅ Registry lookups work")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Lazy Adapter Registry")
+    print("=" * 60)
+    test_adapters_are_imported_on_first_use()
+    test_registry_lookup()
+    print("\n🎉 All adapter registry tests passed!")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for adaptive polling intervals
+"""
+
+import os
+import sys
+from datetime import datetime
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.adaptive_interval import AdaptiveInterval
+
+NOON = datetime(2026, 3, 2, 12, 0).timestamp()
+
+
+def test_interval_follows_rate_within_bounds():
+    """Busy sources are polled faster, idle ones slower, never outside the bounds"""
+    busy = AdaptiveInterval(30, min_interval=5, max_interval=600)
+    idle = AdaptiveInterval(30, min_interval=5, max_interval=600)
+
+    now = NOON
+    assert busy.record(0, now) == 30
+    assert idle.record(0, now) == 30
+
+    busy_interval = idle_interval = 30
+    busy_now = idle_now = now
+    for _ in range(20):
+        busy_now += busy_interval
+        busy_interval = busy.record(int(busy_interval // 2), busy_now)  # one transaction every 2s
+        idle_now += idle_interval
+        idle_interval = idle.record(0, idle_now)
+
+    assert busy_interval == 5
+    assert idle_interval == 600
+
+    # A dormant source that becomes active speeds up again
+    for _ in range(10):
+        idle_now += idle_interval
+        idle_interval = idle.record(int(idle_interval // 10), idle_now)
+    assert idle_interval < 30
+
+    print("✅ Interval follows transaction rate")
+
+
+def test_closed_hours_back_off_until_opening():
+    """During closed hours polls are sparse, end at opening time, and do not skew the rate"""
+    pacer = AdaptiveInterval(30, closed_hours=['22:00-07:00'], closed_interval=1800)
+    pacer.record(0, NOON)
+    pacer.record(6, NOON + 30)
+    rate = pacer.rate
+
+    late = datetime(2026, 3, 2, 23, 0).timestamp()
+    assert pacer.record(0, late) == 1800
+    before_open = datetime(2026, 3, 3, 6, 50).timestamp()
+    assert pacer.record(0, before_open) == 600
+    assert pacer.rate == rate
+    assert pacer.seconds_until_open(NOON) == 0
+
+    print("✅ Closed hours respected")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Adaptive Polling Intervals")
+    print("=" * 60)
+    test_interval_follows_rate_within_bounds()
+    test_closed_hours_back_off_until_opening()
+    print("\n🎉 All adaptive interval tests passed!")
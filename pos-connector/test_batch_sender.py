@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script for the micro-batching outbox sender
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.outbox import TransactionOutbox
+from pos_connector.batch_sender import BatchSender
+
+SYSTEM = {'name': 'Database POS (sales.db)', 'type': 'database', 'adapter': 'sqlite'}
+
+
+def _outbox(temp_dir):
+    outbox = TransactionOutbox(os.path.join(temp_dir, 'pos_cache.db'))
+    conn = sqlite3.connect(outbox.db_path)
+    outbox.init_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+    return outbox
+
+
+def _run(sender, until, timeout=10):
+    """Run the sender in a thread until until() holds, then stop it"""
+    # Check for stop promptly once the outbox is drained
+    sender.IDLE_WAIT = 0.1
+    running = threading.Event()
+    running.set()
+    thread = threading.Thread(target=sender.run, args=(running.is_set,), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + timeout
+    while not until() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    running.clear()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert until(), "sender did not finish in time"
+
+
+def test_batches_by_count_and_idle_flush():
+    """A backlog goes out in full batches; a lone row on an idle sender is sent without lingering"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        outbox = _outbox(temp_dir)
+        outbox.append('file:/pos/sales.db', SYSTEM, [{'id': n} for n in range(450)])
+        batches = []
+
+        def send(rows):
+            batches.append([row['transaction']['id'] for row in rows])
+            return {row['id']: None for row in rows}
+
+        sender = BatchSender(outbox, send, max_count=200, max_wait=0.2, max_in_flight=1)
+        _run(sender, lambda: outbox.counts() == {'delivered': 450})
+        assert [len(batch) for batch in batches] == [200, 200, 50]
+        assert sum(batches, []) == list(range(450))
+
+        # Idle: nothing in flight, so a single row must not wait out a long window
+        sender = BatchSender(outbox, send, max_count=200, max_wait=30, max_in_flight=2)
+        started = time.monotonic()
+        threading.Timer(0.2, outbox.append, ('file:/pos/sales.db', SYSTEM, [{'id': 450}])).start()
+        _run(sender, lambda: outbox.counts() == {'delivered': 451})
+        assert time.monotonic() - started < 5
+        assert batches[-1] == [450]
+        assert sender.stats == {'batches': 1, 'delivered': 1, 'failed': 0, 'released': 0}
+
+    print("✅ Batches flushed by count and when idle")
+
+
+def test_byte_limit_and_rejected_rows():
+    """Batches stay under the byte limit, only rejected rows are marked failed, and unsent rows are retried"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        outbox = _outbox(temp_dir)
+        outbox.append('file:/pos/sales.db', SYSTEM, [{'id': n, 'note': 'x' * 100} for n in range(20)])
+        sizes, skipped = [], []
+
+        def send(rows):
+            sizes.append(sum(row['size'] for row in rows))
+            # Odd rows are rejected, and row 18 is left out the first time, so it goes back to pending
+            results = {row['id']: None if row['transaction']['id'] % 2 == 0 else 'total_amount is required'
+                       for row in rows}
+            for row in rows:
+                if row['transaction']['id'] == 18 and not skipped:
+                    skipped.append(results.pop(row['id']))
+            return results
+
+        sender = BatchSender(outbox, send, max_count=200, max_bytes=600, max_wait=0, max_in_flight=1)
+        _run(sender, lambda: set(outbox.counts()) == {'delivered', 'failed'})
+        assert all(size <= 600 for size in sizes) and len(sizes) == 6
+        assert outbox.counts() == {'delivered': 10, 'failed': 10}
+        assert sender.stats['released'] == 1
+        assert outbox.claim(10) == []
+        conn = sqlite3.connect(outbox.db_path)
+        errors = dict(conn.execute("SELECT transaction_data, last_error FROM outbox WHERE status = 'failed'").fetchall())
+        conn.close()
+        assert errors[json.dumps({'id': 1, 'note': 'x' * 100})] == 'total_amount is required'
+
+    print("✅ Byte limit respected and rejected rows failed")
+
+
+def test_batches_in_flight_concurrently():
+    """Up to max_in_flight batches are sent at the same time"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        outbox = _outbox(temp_dir)
+        outbox.append('file:/pos/sales.db', SYSTEM, [{'id': n} for n in range(60)])
+        lock = threading.Lock()
+        active = {'now': 0, 'peak': 0}
+
+        def send(rows):
+            with lock:
+                active['now'] += 1
+                active['peak'] = max(active['peak'], active['now'])
+            time.sleep(0.2)
+            with lock:
+                active['now'] -= 1
+            return {row['id']: None for row in rows}
+
+        sender = BatchSender(outbox, send, max_count=10, max_wait=0, max_in_flight=3)
+        _run(sender, lambda: outbox.counts() == {'delivered': 60})
+        assert active['peak'] == 3
+        assert sender.stats['batches'] == 6
+
+    print("✅ Batches sent concurrently")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Batch Sender")
+    print("=" * 60)
+    test_batches_by_count_and_idle_flush()
+    test_byte_limit_and_rejected_rows()
+    test_batches_in_flight_concurrently()
+    print("\n🎉 All batch sender tests passed!")
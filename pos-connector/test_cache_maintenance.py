@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Test script for cache retention, payload compression and incremental vacuum
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import tempfile
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.cache_schema import CacheSchema, encode_payload, decode_payload
+from pos_connector.cache_writer import CacheWriter
+from pos_connector.cache_maintenance import CacheMaintenance
+from pos_connector.discovery_cache import DiscoveryCache
+from pos_connector.outbox import TransactionOutbox
+from pos_connector.dedup import TransactionDeduplicator
+
+
+def _create(db_path, incremental=True, **options):
+    writer = CacheWriter(db_path)
+    settings = dict(sync_log_days=30, processed_days=7, failed_days=90, delete_chunk=500, compress_chunk=100)
+    settings.update(options)
+    maintenance = CacheMaintenance(db_path, writer, **settings)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    if incremental:
+        maintenance.init_schema(cursor)
+    schema = CacheSchema()
+    schema.init_schema(cursor)
+    DiscoveryCache(db_path).init_schema(cursor)
+    TransactionOutbox(db_path).init_schema(cursor)
+    TransactionDeduplicator(db_path).init_schema(cursor)
+    schema.migrate(cursor)
+    conn.commit()
+    return writer, maintenance, conn
+
+
+def _fill(conn, days_ago, count, processed=1, prefix='T'):
+    conn.executemany(
+        "INSERT INTO sync_log (pos_system_id, transaction_id, sync_status, created_at) "
+        "VALUES (1, ?, 'success', datetime('now', ?))",
+        [(f"{prefix}{i}", f"-{days_ago} days") for i in range(count)]
+    )
+    conn.executemany(
+        "INSERT INTO cached_transactions (pos_system_id, transaction_id, transaction_data, processed, created_at) "
+        "VALUES (1, ?, ?, ?, datetime('now', ?))",
+        [(f"{prefix}{i}", json.dumps({'id': i, 'notes': 'x' * 2000}, indent=2), processed, f"-{days_ago} days")
+         for i in range(count)]
+    )
+    conn.commit()
+
+
+def test_payload_round_trip():
+    """Compressed payloads and legacy JSON text decode to the same transaction"""
+    transaction = {'id': 'T1', 'total_amount': 12.5, 'items': [{'name': 'Tea', 'price': 2}]}
+    stored = encode_payload(transaction)
+    assert isinstance(stored, bytes)
+    assert decode_payload(stored) == transaction
+    assert decode_payload(json.dumps(transaction, indent=2)) == transaction
+
+    print("✅ Payload round trip")
+
+
+def test_retention_windows():
+    """Rows past their window are deleted in chunks; unsent rows are kept for longer"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        writer, maintenance, conn = _create(db_path)
+        _fill(conn, 1, 50, prefix='new')
+        _fill(conn, 60, 1200, prefix='old')
+        _fill(conn, 60, 20, processed=0, prefix='unsent')
+
+        while maintenance.step(timeout=5):
+            pass
+
+        assert conn.execute("SELECT COUNT(*) FROM sync_log").fetchone()[0] == 50
+        remaining = conn.execute("SELECT processed, COUNT(*) FROM cached_transactions GROUP BY processed").fetchall()
+        assert dict(remaining) == {0: 20, 1: 50}
+        # sync_log took three chunks of at most 500
+        assert maintenance.stats['sync_log_deleted'] == 1220 and maintenance.stats['steps'] >= 3
+        # The pages the deleted rows held were given back
+        assert maintenance.stats['pages_freed'] > 0
+        assert conn.execute('PRAGMA freelist_count').fetchone()[0] == 0
+        conn.close()
+        assert writer.stop(timeout=5)
+
+    print("✅ Retention windows")
+
+
+def test_outbox_retention():
+    """Old delivered rows and failed rows beyond the cap leave the outbox; unsent rows stay"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        outbox = TransactionOutbox(db_path)
+        writer, maintenance, conn = _create(db_path, outbox=outbox, outbox_days=7, failed_outbox_rows=1)
+        outbox.append('file:/pos/sales.db', {'name': 'Till 1', 'type': 'database'}, [{'id': n} for n in range(9)])
+        ids = [row['id'] for row in outbox.claim(8)]
+        outbox.mark_delivered(ids[:4])
+        outbox.mark_failed(ids[4:], 'Invalid total')
+        conn.execute("UPDATE outbox SET delivered_at = datetime('now', '-10 days') WHERE id IN (?, ?)", ids[:2])
+        conn.commit()
+
+        while maintenance.step(timeout=5):
+            pass
+
+        assert maintenance.stats['outbox_deleted'] == 5
+        assert outbox.counts() == {'pending': 1, 'delivered': 2, 'failed': 1}
+        assert conn.execute("SELECT id FROM outbox WHERE status = 'failed'").fetchall() == [(ids[-1],)]
+        conn.close()
+        assert writer.stop(timeout=5)
+
+    print("✅ Outbox retention")
+
+
+def test_hash_retention_rebuilds_filter():
+    """Expired dedup hashes are deleted in chunks and the Bloom filter is rebuilt without them"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        deduplicator = TransactionDeduplicator(db_path)
+        writer, maintenance, conn = _create(db_path, deduplicator=deduplicator, hash_days=90, delete_chunk=25)
+        sales = [{'id': n, 'total_amount': n} for n in range(100)]
+        with deduplicator.lock:
+            fresh, hashes = deduplicator.filter(sales)
+            deduplicator.record(hashes, 'file:/pos/sales.db', conn)
+            conn.commit()
+        conn.execute("UPDATE transaction_hashes SET created_at = datetime('now', '-120 days') WHERE hash IN (%s)"
+                     % ','.join('?' * 60), hashes[:60])
+        conn.commit()
+        assert deduplicator._bloom.count == 100
+
+        while maintenance.step(timeout=5):
+            pass
+
+        assert maintenance.stats['hashes_deleted'] == 60
+        assert conn.execute("SELECT COUNT(*) FROM transaction_hashes").fetchone()[0] == 40
+        assert deduplicator._bloom.count == 40
+        # An expired sale is no longer a repeat; a recent one still is
+        assert deduplicator.filter([sales[0], sales[99]])[0] == [sales[0]]
+        conn.close()
+        assert writer.stop(timeout=5)
+
+    print("✅ Hash retention rebuilds the filter")
+
+
+def test_legacy_database_is_compacted():
+    """An old database has its JSON payloads compressed, then is converted and shrunk once if asked to"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        writer, maintenance, conn = _create(db_path, incremental=False, idle_after=0)
+        _fill(conn, 1, 1000)
+        conn.close()
+        before = os.path.getsize(db_path)
+
+        while maintenance.step(timeout=5):
+            pass
+        # The whole-file VACUUM is opt-in
+        maintenance._convert_if_needed()
+        assert sqlite3.connect(db_path).execute('PRAGMA auto_vacuum').fetchone()[0] == 0
+        maintenance.convert = True
+        maintenance._convert_if_needed()
+        assert writer.stop(timeout=5)
+
+        conn = sqlite3.connect(db_path)
+        assert maintenance.stats['compressed'] == 1000
+        assert conn.execute("SELECT COUNT(*) FROM cached_transactions "
+                            "WHERE typeof(transaction_data) = 'text'").fetchone()[0] == 0
+        row = conn.execute("SELECT transaction_data FROM cached_transactions WHERE transaction_id = 'T7'").fetchone()
+        assert decode_payload(row[0])['id'] == 7
+        assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        assert os.path.getsize(db_path) < before / 4
+        conn.close()
+
+    print("✅ Legacy database is compacted")
+
+
+def test_idle_detection():
+    """Background steps do not count as activity; outbox writes and sends in progress do"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        outbox = TransactionOutbox(db_path)
+        writer, maintenance, conn = _create(db_path, outbox=outbox)
+        conn.close()
+
+        writer.submit(lambda cursor: None)
+        assert writer.flush(timeout=5)
+        idle = writer.idle_for()
+        maintenance.step(timeout=5)
+        after_step = writer.idle_for()
+        assert after_step > idle
+        writer.submit(lambda cursor: None)
+        assert writer.flush(timeout=5)
+        assert writer.idle_for() < after_step
+
+        outbox.append('file:/pos/sales.db', {'name': 'Till 1', 'type': 'database'}, [{'id': 1}])
+        assert maintenance.idle_for() < writer.idle_for()
+        ids = [row['id'] for row in outbox.claim(10)]
+        time.sleep(0.05)
+        assert maintenance.idle_for() == 0
+        outbox.mark_delivered(ids)
+        time.sleep(0.05)
+        assert 0 < maintenance.idle_for() < writer.idle_for()
+        assert writer.stop(timeout=5)
+
+    print("✅ Idle detection")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Cache Maintenance")
+    print("=" * 60)
+    test_payload_round_trip()
+    test_retention_windows()
+    test_outbox_retention()
+    test_hash_retention_rebuilds_filter()
+    test_legacy_database_is_compacted()
+    test_idle_detection()
+    print("\n🎉 All cache maintenance tests passed!")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the versioned cache schema and memoized source ids
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.cache_schema import CacheSchema, PosSystemIds
+from pos_connector.cache_writer import CacheWriter
+from pos_connector.discovery_cache import DiscoveryCache
+
+
+def _create(db_path, migrate=True):
+    schema = CacheSchema()
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    schema.init_schema(cursor)
+    DiscoveryCache(db_path).init_schema(cursor)
+    if migrate:
+        schema.migrate(cursor)
+    conn.commit()
+    return schema, conn
+
+
+def test_migrations_run_once():
+    """A fresh database is brought to the latest version and a second run changes nothing"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        schema, conn = _create(db_path)
+        cursor = conn.cursor()
+        assert schema.version(cursor) == schema.latest_version >= 1
+        assert schema.migrate(cursor) == schema.latest_version
+
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {'idx_pos_systems_cache_name', 'idx_sync_log_transaction', 'idx_sync_log_created',
+                'idx_cached_transactions_processed'} <= indexes
+
+        plan = ' '.join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM sync_log WHERE transaction_id = ?", ('T1',)))
+        assert 'idx_sync_log_transaction' in plan
+        conn.close()
+
+    print("✅ Migrations run once")
+
+
+def test_duplicate_sources_are_merged():
+    """Cache rows written twice under one name before the upgrade become one, keeping their history"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        schema, conn = _create(db_path, migrate=False)
+        for _ in range(2):
+            conn.execute("INSERT INTO pos_systems (name, type) VALUES ('Till 1', 'database')")
+        # A discovered system of the same name is discovery's, and is left alone
+        conn.execute("INSERT INTO pos_systems (name, type, discovery_method) VALUES ('Till 1', 'database', 'files')")
+        conn.execute("INSERT INTO sync_log (pos_system_id, transaction_id) VALUES (1, 'A'), (2, 'B')")
+        conn.execute("INSERT INTO cached_transactions (pos_system_id, transaction_id) VALUES (2, 'B')")
+        conn.commit()
+
+        schema.migrate(conn.cursor())
+        conn.commit()
+        assert [row[0] for row in conn.execute("SELECT id FROM pos_systems ORDER BY id")] == [1, 3]
+        assert {row[0] for row in conn.execute("SELECT pos_system_id FROM sync_log")} == {1}
+        assert conn.execute("SELECT pos_system_id FROM cached_transactions").fetchone()[0] == 1
+        try:
+            conn.execute("INSERT INTO pos_systems (name, type) VALUES ('Till 1', 'database')")
+            assert False, "duplicate cache-owned name was accepted"
+        except sqlite3.IntegrityError:
+            pass
+        conn.close()
+
+    print("✅ Duplicate sources are merged")
+
+
+def test_source_ids_are_memoized():
+    """Each source is looked up once; a rolled-back insert is forgotten instead of reused"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        _, conn = _create(db_path)
+        conn.close()
+
+        ids = PosSystemIds()
+        # Long enough that writes submitted together are committed as one batch
+        writer = CacheWriter(db_path, max_delay=0.5, on_rollback=ids.forget)
+        system = {'name': 'Till 1', 'type': 'database'}
+        seen = []
+
+        def failing(cursor, system=system):
+            seen.append(ids.resolve(cursor, system))
+            raise ValueError('bad row')
+
+        writer.submit(failing)
+        assert writer.flush(timeout=5)
+        assert len(ids) == 0
+
+        for _ in range(3):
+            writer.submit(lambda cursor: seen.append(ids.resolve(cursor, system)))
+        assert writer.stop(timeout=5)
+        assert len(set(seen[1:])) == 1 and len(ids) == 1
+
+        # A write later in the same batch as the failed one inserts the row again
+        other = {'name': 'Till 2', 'type': 'file'}
+        resolved = []
+        writer.submit(lambda cursor: failing(cursor, other))
+        writer.submit(lambda cursor: resolved.append(ids.resolve(cursor, other)))
+        assert writer.stop(timeout=5)
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT id FROM pos_systems ORDER BY id").fetchall() == [(seen[1],), (resolved[0],)]
+        conn.close()
+
+    print("✅ Source ids are memoized")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Cache Schema")
+    print("=" * 60)
+    test_migrations_run_once()
+    test_duplicate_sources_are_merged()
+    test_source_ids_are_memoized()
+    print("\n🎉 All cache schema tests passed!")
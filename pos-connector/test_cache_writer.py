@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-writer cache service
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.cache_writer import CacheWriter
+
+
+def _writer(db_path, **options):
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE cached_transactions (transaction_id TEXT UNIQUE, source TEXT)")
+    conn.commit()
+    conn.close()
+    return CacheWriter(db_path, **options)
+
+
+def _insert(transaction_id, source='monitor'):
+    return lambda cursor: cursor.execute(
+        "INSERT INTO cached_transactions (transaction_id, source) VALUES (?, ?)", (transaction_id, source)
+    )
+
+
+def _count(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM cached_transactions").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_concurrent_writes_are_batched():
+    """Writes from many threads land without lock errors, in far fewer commits than writes"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        writer = _writer(db_path, max_batch=100, max_delay=0.05)
+
+        def monitor(n):
+            for i in range(250):
+                writer.submit(_insert(f"{n}-{i}"))
+
+        threads = [threading.Thread(target=monitor, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert writer.flush(timeout=10)
+        assert _count(db_path) == 2000
+        assert writer.stats['writes'] == 2000 and writer.stats['errors'] == 0
+        assert writer.stats['commits'] <= 100
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        conn.close()
+        assert writer.stop(timeout=5)
+
+    print("✅ Concurrent writes are batched")
+
+
+def test_failed_write_does_not_lose_the_batch():
+    """A write that raises is rolled back on its own; the rest of its batch is committed"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        writer = _writer(db_path, max_delay=0.5)
+
+        def half_written(cursor):
+            _insert('partial')(cursor)
+            raise ValueError('bad row')
+
+        writer.submit(_insert('T1'))
+        writer.submit(half_written)
+        writer.submit(_insert('T1'))  # violates UNIQUE
+        writer.submit(_insert('T2'))
+        assert writer.flush(timeout=5)
+
+        conn = sqlite3.connect(db_path)
+        ids = [row[0] for row in conn.execute("SELECT transaction_id FROM cached_transactions ORDER BY 1")]
+        conn.close()
+        assert ids == ['T1', 'T2']
+        assert writer.stats == {'writes': 2, 'commits': 1, 'errors': 2}
+        assert writer.stop(timeout=5)
+
+    print("✅ Failed write does not lose the batch")
+
+
+def test_stop_flushes_and_restarts():
+    """Stop commits whatever is queued, and a later write starts the writer again"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        writer = _writer(db_path, max_delay=10)
+        for i in range(50):
+            writer.submit(_insert(f"T{i}"))
+        # The writer would linger for 10 s; stop commits at once
+        assert writer.stop(timeout=5)
+        assert _count(db_path) == 50
+        assert writer.flush(timeout=1)
+
+        writer.submit(_insert('after-stop', 'shutdown'))
+        assert writer.stop(timeout=5)
+        assert _count(db_path) == 51
+
+    print("✅ Stop flushes and restarts")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Cache Writer")
+    print("=" * 60)
+    test_concurrent_writes_are_batched()
+    test_failed_write_does_not_lose_the_batch()
+    test_stop_flushes_and_restarts()
+    print("\n🎉 All cache writer tests passed!")
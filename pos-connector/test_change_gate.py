@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for change-gated extraction of file and SQLite sources
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+from datetime import datetime
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.change_gate import ChangeGate
+from pos_connector.pos_adapters import SQLiteAdapter, UniversalPOSAdapter
+
+
+def test_sqlite_gate_fires_on_wal_commits_only():
+    """An idle WAL database keeps the gate closed; a commit that only touches the -wal file opens it"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'sales.db')
+        writer = sqlite3.connect(db_path)
+        writer.execute('PRAGMA journal_mode=WAL')
+        writer.execute('CREATE TABLE sales (id INTEGER PRIMARY KEY, total REAL)')
+        writer.commit()
+
+        gate = ChangeGate(sqlite_files=[db_path])
+        assert gate.changed()
+        gate.mark_seen()
+        assert not gate.changed()
+        assert not gate.changed()
+
+        writer.execute('INSERT INTO sales (total) VALUES (9.5)')
+        writer.commit()
+        assert gate.changed()
+
+        # Not marked as seen (e.g. extraction failed): the change is reported again
+        assert gate.changed()
+        gate.mark_seen()
+        assert not gate.changed()
+        writer.close()
+
+        assert gate.stats == {'checks': 6, 'skips': 3}
+
+    print("✅ SQLite gate follows WAL commits")
+
+
+def test_directory_gate_and_safety_net():
+    """New files open a directory gate, and max_quiet forces an occasional full extraction"""
+    now = [0.0]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        gate = ChangeGate(directories=[temp_dir], max_quiet=60, clock=lambda: now[0])
+        assert gate.changed()
+        gate.mark_seen()
+        assert not gate.changed()
+
+        with open(os.path.join(temp_dir, 'sales_0001.csv'), 'w') as f:
+            f.write('id,total\n1,9.5\n')
+        assert gate.changed()
+        gate.mark_seen()
+
+        now[0] = 59
+        assert not gate.changed()
+        now[0] = 60
+        assert gate.changed()
+
+    print("✅ Directory gate and safety net work")
+
+
+def test_sqlite_adapter_skips_unchanged_database():
+    """The SQLite adapter is gated on the discovered database_path"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos.db')
+        sqlite3.connect(db_path).close()
+
+        adapter = SQLiteAdapter()
+        adapter.configure({'name': 'Database POS (pos.db)', 'type': 'database', 'database_path': db_path})
+        assert adapter.connection_string == db_path
+
+        assert adapter.has_changes()
+        adapter.mark_synced()
+        assert not adapter.has_changes()
+
+    print("✅ SQLite adapter skips unchanged databases")
+
+
+def test_failed_extraction_keeps_gate_open():
+    """A source that cannot be read raises; a file that cannot be read leaves the gate open"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos.db')
+        sqlite3.connect(db_path).close()
+        adapter = SQLiteAdapter()
+        adapter.configure({'name': 'Database POS (pos.db)', 'type': 'database', 'database_path': db_path})
+        assert adapter.has_changes()
+        try:
+            adapter.get_new_transactions(datetime.min)
+            assert False, "an unreadable database returned no transactions instead of raising"
+        except sqlite3.OperationalError:
+            pass
+        assert adapter.has_changes()
+
+        # One readable and one unreadable export next to the POS executable
+        open(os.path.join(temp_dir, 'pos.exe'), 'w').close()
+        with open(os.path.join(temp_dir, 'sales.json'), 'w') as f:
+            json.dump([{'id': 1, 'total': 9.5}], f)
+        os.symlink(os.path.join(temp_dir, 'missing.json'), os.path.join(temp_dir, 'receipts.json'))
+        adapter = UniversalPOSAdapter()
+        adapter.configure({'name': 'Till', 'executable_path': os.path.join(temp_dir, 'pos.exe')})
+        assert adapter.has_changes()
+        assert [transaction['id'] for transaction in adapter.get_new_transactions(datetime.min)] == [1]
+        assert len(adapter.extraction_errors) == 1 and 'receipts.json' in adapter.extraction_errors[0]
+        adapter.mark_synced()
+        assert adapter.has_changes()
+
+    print("✅ Failed extraction keeps the gate open")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Change Gate")
+    print("=" * 60)
+    test_sqlite_gate_fires_on_wal_commits_only()
+    test_directory_gate_and_safety_net()
+    test_sqlite_adapter_skips_unchanged_database()
+    test_failed_extraction_keeps_gate_open()
+    print("\n🎉 All change gate tests passed!")
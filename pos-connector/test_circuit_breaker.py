@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for the circuit breakers around the API and the sources
+"""
+
+import os
+import sys
+import time
+import socket
+import sqlite3
+import tempfile
+import threading
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from pos_connector.outbox import TransactionOutbox
+from pos_connector.batch_sender import BatchSender
+from pos_connector.pos_api_client import PosApiClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_states_and_probes():
+    """Opens after repeated failures, lets one probe through per timeout, and closes on success"""
+    clock = FakeClock()
+    circuit = CircuitBreaker('api', failure_threshold=3, reset_timeout=30, max_reset_timeout=100, clock=clock)
+
+    for _ in range(2):
+        assert circuit.allow()
+        circuit.record_failure()
+    assert circuit.state == CLOSED
+    circuit.record_success()
+    for _ in range(3):
+        circuit.record_failure()
+    assert circuit.state == OPEN and not circuit.allow()
+    assert circuit.retry_after() == 30
+
+    # One probe per timeout; a failed probe doubles the wait, up to the maximum
+    for timeout in [30, 60, 100, 100]:
+        clock.now += timeout - 1
+        assert not circuit.allow()
+        clock.now += 1
+        assert circuit.allow() and circuit.state == HALF_OPEN
+        assert not circuit.allow()
+        circuit.record_failure()
+        assert circuit.state == OPEN
+
+    # A probe that never reports back is replaced after the timeout
+    clock.now += 100
+    assert circuit.allow() and not circuit.allow()
+    clock.now += 100
+    assert circuit.allow()
+    circuit.record_success()
+    assert circuit.state == CLOSED and circuit.failures == 0
+
+    # The wait starts from the base again
+    for _ in range(3):
+        circuit.record_failure()
+    assert circuit.retry_after() == 30
+    try:
+        circuit.call(lambda: 'sent')
+        assert False, "expected the call to be refused"
+    except CircuitOpenError:
+        pass
+    clock.now += 30
+    assert circuit.call(lambda: 'sent') == 'sent' and circuit.state == CLOSED
+
+    print("✅ Circuit states and probes")
+
+
+def test_open_api_circuit_sends_nothing():
+    """While the API is down the client stops after the threshold instead of trying every batch"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    client = PosApiClient(f"http://127.0.0.1:{port}", 'test-api-key')
+    client.circuit = CircuitBreaker('api', failure_threshold=2, reset_timeout=60)
+
+    batch = [{'transaction_id': 'T1', 'transaction_date': '2026-03-02 10:00:00', 'total_amount': 5}]
+    for _ in range(2):
+        assert client.send_transactions_with_results(batch)[0]['status'] == 'unsent'
+    assert client.circuit.state == OPEN
+    try:
+        client.send_transactions_with_results(batch)
+        assert False, "expected the batch to be refused"
+    except CircuitOpenError:
+        pass
+    assert not client.send_transactions(batch)
+    assert not client.send_heartbeat({})
+    assert client.circuit.failures == 2
+
+    print("✅ Open API circuit sends nothing")
+
+
+def test_sender_pauses_during_outage():
+    """Rows stay pending while the circuit is open, and one probe resumes sending"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        outbox = TransactionOutbox(os.path.join(temp_dir, 'pos_cache.db'))
+        conn = sqlite3.connect(outbox.db_path)
+        outbox.init_schema(conn.cursor())
+        conn.commit()
+        conn.close()
+        outbox.append('file:/pos/sales.db', {'name': 'POS'}, [{'id': n} for n in range(100)])
+
+        circuit = CircuitBreaker('api', failure_threshold=2, reset_timeout=0.2)
+        api = {'up': False, 'requests': 0}
+
+        def send(rows):
+            # What the API client does for a request
+            if not circuit.allow():
+                raise CircuitOpenError('open')
+            api['requests'] += 1
+            if not api['up']:
+                circuit.record_failure()
+                return {row['id']: 'HTTP 503' for row in rows}
+            circuit.record_success()
+            return {row['id']: None for row in rows}
+
+        sender = BatchSender(outbox, send, max_count=10, max_wait=0, max_in_flight=4, circuit=circuit)
+        sender.IDLE_WAIT = 0.1
+        running = threading.Event()
+        running.set()
+        thread = threading.Thread(target=sender.run, args=(running.is_set,), daemon=True)
+        thread.start()
+
+        time.sleep(1)
+        outage_requests = api['requests']
+        counts = outbox.counts()
+        # The threshold plus a probe or two, not every batch with retries
+        assert outage_requests <= 6
+        assert counts.get('failed', 0) == outage_requests * 10
+        assert counts.get('pending', 0) + counts.get('claimed', 0) == 100 - outage_requests * 10
+
+        api['up'] = True
+        deadline = time.monotonic() + 10
+        while outbox.counts().get('delivered', 0) + outage_requests * 10 < 100 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        running.clear()
+        thread.join(timeout=5)
+        assert outbox.counts() == {'delivered': 100 - outage_requests * 10, 'failed': outage_requests * 10}
+        assert circuit.state == CLOSED
+
+    print("✅ Sender pauses during an outage")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Circuit Breakers")
+    print("=" * 60)
+    test_states_and_probes()
+    test_open_api_circuit_sends_nothing()
+    test_sender_pauses_during_outage()
+    print("\n🎉 All circuit breaker tests passed!")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for content-hash deduplication of extracted transactions
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+from decimal import Decimal
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.dedup import BloomFilter, TransactionDeduplicator, content_hash
+
+
+def _deduplicator(db_path, **options):
+    deduplicator = TransactionDeduplicator(db_path, **options)
+    conn = sqlite3.connect(db_path)
+    deduplicator.init_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+    return deduplicator
+
+
+def _queue(deduplicator, transactions, source_id='file:/pos/sales.db'):
+    """Filter a batch and record the survivors the way the monitor does"""
+    with deduplicator.lock:
+        fresh, hashes = deduplicator.filter(transactions)
+        conn = sqlite3.connect(deduplicator.db_path)
+        with conn:
+            deduplicator.record(hashes, source_id, conn)
+        conn.close()
+    return fresh
+
+
+def _sale(n):
+    return {'id': n, 'date': '2026-03-02 10:00:00', 'total_amount': 12.5, 'items': [{'name': 'Tea', 'price': 2}]}
+
+
+def test_content_hash_is_stable():
+    """The same sale hashes alike whatever the key order, case, spacing, number type or source"""
+    sale = {'id': 7, 'date': '2026-03-02 10:00:00', 'total_amount': 12.5,
+            'items': [{'name': 'Tea', 'price': 2}], 'pos_system': 'Aronium POS', 'source_file': 'a.db'}
+    same = {'Items': [{'price': 2.0, 'name': ' Tea '}], 'TOTAL_AMOUNT': Decimal('12.50'),
+            'date': '2026-03-02 10:00:00 ', 'id': 7, 'pos_system': 'Universal POS', 'source_file': 'copy.db'}
+    assert content_hash(sale) == content_hash(same)
+    assert content_hash(sale) != content_hash(dict(sale, total_amount=12.51))
+    assert content_hash(sale) != content_hash(dict(sale, id=8))
+    print("✅ Content hash is stable")
+
+
+def test_duplicates_dropped_across_sources_and_restarts():
+    """Known sales are dropped, new ones pass without a database lookup"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        deduplicator = _deduplicator(db_path)
+
+        # Repeats inside one batch are dropped too
+        fresh = _queue(deduplicator, [_sale(n) for n in range(100)] + [_sale(3)])
+        assert [t['id'] for t in fresh] == list(range(100))
+        assert deduplicator.stats == {'checked': 101, 'duplicates': 1, 'lookups': 0}
+
+        # An overlapping source and a restart both see the sales already queued
+        restarted = _deduplicator(db_path)
+        overlap = [dict(_sale(n), source_file='copy.db') for n in range(95, 102)]
+        fresh = _queue(restarted, overlap, source_id='dir:/backup')
+        assert [t['id'] for t in fresh] == [100, 101]
+        assert restarted.stats['duplicates'] == 5 and restarted.stats['lookups'] == 1
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM transaction_hashes").fetchone()[0] == 102
+        conn.close()
+
+    print("✅ Duplicates dropped across sources and restarts")
+
+
+def test_bloom_filter_grows_and_stays_accurate():
+    """A full filter is rebuilt larger without forgetting hashes, and false positives stay rare"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        deduplicator = _deduplicator(db_path, capacity=10)
+        for first in range(0, 30, 6):
+            _queue(deduplicator, [_sale(n) for n in range(first, first + 6)])
+        assert deduplicator._bloom.capacity >= 30
+        assert _queue(deduplicator, [_sale(n) for n in range(31)]) == [_sale(30)]
+
+        # A large table is loaded in the background, and hashes recorded meanwhile are not lost
+        background = _deduplicator(db_path)
+        background.SYNC_LOAD_LIMIT = 0
+        assert _queue(background, [_sale(n) for n in range(32)]) == [_sale(31)]
+        deadline = time.monotonic() + 5
+        while background._bloom is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert background._bloom is not None
+        assert _queue(background, [_sale(31), _sale(32)]) == [_sale(32)]
+
+    bloom = BloomFilter(10000, 0.01)
+    for n in range(10000):
+        bloom.add(content_hash({'id': n}))
+    assert all(content_hash({'id': n}) in bloom for n in range(10000))
+    false_positives = sum(content_hash({'id': n}) in bloom for n in range(10000, 20000))
+    assert false_positives < 200
+
+    print("✅ Bloom filter grows and stays accurate")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Transaction Deduplication")
+    print("=" * 60)
+    test_content_hash_is_stable()
+    test_duplicates_dropped_across_sources_and_restarts()
+    test_bloom_filter_grows_and_stays_accurate()
+    print("\n🎉 All deduplication tests passed!")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent, incremental discovery cache
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+from pathlib import Path
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.discovery_cache import DiscoveryCache
+
+
+def _create_cache(tmp: Path) -> DiscoveryCache:
+    db_path = tmp / 'pos_cache.db'
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE pos_systems (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            connection_string TEXT,
+            config TEXT,
+            status TEXT DEFAULT 'active',
+            last_sync TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cache = DiscoveryCache(db_path)
+    cache.init_schema(cursor)
+    conn.commit()
+    conn.close()
+    return cache
+
+
+def _bump_mtime(path: Path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_warm_scan_skips_unchanged_directories():
+    """A warm scan lists only directories whose mtime changed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = _create_cache(tmp)
+        root = tmp / 'POS'
+        (root / 'Store' / 'Data').mkdir(parents=True)
+        (root / 'Store' / 'Data' / 'sales.db').write_bytes(b'x' * 2048)
+        (root / 'readme.txt').write_text('not a pos file')
+
+        matched = []
+
+        def match_file(full_path, name):
+            matched.append(name)
+            if 'sales' in name:
+                return {'name': f"POS System ({name})", 'type': 'file_based', 'file_path': full_path}
+            return None
+
+        cold = cache.scan_tree('file_scan', str(root), 3, match_file)
+        assert [s['name'] for s in cold] == ['POS System (sales.db)']
+        assert sorted(matched) == ['readme.txt', 'sales.db']
+
+        matched.clear()
+        warm = cache.scan_tree('file_scan', str(root), 3, match_file)
+        assert [s['name'] for s in warm] == ['POS System (sales.db)']
+        assert matched == [], "unchanged directories must not be listed again"
+
+        # Adding a file changes only the mtime of its own directory
+        (root / 'Store' / 'orders_sales.csv').write_text('id,total\n1,10\n')
+        _bump_mtime(root / 'Store')
+        matched.clear()
+        rescanned = cache.scan_tree('file_scan', str(root), 3, match_file)
+        assert matched == ['orders_sales.csv']
+        assert sorted(s['name'] for s in rescanned) == ['POS System (orders_sales.csv)', 'POS System (sales.db)']
+
+    print("✅ Warm scan only rescans changed directories")
+
+
+def test_results_persist_in_pos_systems():
+    """Discovered systems are stored in pos_systems keyed by path, size and mtime"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = _create_cache(tmp)
+        root = tmp / 'Data'
+        root.mkdir()
+        db_file = root / 'pos.db'
+        db_file.write_bytes(b'x' * 4096)
+
+        def match_file(full_path, name):
+            return {'name': f"Database POS ({name})", 'type': 'database', 'database_path': full_path}
+
+        cache.scan_tree('database_scan', str(root), 2, match_file)
+
+        conn = sqlite3.connect(cache.db_path)
+        rows = conn.execute(
+            "SELECT id, name, source_path, source_size FROM pos_systems WHERE discovery_method = 'database_scan'"
+        ).fetchall()
+        conn.close()
+        assert len(rows) == 1
+        row_id, name, source_path, source_size = rows[0]
+        assert name == 'Database POS (pos.db)'
+        assert source_path == str(db_file)
+        assert source_size == 4096
+
+        # A changed file size re-runs the matcher without listing the directory, keeping the row id
+        db_file.write_bytes(b'x' * 8192)
+        os.utime(root, ns=(os.stat(root).st_atime_ns, os.stat(root).st_mtime_ns))
+        cache.scan_tree('database_scan', str(root), 2, match_file)
+
+        conn = sqlite3.connect(cache.db_path)
+        rows = conn.execute("SELECT id, source_size FROM pos_systems WHERE discovery_method = 'database_scan'").fetchall()
+        conn.close()
+        assert rows == [(row_id, 8192)]
+
+    print("✅ Discovery results persisted in pos_systems")
+
+
+def test_removed_directories_are_pruned():
+    """Directories that disappear are dropped together with their systems"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = _create_cache(tmp)
+        root = tmp / 'Retail'
+        (root / 'Old').mkdir(parents=True)
+        (root / 'Old' / 'pos_sales.csv').write_text('id\n1\n')
+
+        def match_file(full_path, name):
+            return {'name': name, 'type': 'file_based', 'file_path': full_path}
+
+        assert len(cache.scan_tree('file_scan', str(root), 3, match_file)) == 1
+
+        os.remove(root / 'Old' / 'pos_sales.csv')
+        os.rmdir(root / 'Old')
+        time.sleep(0.01)
+        _bump_mtime(root)
+
+        assert cache.scan_tree('file_scan', str(root), 3, match_file) == []
+
+        conn = sqlite3.connect(cache.db_path)
+        remaining = conn.execute("SELECT COUNT(*) FROM pos_systems").fetchone()[0]
+        dirs = conn.execute("SELECT path FROM discovery_dirs").fetchall()
+        conn.close()
+        assert remaining == 0
+        assert dirs == [(str(root),)]
+
+    print("✅ Removed directories pruned from the cache")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Incremental Discovery Cache")
+    print("=" * 60)
+    test_warm_scan_skips_unchanged_directories()
+    test_results_persist_in_pos_systems()
+    test_removed_directories_are_pruned()
+    print("\n🎉 All discovery cache tests passed!")
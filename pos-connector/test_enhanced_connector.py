@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Test script for the connector's own paths: discovery, validation, polling, sending and caching
+Sources, adapters and the API are fakes; pos_cache.db is a temporary file
+"""
+
+import os
+import sys
+import time
+import asyncio
+import sqlite3
+import tempfile
+import threading
+import requests
+from datetime import datetime, timedelta
+from unittest import mock
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.enhanced_connector import EnhancedPOSConnector
+from pos_connector.batch_sender import BatchSender
+from pos_connector.scheduler import PollScheduler
+
+SOURCE = 'file:/pos/sales.db'
+
+
+class FakeAdapter:
+    """Source adapter returning prepared batches of transactions"""
+
+    def __init__(self, batches=()):
+        self.batches = list(batches)
+        self.marked = 0
+        self.extraction_errors = []
+
+    def has_changes(self):
+        return True
+
+    def get_new_transactions(self, since):
+        return self.batches.pop(0) if self.batches else []
+
+    def mark_synced(self):
+        self.marked += 1
+
+    def close_connection(self):
+        pass
+
+
+class StubRegistry:
+    """The parts of winreg the connector uses, over a tree of {'values': {...}, 'keys': {...}} nodes"""
+
+    HKEY_LOCAL_MACHINE = 'HKLM'
+    HKEY_CURRENT_USER = 'HKCU'
+
+    class Key:
+        def __init__(self, node):
+            self.node = node
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    def __init__(self, roots):
+        self.roots = roots
+
+    def OpenKey(self, parent, path):
+        node = self.roots.get((parent, path)) if isinstance(parent, str) else parent.node['keys'].get(path)
+        if node is None:
+            raise FileNotFoundError(path)
+        return self.Key(node)
+
+    def QueryInfoKey(self, key):
+        return len(key.node.get('keys', {})), len(key.node.get('values', {})), 0
+
+    def EnumKey(self, key, index):
+        return list(key.node['keys'])[index]
+
+    def QueryValueEx(self, key, name):
+        if name not in key.node.get('values', {}):
+            raise FileNotFoundError(name)
+        return key.node['values'][name], 1
+
+
+def _connector(temp_dir, **config):
+    settings = {
+        'api_key': 'test-key',
+        'base_url': 'http://127.0.0.1:9',
+        'cache_db_path': os.path.join(temp_dir, 'pos_cache.db'),
+        'adaptive_polling': False,
+    }
+    settings.update(config)
+    connector = EnhancedPOSConnector(settings)
+    connector.scheduler = PollScheduler(max_workers=1)
+    return connector
+
+
+def _system(name='Fake POS'):
+    return {'name': name, 'type': 'database', 'adapter': 'sqlite', 'source_id': SOURCE, 'validated': True}
+
+
+def _sales(start, count):
+    moment = datetime(2026, 3, 1, 9, 0)
+    return [{'id': f"S{n}", 'date': (moment + timedelta(minutes=n)).isoformat(), 'total_amount': n}
+            for n in range(start, start + count)]
+
+
+def _drain(connector, timeout=10):
+    """Send everything pending in the outbox through the connector's batch sender"""
+    sender = BatchSender(connector.outbox, connector._send_batch, max_wait=0.05,
+                         circuit=connector.api_client.circuit)
+    sender.IDLE_WAIT = 0.1
+    running = threading.Event()
+    running.set()
+    thread = threading.Thread(target=sender.run, args=(running.is_set,), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + timeout
+    while connector.outbox.counts().get('pending') and time.monotonic() < deadline:
+        time.sleep(0.02)
+    running.clear()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert not connector.outbox.counts().get('pending'), "outbox was not drained"
+
+
+def test_poll_send_cache_cycle():
+    """A poll queues new sales with their cursor; the sender delivers them and the results reach the cache"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        connector = _connector(temp_dir)
+        system = _system()
+        adapter = FakeAdapter([_sales(0, 3), _sales(0, 3) + _sales(3, 2)])
+        connector.source_adapters[SOURCE] = adapter
+        sent = []
+
+        def send(payload):
+            sent.extend(transaction['transaction_id'] for transaction in payload)
+            # The API rejects one sale of the second batch
+            return [{'transaction_id': transaction['transaction_id'],
+                     'status': 'error' if transaction['transaction_id'] == 'S4' else 'created',
+                     'error': 'Invalid total' if transaction['transaction_id'] == 'S4' else None}
+                    for transaction in payload]
+
+        connector.api_client.send_transactions_with_results = send
+
+        connector._poll_pos_system(system)
+        assert connector.source_cursors.get(SOURCE).timestamp == datetime(2026, 3, 1, 9, 2)
+        _drain(connector)
+        # The second poll sees the first batch again: the cursor drops it before it is queued
+        connector._poll_pos_system(system)
+        _drain(connector)
+        assert sent == ['S0', 'S1', 'S2', 'S3', 'S4']
+        assert connector.outbox.counts() == {'delivered': 4, 'failed': 1}
+
+        assert connector.cache_writer.flush(timeout=5)
+        conn = sqlite3.connect(connector.db_path)
+        logged = conn.execute("SELECT transaction_id, sync_status, error_message FROM sync_log ORDER BY id").fetchall()
+        last_sync = conn.execute("SELECT last_sync FROM pos_systems WHERE name = 'Fake POS'").fetchone()[0]
+        conn.close()
+        assert sorted(logged) == [('S0', 'success', None), ('S1', 'success', None), ('S2', 'success', None),
+                                  ('S3', 'success', None), ('S4', 'failed', 'Invalid total')]
+        assert last_sync is not None
+
+        stats = connector.get_local_stats(days=100000)
+        assert stats['by_status'] == {'success': {'count': 4, 'total_amount': 6.0},
+                                      'failed': {'count': 1, 'total_amount': 4.0}}
+        assert stats['retry']['waiting'] == 1 and stats['outbox'] == {'delivered': 4, 'failed': 1}
+        assert connector.get_status()['queue_size'] == 0
+        connector.stop_monitoring()
+
+    print("✅ Poll, send and cache cycle")
+
+
+def test_unreachable_api_keeps_rows_pending():
+    """A batch the API never received goes back to the outbox as pending, and nothing is cached as failed"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        connector = _connector(temp_dir)
+        connector.source_adapters[SOURCE] = FakeAdapter([_sales(0, 3)])
+        connector._poll_pos_system(_system())
+
+        sender = BatchSender(connector.outbox, connector._send_batch, max_wait=0.05,
+                             circuit=connector.api_client.circuit)
+        running = threading.Event()
+        running.set()
+        refused = requests.ConnectionError('Connection refused')
+        with mock.patch.object(connector.api_client.session, 'post', side_effect=refused) as post:
+            thread = threading.Thread(target=sender.run, args=(running.is_set,), daemon=True)
+            thread.start()
+            deadline = time.monotonic() + 5
+            while not sender.stats['batches'] and time.monotonic() < deadline:
+                time.sleep(0.02)
+            running.clear()
+            thread.join(timeout=5)
+        assert post.called and not thread.is_alive()
+        assert sender.stats['released'] >= 3 and sender.stats['failed'] == 0
+        assert connector.outbox.counts() == {'pending': 3}
+
+        assert connector.cache_writer.flush(timeout=5)
+        conn = sqlite3.connect(connector.db_path)
+        assert conn.execute("SELECT COUNT(*) FROM sync_log").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM cached_transactions").fetchone()[0] == 0
+        conn.close()
+        connector.stop_monitoring()
+
+    print("✅ Unreachable API keeps rows pending")
+
+
+def test_failing_source_opens_its_circuit():
+    """Polls that raise count against the source; its circuit opens at the threshold"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        connector = _connector(temp_dir, source_failure_threshold=2, source_retry_interval=60)
+        system = _system()
+
+        class BrokenAdapter(FakeAdapter):
+            def get_new_transactions(self, since):
+                raise sqlite3.OperationalError('database is locked')
+
+        adapter = BrokenAdapter()
+        connector.source_adapters[SOURCE] = adapter
+        connector._poll_pos_system(system)
+        assert connector.failed_syncs['Fake POS'] == 1
+        # The change gate is only closed after a successful extraction
+        assert adapter.marked == 0
+        assert connector._poll_pos_system(system) > 0
+        assert not connector._source_circuit(system).allow()
+        assert connector.outbox.counts() == {}
+        connector.stop_monitoring()
+
+    print("✅ Failing source opens its circuit")
+
+
+def test_discovery_stream_merges_and_validates():
+    """Finds of one source by several methods are merged; only systems passing their test are yielded"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        connector = _connector(temp_dir)
+        database = os.path.join(temp_dir, 'sales.db')
+        other = os.path.join(temp_dir, 'other.db')
+
+        def by_files():
+            return [{'name': 'Database POS (sales.db)', 'type': 'database', 'database_type': '.db',
+                     'database_path': database, 'discovery_method': 'filesystem'},
+                    {'name': 'Database POS (other.db)', 'type': 'database', 'database_type': '.db',
+                     'database_path': other, 'discovery_method': 'filesystem'}]
+
+        def by_processes():
+            return [{'name': 'POS process', 'type': 'process', 'database_path': database,
+                     'discovery_method': 'process'}]
+
+        connector._get_discovery_methods = lambda: [('Files', by_files), ('Processes', by_processes)]
+        tested = []
+
+        def test_connection(adapter_key, system):
+            tested.append((adapter_key, system['database_path']))
+            return system['database_path'] == database
+
+        connector._test_system_connection = test_connection
+
+        async def discover():
+            return [system async for system in connector.discover_pos_systems_stream()]
+
+        systems = asyncio.run(discover())
+        assert [system['database_path'] for system in systems] == [database]
+        assert systems[0]['validated'] and systems[0]['adapter'] == 'sqlite'
+        assert sorted(tested) == sorted([('sqlite', database), ('sqlite', other)])
+        connector.stop_monitoring()
+
+    print("✅ Discovery stream merges and validates")
+
+
+def test_registry_discovery():
+    """Installed POS software and SQL Server instances are read from the registry, and skipped without it"""
+    uninstall = {'keys': {
+        'loyverse': {'values': {'DisplayName': 'Loyverse POS', 'InstallLocation': 'C:/Loyverse'}},
+        'acme': {'values': {'DisplayName': 'Acme Retail', 'UninstallString': 'C:/Acme/uninstall.exe'}},
+        'msretail': {'values': {'DisplayName': 'Microsoft POS for .NET'}},
+        'notepad': {'values': {'DisplayName': 'Notepad++'}},
+    }}
+    registry = StubRegistry({
+        ('HKLM', r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"): uninstall,
+        ('HKLM', r"SOFTWARE\Microsoft\Microsoft SQL Server"): {'values': {'InstalledInstances': ['MSSQLSERVER', 'SHOP']}},
+    })
+    with tempfile.TemporaryDirectory() as temp_dir:
+        connector = _connector(temp_dir)
+        with mock.patch('pos_connector.enhanced_connector.winreg', registry):
+            systems = connector._discover_by_registry()
+            instances = connector._discover_sql_server_instances()
+        assert [(system['name'], system['install_path']) for system in systems] == [
+            ('Loyverse POS', 'C:/Loyverse'), ('Acme Retail', 'C:/Acme')]
+        assert all(system['discovery_method'] == 'registry' for system in systems)
+        assert 'localhost\\SHOP' in instances and 'localhost' in instances
+
+        with mock.patch('pos_connector.enhanced_connector.winreg', None):
+            assert connector._discover_by_registry() == []
+            assert 'localhost\\SHOP' not in connector._discover_sql_server_instances()
+        connector.stop_monitoring()
+
+    print("✅ Registry discovery")
+
+
+def test_validation_timeout():
+    """A connection test that hangs is given up after the validation timeout"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        connector = _connector(temp_dir, validation_timeout=0.2)
+        release = threading.Event()
+        connector._test_system_connection = lambda adapter_key, system: release.wait(5)
+        system = {'name': 'Hung POS', 'type': 'database', 'database_type': '.db', 'database_path': '/pos/hung.db'}
+
+        async def validate():
+            return await connector._validate_systems([system])
+
+        start = time.monotonic()
+        assert asyncio.run(validate()) == []
+        assert time.monotonic() - start < 2
+        release.set()
+        connector.stop_monitoring()
+
+    print("✅ Validation timeout")
+
+
+def test_hung_validation_keeps_its_slot():
+    """A test given up on still holds its worker, so the next system is tested only once one is free"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        connector = _connector(temp_dir, validation_timeout=0.3, validation_concurrency=1)
+        started = {}
+
+        def test_connection(adapter_key, system):
+            started[system['name']] = time.monotonic()
+            if system['name'] == 'Hung POS':
+                time.sleep(0.8)
+            return True
+
+        connector._test_system_connection = test_connection
+        systems = [{'name': name, 'type': 'database', 'database_type': '.db', 'database_path': f"/pos/{name}.db"}
+                   for name in ('Hung POS', 'Live POS')]
+
+        async def validate():
+            return await connector._validate_systems(systems)
+
+        # The live system waits for the hung test's worker, then gets its whole timeout
+        assert [system['name'] for system in asyncio.run(validate())] == ['Live POS']
+        assert started['Live POS'] - started['Hung POS'] >= 0.7
+        connector.stop_monitoring()
+
+    print("✅ Hung validation keeps its slot")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Enhanced POS Connector")
+    print("=" * 60)
+    test_poll_send_cache_cycle()
+    test_unreachable_api_keeps_rows_pending()
+    test_failing_source_opens_its_circuit()
+    test_discovery_stream_merges_and_validates()
+    test_registry_discovery()
+    test_validation_timeout()
+    test_hung_validation_keeps_its_slot()
+    print("\n🎉 All connector tests passed!")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared single-pass file system walker
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.fs_walker import FileSystemWalker
+
+
+def _build_tree(root: Path):
+    (root / 'Data' / 'Store' / 'Deep' / 'Deeper').mkdir(parents=True)
+    (root / 'Data' / 'sales.db').write_text('db')
+    (root / 'Data' / 'Store' / 'pos_export.csv').write_text('csv')
+    (root / 'Data' / 'Store' / 'Deep' / 'receipts.json').write_text('json')
+    (root / 'Data' / 'Store' / 'Deep' / 'Deeper' / 'invoice.pdf').write_text('pdf')
+
+
+def test_overlapping_roots_are_listed_once():
+    """Every directory is read by a single scandir call regardless of how many matchers share it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _build_tree(root)
+        data = str(root / 'Data')
+
+        walker = FileSystemWalker()
+        walker.add_matcher('databases', [data], 2, lambda entry, _root: entry.name if entry.name.endswith('.db') else None)
+        walker.add_matcher('exports', [data, str(root / 'Data' / 'Store')], 3,
+                           lambda entry, _root: entry.name if entry.name.endswith(('.csv', '.json', '.pdf')) else None)
+
+        real_scandir = os.scandir
+        listed = []
+
+        def counting_scandir(path):
+            listed.append(os.path.normpath(path))
+            return real_scandir(path)
+
+        with mock.patch('pos_connector.fs_walker.os.scandir', side_effect=counting_scandir):
+            results = walker.walk()
+
+        assert len(listed) == len(set(listed)), f"directories listed more than once: {listed}"
+        assert results['databases'] == ['sales.db']
+        assert sorted(results['exports']) == ['invoice.pdf', 'pos_export.csv', 'receipts.json']
+        assert walker.stats['directories_listed'] == 4
+
+    print("✅ Overlapping roots listed once")
+
+
+def test_depth_limits_are_per_matcher():
+    """Each matcher only sees files within its own depth limit"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _build_tree(root)
+        data = str(root / 'Data')
+
+        walker = FileSystemWalker()
+        walker.add_matcher('shallow', [data], 1, lambda entry, _root: entry.name)
+        walker.add_matcher('deep', [data], 3, lambda entry, _root: entry.name)
+        results = walker.walk()
+
+        assert sorted(results['shallow']) == ['pos_export.csv', 'sales.db']
+        assert sorted(results['deep']) == ['invoice.pdf', 'pos_export.csv', 'receipts.json', 'sales.db']
+
+    print("✅ Depth limits applied per matcher")
+
+
+def test_per_root_matchers_see_nested_roots():
+    """per_root matchers are called once for every registered root containing a file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _build_tree(root)
+        data = os.path.normpath(str(root / 'Data'))
+        store = os.path.normpath(str(root / 'Data' / 'Store'))
+
+        counts = {data: 0, store: 0}
+
+        def count(entry, folder):
+            counts[folder] += 1
+            return None
+
+        walker = FileSystemWalker()
+        walker.add_matcher('folders', [data, store], 2, count, per_root=True)
+        walker.walk()
+
+        # Data sees depth 0..2 (sales.db, pos_export.csv, receipts.json); Store sees depth 0..2 (3 files)
+        assert counts == {data: 3, store: 3}
+
+    print("✅ Nested roots counted per root")
+
+
+def test_nested_root_beyond_outer_depth_is_reached():
+    """A root nested below another matcher's depth limit is still walked"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _build_tree(root)
+
+        walker = FileSystemWalker()
+        walker.add_matcher('outer', [str(root)], 0, lambda entry, _root: entry.name)
+        walker.add_matcher('inner', [str(root / 'Data' / 'Store' / 'Deep')], 0, lambda entry, _root: entry.name)
+        results = walker.walk()
+
+        assert results['outer'] == []
+        assert results['inner'] == ['receipts.json']
+
+    print("✅ Nested roots beyond depth limits reached")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Shared File System Walker")
+    print("=" * 60)
+    test_overlapping_roots_are_listed_once()
+    test_depth_limits_are_per_matcher()
+    test_per_root_matchers_see_nested_roots()
+    test_nested_root_beyond_outer_depth_is_reached()
+    print("\n🎉 All file system walker tests passed!")
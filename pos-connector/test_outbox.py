@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for the durable transaction outbox
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.outbox import TransactionOutbox
+from pos_connector.source_cursors import SourceCursorStore
+
+SYSTEM = {'name': 'Database POS (sales.db)', 'type': 'database', 'adapter': 'sqlite'}
+
+
+def _stores(db_path):
+    outbox = TransactionOutbox(db_path)
+    cursors = SourceCursorStore(db_path)
+    conn = sqlite3.connect(db_path)
+    outbox.init_schema(conn.cursor())
+    cursors.init_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+    return outbox, cursors
+
+
+def test_unsent_rows_survive_restart():
+    """Claimed but unconfirmed rows are sent again by the next run, in order, without the source"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        outbox, _cursors = _stores(db_path)
+        outbox.append('file:/pos/sales.db', SYSTEM, [{'id': n} for n in range(5)])
+        assert outbox.ready.is_set()
+
+        first = outbox.claim(2)
+        outbox.mark_delivered([first[0]['id']])
+        outbox.mark_failed([first[1]['id']], 'HTTP 422')
+        claimed = outbox.claim(2)
+        assert [row['transaction']['id'] for row in claimed] == [2, 3]
+        assert outbox.backlog() == 3
+        # Process dies here with rows 2 and 3 claimed
+
+        restarted, _cursors = _stores(db_path)
+        assert restarted.recover() == 2
+        assert restarted.backlog() == 3
+        resumed = restarted.claim(10)
+        assert [row['transaction']['id'] for row in resumed] == [2, 3, 4]
+        assert resumed[0]['system'] == SYSTEM
+        assert restarted.counts() == {'delivered': 1, 'failed': 1, 'claimed': 3}
+        assert restarted.claim(10) == []
+        restarted.release([resumed[2]['id']])
+        restarted.mark_delivered([row['id'] for row in resumed[:2]])
+        assert restarted.backlog() == 1
+
+    print("✅ Unsent rows survive a restart")
+
+
+def test_batch_and_cursor_commit_together():
+    """A batch is queued together with its cursor, or neither is written"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        outbox, cursors = _stores(db_path)
+        source_id = 'file:/pos/sales.db'
+
+        new, cursor = cursors.get(source_id).select([{'id': 1, 'date': '2026-03-02 10:00:00'}])
+        outbox.append(source_id, SYSTEM, new, before_commit=lambda conn: cursors.save(source_id, cursor, conn))
+        assert SourceCursorStore(db_path).get(source_id) == cursor
+
+        new, later = cursor.select([{'id': 2, 'date': '2026-03-02 10:05:00'}])
+
+        def fail(conn):
+            cursors.save(source_id, later, conn)
+            raise sqlite3.OperationalError('disk I/O error')
+
+        try:
+            outbox.append(source_id, SYSTEM, new, before_commit=fail)
+            assert False, "expected the append to fail"
+        except sqlite3.OperationalError:
+            cursors.discard(source_id)
+
+        assert outbox.counts() == {'pending': 1}
+        assert cursors.get(source_id) == cursor
+
+    print("✅ Batch and cursor committed atomically")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Transaction Outbox")
+    print("=" * 60)
+    test_unsent_rows_survive_restart()
+    test_batch_and_cursor_commit_together()
+    print("\n🎉 All outbox tests passed!")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled keyword classifier
+"""
+
+import os
+import sys
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.patterns import (
+    PatternClassifier, POS_PATTERNS, POS_FILE_PATTERNS, POS_NAME, POS_TABLE, POS_FILE
+)
+
+
+def test_classify_reports_overlapping_categories():
+    """A single pass reports every category, including keywords nested in longer ones"""
+    classifier = PatternClassifier({'long': ['transactions'], 'short': ['action'], 'other': ['zzz']})
+
+    assert classifier.classify('Daily_Transactions.csv') == {'long', 'short'}
+    assert classifier.classify('posaction') == {'short'}
+    assert classifier.classify('readme.txt') == frozenset()
+
+    print("✅ Overlapping keyword categories reported")
+
+
+def test_matches_agree_with_keyword_loops():
+    """Compiled categories give the same answers as the keyword loops they replaced"""
+    names = [
+        'POS_Sales.db', 'mypos.exe', 'store.exe', 'backup.sqlite', 'Orders.csv', 'orders_2024.csv',
+        'transactions.json', 'Customer_List.xlsx', 'tender_types', 'config.ini', 'setup.exe',
+    ]
+    file_fragments = [pattern.replace('*', '') for pattern in POS_FILE_PATTERNS]
+
+    for name in names:
+        lower = name.lower()
+        assert POS_PATTERNS.matches(name, POS_FILE) == any(f in lower for f in file_fragments), name
+        for category in (POS_NAME, POS_TABLE):
+            expected = any(k in lower for k in POS_PATTERNS.keywords(category))
+            assert POS_PATTERNS.matches(name, category) == expected, (name, category)
+            assert (category in POS_PATTERNS.classify(name)) == expected, (name, category)
+
+    print("✅ Compiled matcher agrees with keyword loops")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Compiled Keyword Classifier")
+    print("=" * 60)
+    test_classify_reports_overlapping_categories()
+    test_matches_agree_with_keyword_loops()
+    print("\n🎉 All keyword classifier tests passed!")
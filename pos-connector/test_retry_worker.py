@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for the retry worker of failed cached transactions
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.cache_schema import CacheSchema, encode_payload
+from pos_connector.cache_writer import CacheWriter
+from pos_connector.circuit_breaker import CircuitBreaker
+from pos_connector.discovery_cache import DiscoveryCache
+from pos_connector.outbox import TransactionOutbox
+from pos_connector.retry_worker import RetrySchedule, RetryWorker, timestamp
+
+SYSTEM = {'name': 'Database POS (sales.db)', 'type': 'database', 'adapter': 'sqlite'}
+
+
+def _setup(db_path, rows, next_attempt_offset=-1, **options):
+    """A cache with ``rows`` failed transactions and a worker that requeues into a real outbox"""
+    outbox = TransactionOutbox(db_path)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    schema = CacheSchema()
+    schema.init_schema(cursor)
+    DiscoveryCache(db_path).init_schema(cursor)
+    outbox.init_schema(cursor)
+    schema.migrate(cursor)
+    cursor.execute("INSERT INTO pos_systems (name, type, config) VALUES (?, ?, '{\"adapter\": \"sqlite\"}')",
+                   (SYSTEM['name'], SYSTEM['type']))
+    cursor.executemany(
+        "INSERT INTO cached_transactions (pos_system_id, transaction_id, transaction_data, processed, attempts, "
+        "next_attempt_at, last_error) VALUES (1, ?, ?, 0, 1, ?, 'HTTP 503')",
+        [(f"T{i}", encode_payload({'id': f"T{i}", 'total_amount': i}), timestamp(next_attempt_offset + i / 1000))
+         for i in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+
+    writer = CacheWriter(db_path)
+    circuit = options.pop('circuit', None)
+    worker = RetryWorker(db_path, writer, outbox,
+                         lambda system, transactions: outbox.append('file:/pos/sales.db', system, transactions),
+                         circuit=circuit, **options)
+    return worker, writer, outbox
+
+
+def test_schedule_backs_off_and_gives_up():
+    """Delays double from the base up to the cap, and stop after the last attempt"""
+    schedule = RetrySchedule(base_delay=60, max_delay=600, max_attempts=6)
+    assert [schedule.delay(n) for n in range(1, 7)] == [60, 120, 240, 480, 600, None]
+    assert schedule.next_attempt_at(6) is None
+    assert schedule.next_attempt_at(1) > timestamp()
+
+    print("✅ Schedule backs off and gives up")
+
+
+def test_due_rows_are_requeued_once():
+    """Due rows go to the outbox in next-attempt order through the retry index, and are leased"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        worker, writer, outbox = _setup(db_path, 30, batch_size=20, max_backlog=100)
+
+        # The due query names the retry index, so SQLite refuses to run it without that index
+        assert worker.run_once() == 0  # a full batch: more may be due
+        worker.run_once()
+        worker.run_once()
+        claimed = outbox.claim(100)
+        assert [row['transaction']['id'] for row in claimed] == [f"T{i}" for i in range(30)]
+        assert claimed[0]['system']['adapter'] == 'sqlite'
+        assert worker.stats['requeued'] == 30
+
+        # Leased rows are not due again while they wait in the outbox
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM cached_transactions WHERE queued_at IS NOT NULL").fetchone()[0] == 30
+        assert worker._due(100) == []
+        assert worker.counts() == {'waiting': 30, 'given_up': 0}
+        conn.close()
+        assert writer.stop(timeout=5)
+
+    print("✅ Due rows are requeued once")
+
+
+def test_outage_backlog_recovers_at_full_batches():
+    """Nothing is requeued while the API is down; once it is back every waiting row is resent in full batches"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        circuit = CircuitBreaker('api', failure_threshold=1, reset_timeout=60)
+        # Backed off for up to an hour by the failures of the outage
+        worker, writer, outbox = _setup(db_path, 250, next_attempt_offset=3000, circuit=circuit,
+                                        batch_size=100, max_backlog=1000)
+        circuit.record_failure()
+
+        assert worker.run_once() > 0
+        assert worker.stats['requeued'] == 0
+
+        circuit.record_success()
+        delays = [worker.run_once() for _ in range(3)]
+        assert worker.stats['pulled_forward'] == 250
+        assert worker.stats['requeued'] == 250 and worker.stats['batches'] == 3
+        assert delays[:2] == [0, 0]
+        assert len(outbox.claim(1000)) == 250
+        assert writer.stop(timeout=5)
+
+    print("✅ Outage backlog recovers at full batches")
+
+
+def test_probe_when_outbox_is_empty():
+    """An open circuit due for a probe gets one row from the cache if the outbox has nothing to send"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        circuit = CircuitBreaker('api', failure_threshold=1, reset_timeout=0)
+        worker, writer, outbox = _setup(db_path, 5, next_attempt_offset=3000, circuit=circuit)
+        circuit.record_failure()
+
+        worker.run_once()
+        worker.run_once()
+        assert worker.stats['probes'] == 1
+        assert [row['transaction']['id'] for row in outbox.claim(10)] == ['T0']
+        assert writer.stop(timeout=5)
+
+    print("✅ Probe when outbox is empty")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Retry Worker")
+    print("=" * 60)
+    test_schedule_backs_off_and_gives_up()
+    test_due_rows_are_requeued_once()
+    test_outage_backlog_recovers_at_full_batches()
+    test_probe_when_outbox_is_empty()
+    print("\n🎉 All retry worker tests passed!")
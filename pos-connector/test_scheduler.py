@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for the central poll scheduler
+"""
+
+import os
+import sys
+import time
+import threading
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.scheduler import PollScheduler
+
+
+def test_thread_count_is_flat():
+    """Hundreds of sources are polled by the same fixed set of threads"""
+    baseline = threading.active_count()
+    scheduler = PollScheduler(max_workers=4)
+    counts = {}
+    lock = threading.Lock()
+
+    def poll(key):
+        with lock:
+            counts[key] = counts.get(key, 0) + 1
+
+    scheduler.start()
+    try:
+        for i in range(300):
+            scheduler.add(f"source-{i}", lambda key=i: poll(key), interval=0.05, jitter=0.2)
+        time.sleep(0.5)
+        assert threading.active_count() <= baseline + 5
+        assert len(scheduler) == 300
+    finally:
+        scheduler.stop()
+
+    assert len(counts) == 300
+    assert min(counts.values()) >= 2
+
+    print("✅ Thread count independent of source count")
+
+
+def test_priority_backoff_and_no_overlap():
+    """Due jobs run by priority, a returned delay overrides the interval, and a job never overlaps itself"""
+    scheduler = PollScheduler(max_workers=1)
+    order = []
+    active = set()
+    overlaps = []
+
+    def poll(key, delay=None):
+        if key in active:
+            overlaps.append(key)
+        active.add(key)
+        order.append(key)
+        time.sleep(0.01)
+        active.discard(key)
+        return delay
+
+    scheduler.add('low', lambda: poll('low'), interval=10, priority=5, delay=0)
+    scheduler.add('high', lambda: poll('high'), interval=10, priority=0, delay=0)
+    scheduler.add('backoff', lambda: poll('backoff', delay=0.02), interval=10, priority=9, delay=0)
+    scheduler.start()
+    try:
+        time.sleep(0.3)
+    finally:
+        scheduler.stop()
+
+    assert order[:3] == ['high', 'low', 'backoff'], order
+    assert order.count('high') == 1 and order.count('low') == 1
+    assert order.count('backoff') >= 3
+    assert not overlaps
+
+    status = scheduler.status()
+    assert status['high']['runs'] == 1 and status['high']['interval'] == 10
+
+    print("✅ Priorities, backoff and exclusive runs respected")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Poll Scheduler")
+    print("=" * 60)
+    test_thread_count_is_flat()
+    test_priority_backoff_and_no_overlap()
+    print("\n🎉 All scheduler tests passed!")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for persisted per-source extraction cursors
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.source_cursors import SourceCursor, SourceCursorStore
+from pos_connector.pos_adapters import UniversalPOSAdapter
+
+
+def test_cursor_uses_timestamp_and_tie_breaker():
+    """Records in the same second as the mark are taken once; older ones are dropped"""
+    cursor = SourceCursor()
+    assert cursor.since == datetime.min
+
+    first = [
+        {'id': 1, 'date': '2026-03-02 10:00:04', 'total_amount': 5},
+        {'id': 2, 'date': '2026-03-02 10:00:05', 'total_amount': 7},
+    ]
+    selected, cursor = cursor.select(first)
+    assert [t['id'] for t in selected] == [1, 2]
+    assert cursor.timestamp == datetime(2026, 3, 2, 10, 0, 5)
+    assert cursor.since == datetime(2026, 3, 2, 10, 0, 4)
+
+    # The overlapping query returns record 2 again and record 3, committed in the same second
+    second = [
+        {'id': 2, 'date': '2026-03-02 10:00:05', 'total_amount': 7},
+        {'id': 3, 'date': '2026-03-02T10:00:05', 'total_amount': 9},
+        {'id': 0, 'date': '2026-03-02 10:00:01', 'total_amount': 1},
+    ]
+    selected, cursor = cursor.select(second)
+    assert [t['id'] for t in selected] == [3]
+    assert cursor.boundary == {':2', ':3'}
+
+    selected, unchanged = cursor.select(second)
+    assert selected == [] and unchanged == cursor
+
+    print("✅ Cursor timestamp and tie-breaker respected")
+
+
+def test_cursors_survive_restart():
+    """A saved cursor is loaded by a new store, so a restart resumes incrementally"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        conn = sqlite3.connect(db_path)
+        store = SourceCursorStore(db_path)
+        store.init_schema(conn.cursor())
+        conn.commit()
+        conn.close()
+
+        _selected, cursor = store.get('file:/data/sales.db').select(
+            [{'sale_id': 'A7', 'sale_date': '2026-03-02 18:30:00', 'source_table': 'sales'}]
+        )
+        store.save('file:/data/sales.db', cursor)
+
+        restarted = SourceCursorStore(db_path)
+        loaded = restarted.get('file:/data/sales.db')
+        assert loaded == cursor
+        assert loaded.boundary == {'sales:A7'}
+        assert restarted.get('file:/data/other.db').timestamp is None
+
+    print("✅ Cursors persisted across restarts")
+
+
+def test_sqlite_pages_follow_the_cursor():
+    """A large first sync is read a page per poll, ties included, without skipping rows of a slower table"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        open(os.path.join(temp_dir, 'pos.exe'), 'w').close()
+        conn = sqlite3.connect(os.path.join(temp_dir, 'sales.db'))
+        conn.execute('CREATE TABLE sales (id INTEGER PRIMARY KEY, sale_time TEXT, total REAL)')
+        conn.execute('CREATE TABLE receipts (id INTEGER PRIMARY KEY, receipt_time TEXT)')
+        start = datetime(2026, 3, 2, 9, 0)
+        # Four sales in the minute that ends the first page
+        minutes = list(range(8)) + [9, 9, 9, 9] + list(range(10, 31))
+        conn.executemany('INSERT INTO sales (sale_time, total) VALUES (?, ?)',
+                         [(str(start + timedelta(minutes=m)), m) for m in minutes])
+        conn.executemany('INSERT INTO receipts (receipt_time) VALUES (?)',
+                         [(str(start + timedelta(minutes=m)),) for m in (5, 40, 41)])
+        conn.commit()
+        conn.close()
+
+        adapter = UniversalPOSAdapter()
+        adapter.PAGE_SIZE = 10
+        adapter.configure({'name': 'Till', 'executable_path': os.path.join(temp_dir, 'pos.exe')})
+        cursor, read, sizes = SourceCursor(), [], []
+        while len(sizes) < 20:
+            batch, cursor = cursor.select(adapter.get_new_transactions(cursor.since))
+            if not batch:
+                break
+            sizes.append(len(batch))
+            read.extend(f"{row['source_table']}:{row['id']}" for row in batch)
+
+        assert sorted(read) == sorted([f"sales:{n}" for n in range(1, len(minutes) + 1)]
+                                      + [f"receipts:{n}" for n in (1, 2, 3)])
+        # Later receipts wait until the sales pages have caught up with them
+        assert sizes == [13, 6, 9, 8]
+        assert cursor.timestamp == start + timedelta(minutes=41)
+
+    print("✅ SQLite pages follow the cursor")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Source Cursors")
+    print("=" * 60)
+    test_cursor_uses_timestamp_and_tie_breaker()
+    test_cursors_survive_restart()
+    test_sqlite_pages_follow_the_cursor()
+    print("\n🎉 All source cursor tests passed!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for canonical source identity and merging
+"""
+
+import os
+import sys
+import tempfile
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.source_identity import SourceIndex, source_id
+
+
+def test_same_file_from_two_methods_is_one_source():
+    """A SQLite file found by the file scan and the database scan is merged, database record first"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'sales.db')
+        open(db_path, 'w').close()
+        link_path = os.path.join(temp_dir, 'link.db')
+        os.symlink(db_path, link_path)
+
+        file_record = {'name': 'POS System (sales.db)', 'type': 'file_based',
+                       'file_path': os.path.join(temp_dir, '.', 'sales.db'), 'file_type': '.db',
+                       'discovery_method': 'file_scan'}
+        db_record = {'name': 'Database POS (link.db)', 'type': 'database', 'database_path': link_path,
+                     'database_type': 'sqlite', 'discovery_method': 'database_scan'}
+
+        assert source_id(file_record) == source_id(db_record)
+
+        merged = SourceIndex.merge_batch([file_record, db_record])
+        assert len(merged) == 1
+        source = merged[0]
+        assert source['type'] == 'database'
+        assert source['database_type'] == 'sqlite'
+        assert source['file_type'] == '.db'
+        assert source['discovery_methods'] == ['database_scan', 'file_scan']
+        assert source['aliases'] == ['POS System (sales.db)']
+
+    print("✅ Same file from two methods merged into one source")
+
+
+def test_later_finds_merge_into_known_source():
+    """Across methods the first record stays the source; later ones only add metadata"""
+    sources = SourceIndex()
+    service = {'name': 'RetailSvc', 'type': 'service', 'service_name': 'RetailSvc',
+               'executable_path': '"/opt/retail/bin/svc.exe" -k run', 'discovery_method': 'service'}
+    process = {'name': 'svc.exe', 'type': 'process', 'pid': 42, 'executable_path': '/opt/retail/bin/svc.exe',
+               'command_line': 'svc.exe -k run', 'discovery_method': 'process'}
+    network = {'name': 'Network POS (svc.exe)', 'type': 'network_service', 'port': 8080,
+               'process_id': 42, 'discovery_method': 'network'}
+    other = {'name': 'Aloha', 'type': 'registry_discovered', 'install_path': '', 'discovery_method': 'registry'}
+
+    first, is_new = sources.add(service)
+    assert is_new
+    assert sources.add(process) == (first, False)
+    assert sources.add(network) == (first, False)
+    assert sources.add(other)[1]
+
+    assert len(sources.sources) == 2
+    assert first['type'] == 'service'
+    assert first['pid'] == 42 and first['port'] == 8080
+    assert first['discovery_methods'] == ['service', 'process', 'network']
+
+    print("✅ Later finds merged into the known source")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Source Identity")
+    print("=" * 60)
+    test_same_file_from_two_methods_is_one_source()
+    test_later_finds_merge_into_known_source()
+    print("\n🎉 All source identity tests passed!")
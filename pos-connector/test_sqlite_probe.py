@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for cached, read-only SQLite schema probing
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.sqlite_probe import SQLiteSchemaProbe
+
+
+def _create_pos_db(path: Path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY, total REAL)")
+    conn.execute("CREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.commit()
+    conn.close()
+
+
+def test_unchanged_database_is_not_reopened():
+    """A second probe of an unchanged database is served from the cache"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / 'store.db'
+        _create_pos_db(db_file)
+        probe = SQLiteSchemaProbe()
+
+        real_connect = sqlite3.connect
+        with mock.patch('pos_connector.sqlite_probe.sqlite3.connect', side_effect=real_connect) as connect:
+            assert sorted(probe.get_tables(str(db_file))) == ['products', 'sales']
+            assert sorted(probe.get_tables(str(db_file))) == ['products', 'sales']
+
+        assert connect.call_count == 1
+        args, kwargs = connect.call_args
+        assert args[0].startswith('file:') and args[0].endswith('?mode=ro&immutable=1')
+        assert kwargs == {'uri': True}
+        assert probe.stats == {'hits': 1, 'probes': 1}
+
+        # A schema change bumps the header change counter and forces a new probe
+        fingerprint = probe.fingerprint(str(db_file))
+        conn = sqlite3.connect(db_file)
+        conn.execute("CREATE TABLE receipts (id INTEGER PRIMARY KEY)")
+        conn.commit()
+        conn.close()
+
+        assert sorted(probe.get_tables(str(db_file))) == ['products', 'receipts', 'sales']
+        assert probe.fingerprint(str(db_file)) != fingerprint
+
+    print("✅ Unchanged databases served from the fingerprint cache")
+
+
+def test_probe_does_not_contend_with_writer():
+    """Probing succeeds while the POS application holds an exclusive lock"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / 'pos.db'
+        _create_pos_db(db_file)
+
+        writer = sqlite3.connect(db_file, isolation_level=None)
+        writer.execute("BEGIN EXCLUSIVE")
+        writer.execute("INSERT INTO sales (total) VALUES (10.0)")
+        try:
+            assert sorted(SQLiteSchemaProbe().get_tables(str(db_file))) == ['products', 'sales']
+        finally:
+            writer.execute("COMMIT")
+            writer.close()
+
+        assert not os.path.exists(str(db_file) + '-journal')
+
+    print("✅ Probe takes no locks")
+
+
+def test_fingerprints_persist_and_skip_non_sqlite_files():
+    """Persisted fingerprints are reused by a new probe; non-SQLite files are rejected"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache_db = tmp / 'pos_cache.db'
+        conn = sqlite3.connect(cache_db)
+        SQLiteSchemaProbe(cache_db).init_schema(conn.cursor())
+        conn.commit()
+        conn.close()
+
+        db_file = tmp / 'sales.sqlite'
+        _create_pos_db(db_file)
+        SQLiteSchemaProbe(cache_db).get_tables(str(db_file))
+
+        restarted = SQLiteSchemaProbe(cache_db)
+        assert sorted(restarted.get_tables(str(db_file))) == ['products', 'sales']
+        assert restarted.stats == {'hits': 1, 'probes': 0}
+
+        text_file = tmp / 'notes.db'
+        text_file.write_text('not a database' * 20)
+        assert restarted.get_tables(str(text_file)) is None
+
+    print("✅ Fingerprints persisted across restarts")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing SQLite Schema Probe")
+    print("=" * 60)
+    test_unchanged_database_is_not_reopened()
+    test_probe_does_not_contend_with_writer()
+    test_fingerprints_persist_and_skip_non_sqlite_files()
+    print("\n🎉 All SQLite schema probe tests passed!")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script for deferred imports at startup
+"""
+
+import os
+import sys
+import subprocess
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+HEAVY_MODULES = ['pandas', 'pyodbc', 'pymysql', 'psycopg2', 'requests', 'psutil', 'pdfplumber',
+                 'watchdog', 'win32serviceutil', 'win32com', 'wmi']
+
+
+def _loaded_after(code: str) -> list:
+    """Run code in a fresh interpreter and return the watched modules it imported"""
+    probe = code + f"\nimport sys\nprint(sorted(m for m in sys.modules if m.split('.')[0] in {HEAVY_MODULES!r}"
+    probe += " or m.startswith('pos_connector.')))"
+    result = subprocess.run(
+        [sys.executable, '-c', probe],
+        cwd=os.path.abspath(os.path.dirname(__file__)),
+        capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return eval(result.stdout.strip())
+
+
+def test_main_imports_no_connector_modules():
+    """Importing main loads neither connector modules nor heavy dependencies before config is read"""
+    assert _loaded_after("import main") == []
+
+    print("✅ main.py imports nothing heavy at startup")
+
+
+def test_parsers_and_adapters_defer_optional_dependencies():
+    """PDF parsing and adapter modules import their optional libraries on first use"""
+    loaded = _loaded_after("import pos_connector.pdf_parser\nimport pos_connector.pos_adapters")
+    assert not [m for m in loaded if not m.startswith('pos_connector.')], loaded
+
+    print("✅ Optional dependencies deferred")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Deferred Startup Imports")
+    print("=" * 60)
+    test_main_imports_no_connector_modules()
+    test_parsers_and_adapters_defer_optional_dependencies()
+    print("\n🎉 All startup import tests passed!")
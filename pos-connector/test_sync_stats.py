@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the local sync rollups and statistics queries
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+from datetime import datetime, date, timedelta
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.cache_schema import CacheSchema
+from pos_connector.cache_writer import CacheWriter
+from pos_connector.cache_maintenance import CacheMaintenance
+from pos_connector.discovery_cache import DiscoveryCache
+from pos_connector.sync_stats import SyncStats, transaction_amount
+
+
+def _create(db_path, before_migration=None):
+    schema = CacheSchema()
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    schema.init_schema(cursor)
+    DiscoveryCache(db_path).init_schema(cursor)
+    cursor.execute("INSERT INTO pos_systems (name, type) VALUES ('Till 1', 'database'), ('Till 2', 'file')")
+    if before_migration:
+        before_migration(cursor)
+    schema.migrate(cursor)
+    conn.commit()
+    conn.close()
+    return SyncStats(db_path)
+
+
+def test_amounts():
+    """Amounts come from the first usable amount field, and are 0 without one"""
+    assert transaction_amount({'total_amount': '12.50', 'total': 99}) == 12.5
+    assert transaction_amount({'total_amount': 'n/a', 'total': 7}) == 7
+    assert transaction_amount({'id': 'T1'}) == 0
+
+    print("✅ Amounts")
+
+
+def test_rollups_follow_cache_writes():
+    """Results recorded in a cache write are summed per source, hour, day and status"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+        stats = _create(db_path)
+        writer = CacheWriter(db_path)
+        morning = datetime(2026, 3, 1, 9, 15)
+        evening = datetime(2026, 3, 1, 18, 40)
+
+        writer.submit(lambda cursor: stats.record(cursor, [(1, 'success', 10.0)] * 3 + [(1, 'failed', 5.0)], morning))
+        writer.submit(lambda cursor: stats.record(cursor, [(1, 'success', 2.5), (2, 'success', 1.0)], evening))
+        writer.submit(lambda cursor: stats.record(cursor, [(2, 'success', 4.0)], morning + timedelta(days=1)))
+        assert writer.stop(timeout=5)
+
+        hours = stats.query('hour', since=datetime(2026, 3, 1), until=datetime(2026, 3, 2), source='Till 1')
+        assert [(row['period'], row['status'], row['count'], row['total_amount']) for row in hours] == [
+            ('2026-03-01 09:00:00', 'failed', 1, 5.0),
+            ('2026-03-01 09:00:00', 'success', 3, 30.0),
+            ('2026-03-01 18:00:00', 'success', 1, 2.5),
+        ]
+
+        totals = stats.totals(since=date(2026, 3, 1), until=date(2026, 3, 2))
+        assert totals['by_status'] == {'failed': {'count': 1, 'total_amount': 5.0},
+                                       'success': {'count': 5, 'total_amount': 33.5}}
+        assert totals['by_source']['Till 2'] == {'success': {'count': 1, 'total_amount': 1.0}}
+        assert len(stats.query('day', status='success')) == 3
+
+        try:
+            stats.query('week')
+            assert False, "unknown granularity was accepted"
+        except ValueError:
+            pass
+
+    print("✅ Rollups follow cache writes")
+
+
+def test_backfill_and_retention():
+    """Existing sync_log rows are counted by the migration; old hourly rollups are pruned, days kept"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'pos_cache.db')
+
+        def history(cursor):
+            cursor.executemany(
+                "INSERT INTO sync_log (pos_system_id, transaction_id, sync_status, created_at) "
+                "VALUES (?, ?, ?, datetime('now', ?))",
+                [(1, f"T{i}", 'success' if i % 4 else 'failed', f"-{i % 3 * 100} days") for i in range(12)]
+            )
+
+        stats = _create(db_path, history)
+        totals = stats.totals()['by_status']
+        assert totals == {'success': {'count': 9, 'total_amount': 0.0}, 'failed': {'count': 3, 'total_amount': 0.0}}
+        assert stats.today() == {'success': {'count': 3, 'total_amount': 0.0}, 'failed': {'count': 1, 'total_amount': 0.0}}
+
+        writer = CacheWriter(db_path)
+        maintenance = CacheMaintenance(db_path, writer, sync_log_days=90)
+        maintenance.step(timeout=5)
+        assert maintenance.stats['rollups_deleted'] > 0
+        assert sum(row['count'] for row in stats.query('hour')) == 4
+        assert sum(row['count'] for row in stats.query('day')) == 12
+        assert writer.stop(timeout=5)
+
+    print("✅ Backfill and retention")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Sync Stats")
+    print("=" * 60)
+    test_amounts()
+    test_rollups_follow_cache_writes()
+    test_backfill_and_retention()
+    print("\n🎉 All sync stats tests passed!")
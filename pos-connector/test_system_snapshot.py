@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared process/port snapshot
+"""
+
+import os
+import sys
+from collections import namedtuple
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.system_snapshot import SystemSnapshot
+
+Addr = namedtuple('Addr', 'ip port')
+Conn = namedtuple('Conn', 'laddr status pid')
+
+
+class FakeProcess:
+    def __init__(self, pid, name):
+        self.info = {'pid': pid, 'name': name, 'exe': f"C:\\{name}", 'cmdline': [name]}
+
+    def as_dict(self, attrs=None):
+        return dict(self.info)
+
+
+class FakePsutil:
+    """Counts every enumeration and per-pid lookup"""
+
+    def __init__(self, processes, connections, late=None):
+        self.table = {pid: name for pid, name in processes}
+        self.conns = connections
+        # Processes started after the snapshot was taken
+        self.late = late or {}
+        self.calls = {'process_iter': 0, 'net_connections': 0, 'Process': 0}
+
+    def process_iter(self, attrs=None):
+        self.calls['process_iter'] += 1
+        return [FakeProcess(pid, name) for pid, name in self.table.items()]
+
+    def net_connections(self, kind='inet'):
+        self.calls['net_connections'] += 1
+        return list(self.conns)
+
+    def Process(self, pid):
+        self.calls['Process'] += 1
+        if pid not in self.late:
+            raise ProcessLookupError(pid)
+        return FakeProcess(pid, self.late[pid])
+
+
+def test_state_is_enumerated_once():
+    """All queries of a snapshot share one process and one connection enumeration"""
+    fake = FakePsutil(
+        [(10, 'sqlservr.exe'), (20, 'pos.exe'), (30, 'chrome.exe')],
+        [Conn(Addr('0.0.0.0', 1433), 'LISTEN', 10), Conn(Addr('127.0.0.1', 1433), 'ESTABLISHED', 10),
+         Conn(Addr('0.0.0.0', 8080), 'LISTEN', 20), Conn(Addr('127.0.0.1', 50123), 'ESTABLISHED', 30),
+         Conn(Addr('0.0.0.0', 9999), 'LISTEN', None)]
+    )
+    snapshot = SystemSnapshot(psutil_module=fake)
+
+    assert sorted(p['name'] for p in snapshot.processes().values()) == ['chrome.exe', 'pos.exe', 'sqlservr.exe']
+    assert snapshot.ports_by_pid() == {10: {1433}, 20: {8080}, 30: {50123}}
+    assert [snapshot.process_name(pid) for pid in (10, 20, 30)] == ['sqlservr.exe', 'pos.exe', 'chrome.exe']
+    assert len(snapshot.connections()) == 5
+    snapshot.processes()
+
+    assert fake.calls == {'process_iter': 1, 'net_connections': 1, 'Process': 0}
+
+    print("✅ System state enumerated once per snapshot")
+
+
+def test_unknown_pids_are_looked_up_once():
+    """A pid that appeared after the snapshot is resolved once and remembered"""
+    fake = FakePsutil([(10, 'pos.exe')], [], late={99: 'retail.exe'})
+    snapshot = SystemSnapshot(psutil_module=fake)
+
+    assert snapshot.process_name(99) == 'retail.exe'
+    assert snapshot.process_name(99) == 'retail.exe'
+    assert snapshot.process_name(404) == ''
+    assert snapshot.process_name(404) == ''
+    assert snapshot.process_name(None) == ''
+    assert fake.calls['Process'] == 2
+
+    print("✅ Late pids looked up once")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Shared System Snapshot")
+    print("=" * 60)
+    test_state_is_enumerated_once()
+    test_unknown_pids_are_looked_up_once()
+    print("\n🎉 All system snapshot tests passed!")
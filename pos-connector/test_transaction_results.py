@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for per-transaction results of batched sends
+"""
+
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pos_connector.pos_api_client import PosApiClient
+
+
+def _serve(respond):
+    """Local stand-in for /api/pos-connector/transactions; respond(transactions) -> (status, body)"""
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            transactions = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['transactions']
+            requests_seen.append([t['transaction_id'] for t in transactions])
+            status, body = respond(transactions)
+            reply = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = PosApiClient(f"http://127.0.0.1:{server.server_address[1]}", 'test-api-key')
+    return server, client, requests_seen
+
+
+def _stop(server):
+    server.shutdown()
+    server.server_close()
+
+
+def _batch(*ids):
+    return [{'transaction_id': tid, 'transaction_date': '2026-03-02 10:00:00', 'total_amount': 5} for tid in ids]
+
+
+def test_outcomes_per_transaction():
+    """Each member gets its own outcome, from the results list or, on older servers, error_details"""
+    def respond(transactions):
+        results = [{'transaction_id': 'T1', 'status': 'processed'},
+                   {'transaction_id': 'T2', 'status': 'skipped'},
+                   {'transaction_id': 'T3', 'status': 'error', 'error': 'Customer not found'}]
+        return 200, {'status': 'success', 'processed': 1, 'skipped': 1, 'errors': 1, 'results': results}
+
+    server, client, _seen = _serve(respond)
+    try:
+        outcomes = client.send_transactions_with_results(_batch('T1', 'T2', 'T3'))
+        assert [o['status'] for o in outcomes] == ['processed', 'skipped', 'error']
+        assert outcomes[2]['error'] == 'Customer not found'
+    finally:
+        _stop(server)
+
+    def respond_legacy(transactions):
+        return 200, {'status': 'success', 'processed': 1, 'skipped': 0, 'errors': 1,
+                     'error_details': [{'transaction_id': 'T2', 'error': 'Invalid date'}]}
+
+    server, client, _seen = _serve(respond_legacy)
+    try:
+        outcomes = client.send_transactions_with_results(_batch('T1', 'T2'))
+        assert [(o['status'], o['error']) for o in outcomes] == [('processed', None), ('error', 'Invalid date')]
+        assert client.send_transactions(_batch('T1'))
+    finally:
+        _stop(server)
+
+    print("✅ Outcomes reported per transaction")
+
+
+def test_invalid_members_fail_alone():
+    """A validation error on some members fails only those; the rest are sent again without them"""
+    def respond(transactions):
+        invalid = {f"transactions.{n}.total_amount": ['The total amount must be at least 0.']
+                   for n, t in enumerate(transactions) if t['total_amount'] < 0}
+        if invalid:
+            return 422, {'error': 'Validation failed', 'details': invalid}
+        return 200, {'status': 'success', 'processed': len(transactions), 'skipped': 0, 'errors': 0,
+                     'results': [{'transaction_id': t['transaction_id'], 'status': 'processed'} for t in transactions]}
+
+    server, client, seen = _serve(respond)
+    try:
+        batch = _batch('T1', 'T2', 'T3', 'T4')
+        batch[1]['total_amount'] = -5
+        outcomes = client.send_transactions_with_results(batch)
+        assert [o['status'] for o in outcomes] == ['processed', 'error', 'processed', 'processed']
+        assert outcomes[1]['error'] == 'The total amount must be at least 0.'
+        assert seen == [['T1', 'T2', 'T3', 'T4'], ['T1', 'T3', 'T4']]
+
+        # Nothing to resend when every member is invalid
+        outcomes = client.send_transactions_with_results([batch[1]])
+        assert outcomes[0]['status'] == 'error' and len(seen) == 3
+    finally:
+        _stop(server)
+
+    print("✅ Invalid members failed alone")
+
+
+def test_api_failures_leave_members_unsent():
+    """An unreachable or failing API rejects nothing: every member is unsent, with the reason"""
+    def respond(transactions):
+        if transactions[0]['total_amount'] < 0:
+            invalid = {'transactions.0.total_amount': ['The total amount must be at least 0.']}
+            return 422, {'error': 'Validation failed', 'details': invalid}
+        return 503, {'error': 'Service unavailable'}
+
+    server, client, seen = _serve(respond)
+    try:
+        outcomes = client.send_transactions_with_results(_batch('T1', 'T2'))
+        assert [o['status'] for o in outcomes] == ['unsent', 'unsent']
+        assert outcomes[0]['error'].startswith('HTTP 503')
+
+        # Members rejected by validation still fail when the resend of the rest hits the outage
+        batch = _batch('T1', 'T2')
+        batch[0]['total_amount'] = -5
+        outcomes = client.send_transactions_with_results(batch)
+        assert [o['status'] for o in outcomes] == ['error', 'unsent']
+    finally:
+        _stop(server)
+
+    outcomes = client.send_transactions_with_results(_batch('T1', 'T2'))
+    assert all(o['status'] == 'unsent' and o['error'] for o in outcomes)
+    assert not client.send_transactions(_batch('T1'))
+
+    print("✅ API failures leave members unsent")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Transaction Results")
+    print("=" * 60)
+    test_outcomes_per_transaction()
+    test_invalid_members_fail_alone()
+    test_api_failures_leave_members_unsent()
+    print("\n🎉 All transaction result tests passed!")
@@ -68,7 +68,10 @@ public function can_receive_transactions_from_connector()
                     'status' => 'success',
                     'processed' => 1,
                     'skipped' => 0,
-                    'errors' => 0
+                    'errors' => 0,
+                    'results' => [
+                        ['transaction_id' => 'TXN001', 'status' => 'processed']
+                    ]
                 ]);
 
         // Check transaction was created
@@ -130,7 +133,10 @@ public function handles_duplicate_transactions()
                     'status' => 'success',
                     'processed' => 0,
                     'skipped' => 1,
-                    'errors' => 0
+                    'errors' => 0,
+                    'results' => [
+                        ['transaction_id' => 'TXN001', 'status' => 'skipped']
+                    ]
                 ]);
     }
 